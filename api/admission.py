@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Admission Control
+推荐接口的准入控制：并发上限 + 有界等待队列 + 按客户端令牌桶限流，
+过载时快速拒绝（503 / 429 + Retry-After），保证已接收请求的尾延迟
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+
+class AdmissionController:
+    """
+    并发上限与有界等待队列
+
+    - 运行中的请求少于 max_concurrent 且无人排队时直接放行
+    - 否则进入等待队列，最多等待 queue_timeout 秒
+    - 队列已满或等待超时立即拒绝（计入 shed）
+    """
+
+    def __init__(self,
+                 max_concurrent: int,
+                 max_queue: int,
+                 queue_timeout: float = 2.0,
+                 retry_after: float = 1.0):
+        if max_concurrent <= 0:
+            raise ValueError(f"max_concurrent must be positive: {max_concurrent}")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._cond = threading.Condition(threading.Lock())
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed: Dict[str, int] = {"queue_full": 0, "timeout": 0}
+
+    def acquire(self) -> bool:
+        """申请执行；被拒绝时返回 False"""
+        with self._cond:
+            # 有人排队时新请求也排队，避免插队
+            if self.active < self.max_concurrent and self.waiting == 0:
+                self.active += 1
+                self.admitted += 1
+                return True
+
+            if self.waiting >= self.max_queue:
+                self.shed["queue_full"] += 1
+                return False
+
+            self.waiting += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed["timeout"] += 1
+                        return False
+                    self._cond.wait(remaining)
+                self.active += 1
+                self.admitted += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        """请求结束，唤醒一个等待者"""
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "active": self.active,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+            }
+
+
+class RateLimiter:
+    """
+    按客户端的令牌桶限流
+
+    每个客户端每秒补充 rate 个令牌，最多积累 burst 个；
+    只保留最近活跃的 max_clients 个客户端的桶。
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"Invalid rate limit: rate={rate}, burst={burst}")
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()  # client -> [令牌数, 更新时间]
+        self._lock = threading.Lock()
+        self.limited = 0
+
+    def check(self, client: str) -> float:
+        """取一个令牌：成功返回 0，否则返回需要等待的秒数"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = [self.burst, now]
+                self._buckets[client] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0.0
+
+            bucket[0] = tokens
+            self.limited += 1
+            return (1 - tokens) / self.rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
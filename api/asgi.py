@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+ASGI Server Entry
+生产环境服务入口：在 uvicorn 事件循环上提供与 recommendation_api 相同的接口，
+阻塞的 SQLite 查询与评分在有界线程池中执行，慢请求不会阻塞其他连接
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import io
+import os
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 添加 api 目录到路径（uvicorn 多进程模式按模块名导入）
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from recommendation_api import app, start_warmup
+
+
+# 请求体上限（字节）
+MAX_BODY_SIZE = 1024 * 1024
+
+# 响应分块在事件循环与工作线程之间的缓冲数
+RESPONSE_QUEUE_SIZE = 16
+
+# 工作线程等待队列空位时检查通道是否已关闭的间隔（秒）
+PUSH_POLL_INTERVAL = 1.0
+
+# 关闭时等待进行中请求的秒数（与 uvicorn 的 --graceful-timeout 一致）
+GRACEFUL_TIMEOUT = 30.0
+
+
+class ClientDisconnected(Exception):
+    """读取请求体时客户端已断开"""
+
+
+class ResponseAborted(Exception):
+    """响应已无人接收（客户端断开、请求任务被取消或服务关闭），工作线程停止生成"""
+
+
+class ResponseChannel:
+    """
+    工作线程 → 事件循环的响应消息通道（有界队列）
+
+    close() 后工作线程的 push 抛出 ResponseAborted；等待队列空位时按
+    PUSH_POLL_INTERVAL 检查关闭标志，接收方消失后线程不会永久阻塞。
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, size: int = RESPONSE_QUEUE_SIZE):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self.closed = False
+
+    def close(self):
+        """在事件循环中调用：丢弃未发送的消息并唤醒接收方，之后工作线程的 push 抛出 ResponseAborted"""
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    def push(self, message: Optional[Dict]):
+        """在工作线程中调用：放入一条消息，队列满时等待"""
+        if self.closed:
+            raise ResponseAborted()
+        try:
+            future = asyncio.run_coroutine_threadsafe(self.queue.put(message), self.loop)
+        except RuntimeError as e:  # 事件循环已关闭
+            raise ResponseAborted() from e
+        while True:
+            try:
+                future.result(timeout=PUSH_POLL_INTERVAL)
+                return
+            except concurrent.futures.TimeoutError:
+                if self.closed:
+                    future.cancel()
+                    raise ResponseAborted()
+
+    def finish(self):
+        """在工作线程中调用：发送结束标记（通道已关闭时无人等待，跳过）"""
+        try:
+            self.push(None)
+        except ResponseAborted:
+            pass
+
+
+def build_environ(scope: Dict, body: bytes) -> Dict:
+    """由 ASGI scope 构造 WSGI environ"""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+            continue
+        if name == "CONTENT_LENGTH":
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+    return environ
+
+
+class WSGIAdapter:
+    """
+    WSGI → ASGI 适配器
+
+    - 每个请求在有界线程池中运行 WSGI 应用，事件循环只负责收发
+    - 响应分块经有界队列逐块发送，流式响应不会整体缓存在内存中
+    - lifespan 启动时执行 on_startup 回调，关闭时等待线程池中的请求完成
+    """
+
+    def __init__(self,
+                 wsgi_app,
+                 max_threads: int = 32,
+                 max_body_size: int = MAX_BODY_SIZE,
+                 on_startup: Optional[List[Callable[[], None]]] = None,
+                 graceful_timeout: float = GRACEFUL_TIMEOUT):
+        self.wsgi_app = wsgi_app
+        self.max_threads = max_threads
+        self.max_body_size = max_body_size
+        self.on_startup = list(on_startup or [])
+        self.graceful_timeout = graceful_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="wsgi")
+        # 进行中的请求：工作线程 future → 响应通道
+        self._inflight: Dict[asyncio.Future, ResponseChannel] = {}
+
+    async def __call__(self, scope: Dict, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        try:
+            body = await self._read_body(receive)
+        except ClientDisconnected:
+            # 请求体不完整：不运行应用，也无从响应
+            return
+        if body is None:
+            await self._send_simple(send, 413, b'{"error": "Request body too large"}')
+            return
+
+        loop = asyncio.get_running_loop()
+        channel = ResponseChannel(loop)
+        try:
+            worker = loop.run_in_executor(
+                self.executor, self._run_wsgi, build_environ(scope, body), channel)
+        except RuntimeError:
+            # 线程池已关闭（服务正在退出）
+            await self._send_simple(send, 503, b'{"error": "Server shutting down"}')
+            return
+        self._inflight[worker] = channel
+        worker.add_done_callback(self._worker_done)
+
+        try:
+            while True:
+                message = await channel.queue.get()
+                if message is None:
+                    break
+                await send(message)
+        except BaseException:
+            # 客户端已断开或请求任务被取消：关闭通道，工作线程在下一次写入时停止
+            channel.close()
+            raise
+
+        if not channel.closed:
+            await worker
+
+    def _worker_done(self, worker: asyncio.Future):
+        channel = self._inflight.pop(worker, None)
+        if channel is not None and worker.cancelled():
+            # 关闭时被取消的排队任务不会运行，也就不会发送结束标记
+            channel.close()
+
+    async def _read_body(self, receive) -> Optional[bytes]:
+        """
+        读取完整请求体；超出上限时返回 None
+
+        Raises:
+            ClientDisconnected: 请求体读完之前客户端断开
+        """
+        chunks: List[bytes] = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise ClientDisconnected()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    def _run_wsgi(self, environ: Dict, channel: ResponseChannel):
+        """在工作线程中运行 WSGI 应用，把响应消息送回事件循环（通道关闭后停止迭代）"""
+        push = channel.push
+
+        response: Dict = {}
+        started = False
+
+        def start_response(status: str, headers: List[Tuple[str, str]], exc_info=None):
+            if exc_info and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in headers
+            ]
+            return write
+
+        def send_start():
+            nonlocal started
+            if not started:
+                started = True
+                push({
+                    "type": "http.response.start",
+                    "status": response["status"],
+                    "headers": response["headers"],
+                })
+
+        def write(chunk: bytes):
+            send_start()
+            push({"type": "http.response.body", "body": chunk, "more_body": True})
+
+        try:
+            iterable = self.wsgi_app(environ, start_response)
+            try:
+                for chunk in iterable:
+                    if chunk:
+                        write(chunk)
+                send_start()
+                push({"type": "http.response.body", "body": b"", "more_body": False})
+            finally:
+                if hasattr(iterable, "close"):
+                    iterable.close()
+        except ResponseAborted:
+            pass
+        except Exception:
+            traceback.print_exc()
+            if not started:
+                started = True
+                try:
+                    push({
+                        "type": "http.response.start",
+                        "status": 500,
+                        "headers": [(b"content-type", b"application/json")],
+                    })
+                    push({"type": "http.response.body", "body": b'{"error": "Internal error"}'})
+                except ResponseAborted:
+                    pass
+        finally:
+            channel.finish()
+
+    async def _send_simple(self, send, status: int, body: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        """
+        启动/关闭事件：启动时执行回调（如后台预热）；关闭时最多等待 graceful_timeout 秒，
+        之后关闭仍在进行的响应通道（工作线程在下一次写入时停止）并取消排队的任务
+        """
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                for callback in self.on_startup:
+                    callback()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                pending = [worker for worker in self._inflight if not worker.done()]
+                if pending:
+                    _, pending = await asyncio.wait(pending, timeout=self.graceful_timeout)
+                if pending:
+                    print(f"⚠️  {len(pending)} 个请求在 {self.graceful_timeout:g} 秒内未完成，停止等待")
+                    for channel in list(self._inflight.values()):
+                        channel.close()
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+# 每个 worker 进程导入本模块时创建（线程数由 API_THREADS、关闭等待由 API_GRACEFUL_TIMEOUT 控制；
+# 启动后在后台预热）
+application = WSGIAdapter(
+    app,
+    max_threads=int(os.environ.get("API_THREADS", "32")),
+    on_startup=[start_warmup],
+    graceful_timeout=float(os.environ.get("API_GRACEFUL_TIMEOUT", str(GRACEFUL_TIMEOUT)))
+)
+
+
+def main():
+    """启动 uvicorn"""
+    parser = argparse.ArgumentParser(description="AI Agent Recommendation API (ASGI)")
+    parser.add_argument("--host", default=os.environ.get("API_HOST", "0.0.0.0"), help="监听地址")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("API_PORT", "5000")),
+                        help="监听端口")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", "1")),
+                        help="worker 进程数")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("API_THREADS", "32")),
+                        help="每个 worker 的阻塞任务线程数")
+    parser.add_argument("--backlog", type=int, default=2048, help="TCP 连接等待队列长度")
+    parser.add_argument("--limit-concurrency", type=int, default=None,
+                        help="每个 worker 的最大并发连接数（超出返回 503）")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.environ.get("API_GRACEFUL_TIMEOUT", "30")),
+                        help="关闭时等待进行中请求的秒数")
+    parser.add_argument("--keep-alive", type=int, default=5, help="Keep-Alive 超时秒数")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    # worker 进程通过环境变量继承线程数与关闭等待时间
+    os.environ["API_THREADS"] = str(args.threads)
+    os.environ["API_GRACEFUL_TIMEOUT"] = str(args.graceful_timeout)
+
+    print(f"🚀 ASGI 服务启动: http://{args.host}:{args.port} "
+          f"({args.workers} workers × {args.threads} threads, backlog {args.backlog})")
+
+    uvicorn.run(
+        "asgi:application",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        backlog=args.backlog,
+        limit_concurrency=args.limit_concurrency,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=args.keep_alive,
+        lifespan="on",
+    )
+
+
+if __name__ == "__main__":
+    main()
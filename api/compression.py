@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Response Compression
+按 Accept-Encoding 协商响应压缩（br 优先，其次 gzip），
+流式响应逐块压缩并立即刷新，客户端收到一块即可解压一块
+"""
+
+import zlib
+from typing import Iterable, Iterator, Optional
+
+try:
+    import brotli  # 可选依赖：未安装时只提供 gzip
+except ImportError:
+    brotli = None
+
+
+# 小于该字节数的完整响应不压缩
+MIN_COMPRESS_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def supported_encodings() -> tuple:
+    """按优先级排列的可用编码"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """
+    选择响应编码
+
+    Args:
+        accept_encodings: werkzeug 解析后的 Accept-Encoding（request.accept_encodings）
+
+    Returns:
+        "br" / "gzip"；客户端不接受压缩时返回 None
+    """
+    best = None
+    best_quality = 0
+    for encoding in supported_encodings():
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _GzipCompressor:
+    def __init__(self):
+        self._z = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._z.compress(data)
+
+    def flush(self) -> bytes:
+        return self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._z.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self):
+        self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+def _compressor(encoding: str):
+    if encoding == "br":
+        return _BrotliCompressor()
+    if encoding == "gzip":
+        return _GzipCompressor()
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """压缩完整响应体"""
+    compressor = _compressor(encoding)
+    return compressor.compress(body) + compressor.finish()
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """逐块压缩流式响应，每块之后刷新（保持首字节时间与逐行可读）"""
+    compressor = _compressor(encoding)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
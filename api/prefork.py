@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Pre-fork Server
+多进程服务入口：父进程构建只读语料快照并监听端口，再 fork 出多个 worker；
+每个 worker 以 mmap 映射同一快照（共享页缓存，不重复占用内存），
+在继承的监听 socket 上运行 uvicorn，由内核在 worker 之间分发连接。
+
+父进程不导入推荐引擎（快照在子进程中构建），fork 时不带任何线程与数据库连接。
+"""
+
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOLS_DIR = os.path.join(API_DIR, '..', 'tools')
+
+# worker 启动后很快退出时，重启前等待的秒数（避免崩溃循环占满 CPU）
+RESTART_BACKOFF = 1.0
+
+
+def default_snapshot_path(db_path: str) -> str:
+    """与 corpus_snapshot.snapshot_path 相同的默认路径"""
+    return os.path.splitext(db_path)[0] + ".corpus.snap"
+
+
+def build_snapshot(db_path: str, snapshot_path: str):
+    """在独立进程中构建语料快照（父进程保持轻量，fork 前不加载 NumPy 与数据）"""
+    subprocess.run(
+        [sys.executable, os.path.join(TOOLS_DIR, "corpus_snapshot.py"), db_path, snapshot_path],
+        cwd=TOOLS_DIR,
+        check=True
+    )
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """创建由所有 worker 共享的监听 socket"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, args) -> int:
+    """worker 进程：导入应用（映射快照）并在继承的 socket 上运行 uvicorn"""
+    # 恢复默认信号处理（fork 继承了父进程的转发逻辑），uvicorn 启动后会安装自己的处理器；
+    # 独立进程组：终端的 Ctrl-C 只发给父进程，由父进程统一转发 SIGTERM
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    os.setpgrp()
+
+    sys.path.insert(0, API_DIR)
+    import uvicorn
+    from asgi import application
+
+    config = uvicorn.Config(
+        application,
+        lifespan="on",
+        limit_concurrency=args.limit_concurrency,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=args.keep_alive,
+        log_level="warning",
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+    return 0
+
+
+class Supervisor:
+    """父进程：fork worker、转发退出信号、重启意外退出的 worker"""
+
+    def __init__(self, sock: socket.socket, args):
+        self.sock = sock
+        self.args = args
+        self.workers: Dict[int, float] = {}  # pid -> 启动时间
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = run_worker(self.sock, self.args)
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+
+    def stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        print(f"\n🛑 收到信号 {signum}，等待 {len(self.workers)} 个 worker 完成进行中的请求...")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        for _ in range(self.args.workers):
+            self.spawn()
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.workers.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+
+            print(f"⚠️  worker {pid} 意外退出 (status {status})，重新启动")
+            if time.monotonic() - started < RESTART_BACKOFF:
+                time.sleep(RESTART_BACKOFF)
+            self.spawn()
+
+        print("✅ 所有 worker 已退出")
+
+
+def main():
+    """构建快照、监听端口并启动 worker"""
+    default_db = os.environ.get(
+        "PROJECTS_DB", os.path.join(API_DIR, '..', 'data', 'projects.db'))
+
+    parser = argparse.ArgumentParser(description="AI Agent Recommendation API (pre-fork)")
+    parser.add_argument("--host", default=os.environ.get("API_HOST", "0.0.0.0"), help="监听地址")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("API_PORT", "5000")),
+                        help="监听端口")
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+                        help="worker 进程数（默认 CPU 核数）")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("API_THREADS", "32")),
+                        help="每个 worker 的阻塞任务线程数")
+    parser.add_argument("--db", default=default_db, help="数据库路径")
+    parser.add_argument("--snapshot", default=None, help="语料快照路径（默认与数据库同目录）")
+    parser.add_argument("--reuse-snapshot", action="store_true",
+                        help="快照已存在时直接使用，不重新构建")
+    parser.add_argument("--backlog", type=int, default=2048, help="TCP 连接等待队列长度")
+    parser.add_argument("--limit-concurrency", type=int, default=None,
+                        help="每个 worker 的最大并发连接数（超出返回 503）")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="关闭时等待进行中请求的秒数")
+    parser.add_argument("--keep-alive", type=int, default=5, help="Keep-Alive 超时秒数")
+    args = parser.parse_args()
+
+    db_path = os.path.abspath(args.db)
+    snapshot_path = os.path.abspath(args.snapshot or default_snapshot_path(db_path))
+
+    if not (args.reuse_snapshot and os.path.exists(snapshot_path)):
+        build_snapshot(db_path, snapshot_path)
+
+    # worker 导入 recommendation_api 时读取这些环境变量
+    os.environ["PROJECTS_DB"] = db_path
+    os.environ["CORPUS_SNAPSHOT"] = snapshot_path
+    os.environ["API_THREADS"] = str(args.threads)
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    print(f"🚀 Pre-fork 服务启动: http://{args.host}:{args.port} "
+          f"({args.workers} workers × {args.threads} threads, snapshot {snapshot_path})")
+
+    Supervisor(sock, args).run()
+
+
+if __name__ == "__main__":
+    main()
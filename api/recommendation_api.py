@@ -4,10 +4,18 @@ Recommendation API Server
 提供 RESTful API 接口供网页调用
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
+from datetime import datetime, timezone
+from functools import wraps
+from itertools import chain
+import hashlib
+import json
+import math
 import sys
 import os
+import threading
+import time
 
 # 添加 tools 目录到路径
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'tools'))
@@ -19,12 +27,208 @@ from recommendation_engine import (
     Experience,
     Budget
 )
+from domain_stats import get_domain_stats, get_leaderboard
+from project_listing import DEFAULT_PAGE_SIZE, DEFAULT_SORT, MAX_PAGE_SIZE, list_projects
+from result_pages import CursorExpired
+from metrics import MetricsRegistry
+from admission import AdmissionController, RateLimiter
+from compression import MIN_COMPRESS_SIZE, choose_encoding, compress_body, compress_stream
 
 app = Flask(__name__)
 CORS(app)  # 允许跨域请求
 
-# 初始化推荐引擎
-engine = RecommendationEngine(db_path="../data/projects.db")
+# 数据库路径（可用 PROJECTS_DB 覆盖；默认相对本文件，与启动目录无关）
+DB_PATH = os.environ.get(
+    "PROJECTS_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'projects.db')
+)
+
+# 流式推荐的响应类型（每行一个 JSON 对象）
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# 只读接口的缓存时间（秒）：选项列表只随部署变化；数据接口过期后用 ETag 重新验证
+OPTIONS_MAX_AGE = 3600
+DATA_MAX_AGE = int(os.environ.get("API_CACHE_MAX_AGE", "60"))
+
+# 只读语料快照（由 prefork.py 构建并传入；worker 间共享页缓存）
+CORPUS_SNAPSHOT = os.environ.get("CORPUS_SNAPSHOT") or None
+if CORPUS_SNAPSHOT and not os.path.exists(CORPUS_SNAPSHOT):
+    print(f"⚠️  语料快照不存在，改为从数据库加载: {CORPUS_SNAPSHOT}")
+    CORPUS_SNAPSHOT = None
+
+# 初始化推荐引擎（分阶段计时默认开启，设置 RECOMMEND_INSTRUMENT=0 关闭）
+engine = RecommendationEngine(
+    db_path=DB_PATH,
+    corpus_snapshot_path=CORPUS_SNAPSHOT,
+    instrument=os.environ.get("RECOMMEND_INSTRUMENT", "1") != "0"
+)
+
+
+# 启动预热：后台加载全部领域语料与基础分表，完成前 /api/ready 返回 503
+# （API_WARMUP=0 时不预热，启动即就绪）
+WARMUP = os.environ.get("API_WARMUP", "1") != "0"
+
+warmup_state = {"status": "pending" if WARMUP else "ready", "domains": {}, "error": None}
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+
+
+def start_warmup():
+    """在后台线程中预热引擎（幂等，每个 worker 进程启动时调用一次）"""
+    global _warmup_thread
+    with _warmup_lock:
+        if not WARMUP or _warmup_thread is not None:
+            return
+        _warmup_thread = threading.Thread(target=_run_warmup, name="warmup", daemon=True)
+        _warmup_thread.start()
+
+
+def _run_warmup():
+    warmup_state["status"] = "warming"
+    start = time.perf_counter()
+    try:
+        warmup_state["domains"] = engine.warmup()
+        warmup_state["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        warmup_state["status"] = "ready"
+        print(f"✅ 预热完成: {len(warmup_state['domains'])} 个领域, {warmup_state['ms']:.0f}ms")
+    except Exception as e:
+        warmup_state["error"] = str(e)
+        warmup_state["status"] = "failed"
+        print(f"❌ 预热失败: {e}")
+
+
+# 推荐接口准入控制（每个 worker 进程独立计数；设为 0 关闭对应限制）
+# 并发上限 + 等待队列应不超过 worker 线程数（API_THREADS），否则排队请求会占满线程
+MAX_CONCURRENT = int(os.environ.get("RECOMMEND_MAX_CONCURRENT", "8"))
+MAX_QUEUE = int(os.environ.get("RECOMMEND_MAX_QUEUE", "16"))
+QUEUE_TIMEOUT = float(os.environ.get("RECOMMEND_QUEUE_TIMEOUT", "2.0"))
+RATE_LIMIT_RPS = float(os.environ.get("RATE_LIMIT_RPS", "20"))
+RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", "40"))
+# 位于反向代理之后时按 X-Forwarded-For 识别客户端
+TRUST_PROXY = os.environ.get("API_TRUST_PROXY", "0") == "1"
+
+admission = AdmissionController(
+    MAX_CONCURRENT, MAX_QUEUE, QUEUE_TIMEOUT
+) if MAX_CONCURRENT > 0 else None
+rate_limiter = RateLimiter(RATE_LIMIT_RPS, RATE_LIMIT_BURST) if RATE_LIMIT_RPS > 0 else None
+
+
+def _client_id() -> str:
+    """限流用的客户端标识"""
+    if TRUST_PROXY and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or ""
+
+
+def _rejected(status: int, message: str, retry_after: float):
+    """快速拒绝响应（附 Retry-After 秒数）"""
+    response = jsonify({"error": message})
+    response.status_code = status
+    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def admission_controlled(view):
+    """推荐类接口：先按客户端限流（429），再申请执行槽位（过载时 503）"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if rate_limiter is not None:
+            wait = rate_limiter.check(_client_id())
+            if wait > 0:
+                return _rejected(429, "Rate limit exceeded", wait)
+
+        if admission is None:
+            return view(*args, **kwargs)
+        if not admission.acquire():
+            return _rejected(503, "Server overloaded, please retry", admission.retry_after)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            # 流式响应在评分完成后即释放槽位，逐条输出不占用并发名额
+            admission.release()
+
+    return wrapper
+
+
+# Prometheus 指标（/api/metrics）：记录路径只写线程分片，不加锁
+metrics = MetricsRegistry()
+request_count = metrics.counter(
+    "api_requests_total", "HTTP requests by route, method and status",
+    ("route", "method", "status"))
+request_latency = metrics.histogram(
+    "api_request_duration_seconds", "HTTP request latency by route, method and status",
+    ("route", "method", "status"))
+requests_in_flight = metrics.gauge(
+    "api_requests_in_flight", "HTTP requests currently being handled", ("route",))
+metrics.register(engine.query_metrics)
+
+
+def _engine_metrics():
+    """导出时采集引擎当前状态：缓存命中、语料大小、推荐阶段耗时"""
+    caches = {
+        "corpus": engine.corpus_cache,
+        "result": engine.result_cache,
+        "ranking": engine.ranking_cache,
+    }
+    caches = {name: cache for name, cache in caches.items() if cache is not None}
+    yield ("recommend_cache_hits_total", "counter", "Engine cache hits", ("cache",),
+           [((name,), cache.hits) for name, cache in caches.items()])
+    yield ("recommend_cache_misses_total", "counter", "Engine cache misses", ("cache",),
+           [((name,), cache.misses) for name, cache in caches.items()])
+    yield ("recommend_cache_hit_ratio", "gauge", "Engine cache hit ratio", ("cache",),
+           [((name,), cache.hits / max(cache.hits + cache.misses, 1)) for name, cache in caches.items()])
+
+    corpora = engine.corpus_cache.domains() if engine.corpus_cache is not None else {}
+    yield ("corpus_projects", "gauge", "Projects in the cached corpus by domain", ("domain",),
+           [((domain,), len(corpus)) for domain, corpus in sorted(corpora.items())])
+    yield ("corpus_bytes", "gauge", "Estimated memory of cached corpora by domain", ("domain",),
+           [((domain,), corpus.nbytes) for domain, corpus in sorted(corpora.items())])
+
+    shed = {}
+    if admission is not None:
+        stats = admission.stats()
+        shed.update(stats["shed"])
+        yield ("admission_in_progress", "gauge", "Admitted recommendation requests running", (),
+               [((), stats["active"])])
+        yield ("admission_queue_depth", "gauge", "Recommendation requests waiting for a slot", (),
+               [((), stats["waiting"])])
+        yield ("admission_admitted_total", "counter", "Recommendation requests admitted", (),
+               [((), stats["admitted"])])
+    if rate_limiter is not None:
+        shed["rate_limited"] = rate_limiter.limited
+    yield ("admission_shed_total", "counter", "Recommendation requests rejected by admission control",
+           ("reason",), [((reason,), count) for reason, count in shed.items()])
+
+    yield ("recommend_stage_duration_seconds", "histogram", "Recommendation pipeline stage latency",
+           ("stage",), [((name,), histogram) for name, histogram in engine.stage_metrics.histograms.items()])
+
+
+metrics.register_collector(_engine_metrics)
+
+
+@app.before_request
+def _start_request_metrics():
+    g.metrics_route = request.url_rule.rule if request.url_rule else "unmatched"
+    g.metrics_start = time.perf_counter()
+    requests_in_flight.labels(g.metrics_route).inc()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    """记录请求数与延迟（流式响应只计到开始输出）"""
+    start = g.get("metrics_start")
+    if start is not None:
+        labels = (g.metrics_route, request.method, str(response.status_code))
+        request_count.labels(*labels).inc()
+        request_latency.labels(*labels).observe((time.perf_counter() - start) * 1000)
+    return response
+
+
+@app.teardown_request
+def _finish_request_metrics(exc):
+    route = g.pop("metrics_route", None)
+    if route is not None:
+        requests_in_flight.labels(route).dec()
 
 
 @app.route('/api/health', methods=['GET'])
@@ -33,131 +237,443 @@ def health_check():
     return jsonify({"status": "healthy", "version": "1.0.0"})
 
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """就绪检查：预热完成后返回 200，预热中或预热失败返回 503（/api/health 只表示进程存活）"""
+    status_code = 200 if warmup_state["status"] == "ready" else 503
+    return jsonify(warmup_state), status_code
+
+
 @app.route('/api/recommend', methods=['POST'])
+@admission_controlled
 def get_recommendations():
     """
     获取推荐
 
     Request JSON:
     {
-        "domain": "latex|cad|circuit|framework",
+        "domain": "latex|cad|circuit|framework|any",  // any 表示全部领域
+        "domains": ["latex", "framework"],  // optional, 跨领域模式（替代 domain）
         "experience": "beginner|intermediate|advanced",
         "budget": "free|low|medium|high",
         "features": ["feature1", "feature2"],
         "priority": "performance|ease_of_use|features|community",
         "language_preference": ["Python", "JavaScript"],  // optional
-        "top_n": 10  // optional, default 10
+        "top_n": 10,  // optional, default 10
+        "timings": false,  // optional, 返回分阶段耗时
+        "include_lists": true,  // optional, false 时省略与 recommendations 重复的分类型列表
+        "stream": false  // optional, 以 NDJSON 逐条输出（也可用 Accept: application/x-ndjson）
     }
+
+    流式模式第一行为 {"requirements", "count"}，之后每行一条推荐（按排名顺序）。
+    响应按 Accept-Encoding 使用 br / gzip 压缩。
     """
     try:
         data = request.get_json()
 
         # 验证必需字段
-        required_fields = ['domain', 'experience', 'budget', 'features', 'priority']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-
-        # 构造用户需求
-        requirements = UserRequirements(
-            domain=Domain(data['domain']),
-            experience=Experience(data['experience']),
-            budget=Budget(data['budget']),
-            features=data['features'],
-            priority=data['priority'],
-            language_preference=data.get('language_preference', None)
+        missing = _missing_field(data)
+        if missing:
+            return jsonify({"error": f"Missing required field: {missing}"}), 400
+
+        # 获取推荐数量（三种模式统一校验）
+        top_n = _parse_top_n(data)
+        include_lists = bool(data.get('include_lists', True))
+        stream = bool(data.get('stream', False)) or _wants_ndjson()
+
+        # 跨领域模式：各领域并发评分后归并
+        domains = _parse_domains(data)
+        if domains:
+            requirements = _parse_requirements({**data, 'domain': domains[0].value})
+            results = engine.get_multi_domain_recommendations(
+                requirements, domains=domains, top_n=top_n,
+                include_lists=include_lists and not stream)
+            if stream:
+                header = {"requirements": results["requirements"], "count": len(results["recommendations"])}
+                return _ndjson_response(chain([header], results["recommendations"]))
+            return _json_response(json.dumps(results, ensure_ascii=False).encode("utf-8"))
+
+        requirements = _parse_requirements(data)
+
+        # 流式模式：评分完成后逐条生成结果项与推荐理由
+        if stream:
+            return _ndjson_response(engine.stream_recommendations(requirements, top_n=top_n))
+
+        # 获取推荐结果（命中缓存时直接返回已序列化的 JSON）
+        payload = engine.get_recommendations_json(
+            requirements,
+            top_n=top_n,
+            include_timings=bool(data.get('timings', False)),
+            include_lists=include_lists
         )
 
-        # 获取推荐数量
-        top_n = data.get('top_n', 10)
+        return _json_response(payload)
+
+    except ValueError as e:
+        return jsonify({"error": f"Invalid value: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Internal error: {str(e)}"}), 500
+
+
+@app.route('/api/recommend/page', methods=['POST'])
+@admission_controlled
+def get_recommendations_page():
+    """
+    分页获取推荐（商业工具与开源项目合并排序）
 
-        # 获取推荐结果
-        results = engine.get_recommendations(requirements, top_n=top_n)
+    Request JSON: 与 /api/recommend 相同的需求字段，外加
+    {
+        "page_size": 10,  // optional, default 10，最多 100
+        "cursor": "..."   // optional, 上一页返回的 next_cursor
+    }
+    数据更新后旧游标失效，返回 410，需从第一页重新开始。
+    """
+    try:
+        data = request.get_json()
 
-        return jsonify(results)
+        missing = _missing_field(data)
+        if missing:
+            return jsonify({"error": f"Missing required field: {missing}"}), 400
 
+        page = engine.get_recommendations_page(
+            _parse_requirements(data),
+            page_size=_parse_positive_int(data, 'page_size', 10, MAX_PAGE_SIZE),
+            cursor=data.get('cursor'),
+            include_timings=bool(data.get('timings', False))
+        )
+        return jsonify(page)
+
+    except CursorExpired as e:
+        return jsonify({"error": str(e)}), 410
     except ValueError as e:
         return jsonify({"error": f"Invalid value: {str(e)}"}), 400
     except Exception as e:
         return jsonify({"error": f"Internal error: {str(e)}"}), 500
 
 
+def _wants_ndjson() -> bool:
+    """客户端是否通过 Accept 头优先请求 NDJSON"""
+    accept = request.accept_mimetypes
+    return accept.quality(NDJSON_MIMETYPE) > accept.quality('application/json')
+
+
+def _json_response(payload: bytes):
+    """JSON 响应；足够大且客户端接受时压缩"""
+    encoding = None
+    if len(payload) >= MIN_COMPRESS_SIZE:
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding:
+            payload = compress_body(payload, encoding)
+
+    response = app.response_class(payload, mimetype='application/json')
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _ndjson_response(items):
+    """NDJSON 流式响应：逐行序列化，客户端接受时逐块压缩"""
+    lines = (json.dumps(item, ensure_ascii=False).encode('utf-8') + b'\n' for item in items)
+    encoding = choose_encoding(request.accept_encodings)
+
+    response = app.response_class(
+        compress_stream(lines, encoding) if encoding else lines,
+        mimetype=NDJSON_MIMETYPE
+    )
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _missing_field(data) -> str:
+    """第一个缺失的必需字段（全部存在时返回空字符串）"""
+    required_fields = ['domain', 'experience', 'budget', 'features', 'priority']
+    for field in required_fields:
+        if field == 'domain' and 'domains' in data:
+            continue
+        if field not in data:
+            return field
+    return ""
+
+
+def _parse_top_n(data) -> int:
+    """推荐数量：必须为正整数"""
+    return _parse_positive_int(data, 'top_n', 10)
+
+
+def _parse_positive_int(data, name: str, default: int, maximum=None) -> int:
+    """请求 JSON 中的正整数字段（不接受布尔值与字符串；可选上限）"""
+    value = data.get(name, default)
+    if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+        raise ValueError(f"{name} must be a positive integer: {value!r}")
+    if maximum is not None and value > maximum:
+        raise ValueError(f"{name} must be at most {maximum}: {value!r}")
+    return value
+
+
+def _parse_domains(data) -> list:
+    """跨领域模式的领域列表；单领域请求返回空列表"""
+    if 'domains' in data:
+        if not data['domains']:
+            raise ValueError("domains must not be empty")
+        return [Domain(d) for d in data['domains']]
+    if data.get('domain') == 'any':
+        return list(Domain)
+    return []
+
+
+def _parse_requirements(data) -> UserRequirements:
+    """由请求 JSON 构造用户需求"""
+    return UserRequirements(
+        domain=Domain(data['domain']),
+        experience=Experience(data['experience']),
+        budget=Budget(data['budget']),
+        features=data['features'],
+        priority=data['priority'],
+        language_preference=data.get('language_preference', None)
+    )
+
+
+def _make_etag(*parts: str) -> str:
+    """由数据版本生成强 ETag"""
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()[:20]
+
+
+def _conditional_response(etag: str, last_modified, max_age: int, build):
+    """
+    带 ETag / Last-Modified / Cache-Control 的只读响应
+
+    客户端缓存仍然有效时直接返回 304，不再调用 build 生成响应体。
+    If-None-Match 存在时优先于 If-Modified-Since。
+    """
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(etag)
+    else:
+        not_modified = (
+            last_modified is not None
+            and request.if_modified_since is not None
+            and last_modified.replace(microsecond=0) <= request.if_modified_since
+        )
+
+    response = app.response_class(status=304) if not_modified else jsonify(build())
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.cache_control.must_revalidate = True
+    return response
+
+
+def _parse_collected_at(value: str):
+    """SQLite CURRENT_TIMESTAMP（UTC）→ datetime；无法解析时返回 None"""
+    try:
+        return datetime.strptime(value[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
 @app.route('/api/domains', methods=['GET'])
 def get_domains():
     """获取所有支持的领域"""
-    return jsonify({
+    options = {
         "domains": [d.value for d in Domain],
         "experiences": [e.value for e in Experience],
         "budgets": [b.value for b in Budget],
         "priorities": ["performance", "ease_of_use", "features", "community"]
-    })
+    }
+    etag = _make_etag("domains", json.dumps(options, sort_keys=True))
+    return _conditional_response(etag, None, OPTIONS_MAX_AGE, lambda: options)
 
 
 @app.route('/api/stats', methods=['GET'])
 def get_statistics():
-    """获取数据库统计信息"""
+    """获取数据库统计信息（数据版本未变化时返回 304）"""
     try:
-        import sqlite3
-        conn = sqlite3.connect('../data/projects.db')
-        cursor = conn.cursor()
-
-        # 总项目数
-        cursor.execute("SELECT COUNT(*) FROM projects")
-        total = cursor.fetchone()[0]
-
-        # 各领域分布
-        cursor.execute("""
-        SELECT domain, COUNT(*) as count, AVG(stars) as avg_stars
-        FROM projects
-        GROUP BY domain
-        """)
-
-        domains = []
-        for row in cursor.fetchall():
-            domains.append({
-                "domain": row[0],
-                "count": row[1],
-                "avg_stars": round(row[2], 0)
-            })
-
-        # 热门项目
-        cursor.execute("""
-        SELECT name, full_name, domain, stars
-        FROM projects
-        ORDER BY stars DESC
-        LIMIT 5
-        """)
-
-        top_projects = []
-        for row in cursor.fetchall():
-            top_projects.append({
-                "name": row[0],
-                "full_name": row[1],
-                "domain": row[2],
-                "stars": row[3]
-            })
-
-        conn.close()
-
-        return jsonify({
-            "total_projects": total,
-            "domains": domains,
-            "top_projects": top_projects
-        })
+        # 数据版本为 "最近采集时间#写入计数"（触发器维护，不扫描 projects 表），任何写入都会改变它
+        version = engine.get_data_version()
+        etag = _make_etag("stats", DB_PATH, version)
+        last_modified = _parse_collected_at(version.rsplit("#", 1)[0])
+        return _conditional_response(etag, last_modified, DATA_MAX_AGE, _build_statistics)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _build_statistics():
+    """读取领域统计物化表，旧数据库回退为实时查询"""
+    with engine.query_metrics.labels("stats").time():
+        return _query_statistics(engine.store.reader())
+
+
+def _query_statistics(conn):
+    """统计查询：优先读取物化表"""
+    domain_stats = get_domain_stats(conn)
+    if domain_stats is not None:
+        domains = [
+            {"domain": s["domain"], "count": s["count"], "avg_stars": s["avg_stars"]}
+            for s in sorted(domain_stats, key=lambda s: s["domain"])
+        ]
+        total = sum(s["count"] for s in domain_stats)
+        top_projects = [
+            {"name": p["name"], "full_name": p["full_name"], "domain": p["domain"], "stars": p["stars"]}
+            for p in get_leaderboard(conn)
+        ]
+    else:
+        total, domains, top_projects = _live_statistics(conn.cursor())
+
+    return {
+        "total_projects": total,
+        "domains": domains,
+        "top_projects": top_projects
+    }
+
+
+def _live_statistics(cursor):
+    """直接在 projects 表上统计（数据库尚未建立物化表时使用）"""
+    # 总项目数
+    cursor.execute("SELECT COUNT(*) FROM projects")
+    total = cursor.fetchone()[0]
+
+    # 各领域分布
+    cursor.execute("""
+    SELECT domain, COUNT(*) as count, AVG(stars) as avg_stars
+    FROM projects
+    GROUP BY domain
+    """)
+
+    domains = []
+    for row in cursor.fetchall():
+        domains.append({
+            "domain": row[0],
+            "count": row[1],
+            "avg_stars": round(row[2], 0)
+        })
+
+    # 热门项目
+    cursor.execute("""
+    SELECT name, full_name, domain, stars
+    FROM projects
+    ORDER BY stars DESC
+    LIMIT 5
+    """)
+
+    top_projects = []
+    for row in cursor.fetchall():
+        top_projects.append({
+            "name": row[0],
+            "full_name": row[1],
+            "domain": row[2],
+            "stars": row[3]
+        })
+
+    return total, domains, top_projects
+
+
+@app.route('/api/projects', methods=['GET'])
+def get_projects():
+    """
+    浏览项目（筛选 + 任意排序键 + 键集分页 + 分面计数）
+
+    Query:
+        domain, language, license: 可重复或逗号分隔
+        min_stars, max_stars, min_activity, max_activity: 数值区间
+        updated_after, updated_before: last_updated 时间窗口（ISO 日期，前闭后开）
+        sort: stars / forks / activity / updated / created / name（默认 stars）
+        order: desc / asc（默认 desc）
+        page_size: 默认 20，最多 100
+        cursor: 上一页返回的 next_cursor
+        facets: 1 / 0；默认仅第一页返回 total 与 facets
+    """
+    try:
+        filters = _parse_listing_filters(request.args)
+        cursor = request.args.get('cursor') or None
+        facets = request.args.get('facets')
+        options = {
+            "sort": request.args.get('sort', DEFAULT_SORT),
+            "order": request.args.get('order', 'desc'),
+            "page_size": int(request.args.get('page_size', DEFAULT_PAGE_SIZE)),
+            "cursor": cursor,
+            "facets": None if facets is None else facets != '0',
+        }
+
+        version = engine.get_data_version()
+        etag = _make_etag("projects", DB_PATH, version, request.query_string.decode("utf-8"))
+        last_modified = _parse_collected_at(version.rsplit("#", 1)[0])
+        return _conditional_response(
+            etag, last_modified, DATA_MAX_AGE, lambda: _query_projects(filters, options))
+
+    except ValueError as e:
+        return jsonify({"error": f"Invalid value: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Internal error: {str(e)}"}), 500
+
+
+def _split_args(args, name: str) -> list:
+    """可重复、可逗号分隔的查询参数"""
+    return [v.strip() for raw in args.getlist(name) for v in raw.split(',') if v.strip()]
+
+
+def _parse_listing_filters(args) -> dict:
+    """由查询参数构造 project_listing.build_filters 的参数"""
+    domains = _split_args(args, 'domain')
+    for domain in domains:
+        Domain(domain)  # 未知领域抛出 ValueError
+
+    filters = {
+        "domains": domains,
+        "languages": _split_args(args, 'language'),
+        "licenses": _split_args(args, 'license'),
+    }
+    for name, convert in (("min_stars", int), ("max_stars", int),
+                          ("min_activity", float), ("max_activity", float)):
+        if args.get(name):
+            filters[name] = convert(args[name])
+    for name in ("updated_after", "updated_before"):
+        if args.get(name):
+            datetime.fromisoformat(args[name])  # 格式错误抛出 ValueError
+            filters[name] = args[name]
+    return filters
+
+
+def _query_projects(filters: dict, options: dict):
+    """浏览查询（单条 SQL 返回当前页与分面）"""
+    with engine.query_metrics.labels("projects").time():
+        return list_projects(engine.store.reader(), filters, **options)
+
+
+@app.route('/api/timings', methods=['GET'])
+def get_timings():
+    """获取推荐流程各阶段的延迟直方图"""
+    return jsonify({
+        "instrumented": engine.instrument,
+        "stages": engine.stage_metrics.snapshot()
+    })
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus 文本格式的运行指标"""
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/api/commercial-tools/<domain>', methods=['GET'])
 def get_commercial_tools(domain):
-    """获取商业工具列表"""
+    """获取商业工具列表（目录版本未变化时返回 304）"""
     try:
         if domain not in [d.value for d in Domain]:
             return jsonify({"error": "Invalid domain"}), 400
 
-        tools = engine.commercial_tools.get(domain, [])
-        return jsonify({"domain": domain, "tools": tools})
+        # 同一快照同时决定 ETag 与响应体，避免热加载期间二者不一致
+        snapshot = engine.commercial_catalog.snapshot()
+        etag = _make_etag("commercial-tools", domain, snapshot.version)
+        last_modified = datetime.fromtimestamp(snapshot.mtime_ns / 1e9, tz=timezone.utc)
+        return _conditional_response(etag, last_modified, DATA_MAX_AGE, lambda: {
+            "domain": domain,
+            "tools": [tool.to_dict() for tool in snapshot.domain(domain).tools]
+        })
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -172,12 +688,23 @@ if __name__ == '__main__':
 
 API Endpoints:
   GET  /api/health              - Health check
+  GET  /api/ready               - Readiness check (after warmup)
   POST /api/recommend           - Get recommendations
+  POST /api/recommend/page      - Get paginated recommendations
   GET  /api/domains             - Get available options
   GET  /api/stats               - Get database statistics
+  GET  /api/projects            - Browse projects (filters, facets, keyset pages)
   GET  /api/commercial-tools/<domain> - Get commercial tools
+  GET  /api/timings             - Get per-stage latency histograms
+  GET  /api/metrics             - Prometheus metrics
 
-Starting server on http://localhost:5000
+Starting development server on http://localhost:5000
+(生产环境请使用: python asgi.py --workers 4)
     """)
 
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    debug = os.environ.get("FLASK_DEBUG", "1") == "1"
+    # 调试模式下只在重载器启动的服务进程中预热
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_warmup()
+
+    app.run(debug=debug, host='0.0.0.0', port=5000)
@@ -13,6 +13,9 @@ from pathlib import Path
 # 添加 tools 目录到路径
 sys.path.insert(0, str(Path(__file__).parent / 'tools'))
 
+from domain_stats import get_domain_stats, get_leaderboard
+from project_listing import MAX_PAGE_SIZE, SORT_KEYS, list_projects
+from project_store import get_store
 from recommendation_engine import (
     RecommendationEngine,
     UserRequirements,
@@ -170,49 +173,75 @@ def stats(domain):
     cli.py stats
     cli.py stats --domain latex
     """
-    import sqlite3
-
     click.echo(click.style('\n📊 数据统计\n', fg='cyan', bold=True))
 
     try:
-        conn = sqlite3.connect('data/projects.db')
+        conn = get_store('data/projects.db', migrate=False).reader()
         cursor = conn.cursor()
 
+        # 优先读取领域统计物化表（入库时维护），旧数据库回退为实时查询
+        materialized = get_domain_stats(conn, None if domain == 'all' else domain)
+
         if domain == 'all':
-            # 总体统计
-            cursor.execute("SELECT COUNT(*) FROM projects")
-            total = cursor.fetchone()[0]
-            click.echo(f"总项目数: {click.style(str(total), fg='green', bold=True)}")
+            if materialized is not None:
+                total = sum(s['count'] for s in materialized)
+                rows = [(s['domain'], s['count'], s['avg_stars'], s['max_stars']) for s in materialized]
+            else:
+                # 总体统计
+                cursor.execute("SELECT COUNT(*) FROM projects")
+                total = cursor.fetchone()[0]
+
+                # 各领域统计
+                cursor.execute("""
+                SELECT domain, COUNT(*) as count,
+                       ROUND(AVG(stars)) as avg_stars,
+                       MAX(stars) as max_stars
+                FROM projects
+                GROUP BY domain
+                ORDER BY count DESC
+                """)
+                rows = cursor.fetchall()
 
-            # 各领域统计
-            cursor.execute("""
-            SELECT domain, COUNT(*) as count,
-                   ROUND(AVG(stars)) as avg_stars,
-                   MAX(stars) as max_stars
-            FROM projects
-            GROUP BY domain
-            ORDER BY count DESC
-            """)
+            click.echo(f"总项目数: {click.style(str(total), fg='green', bold=True)}")
 
             click.echo(f"\n{click.style('领域分布:', fg='yellow', bold=True)}\n")
             click.echo(f"  {'领域':<12} {'项目数':<10} {'平均Stars':<12} {'最高Stars':<12}")
             click.echo(f"  {'-' * 50}")
 
-            for row in cursor.fetchall():
+            for row in rows:
                 domain_name, count, avg_stars, max_stars = row
                 click.echo(f"  {domain_name:<12} {count:<10} {int(avg_stars):<12,} {int(max_stars):<12,}")
         else:
             # 单个领域统计
-            cursor.execute("""
-            SELECT COUNT(*),
-                   ROUND(AVG(stars)),
-                   MAX(stars),
-                   MIN(stars)
-            FROM projects
-            WHERE domain = ?
-            """, (domain,))
-
-            count, avg_stars, max_stars, min_stars = cursor.fetchone()
+            if materialized is not None:
+                stats_row = materialized[0] if materialized else {}
+                count = stats_row.get('count', 0)
+                avg_stars = stats_row.get('avg_stars')
+                max_stars = stats_row.get('max_stars')
+                min_stars = stats_row.get('min_stars')
+                top_projects = [(p['name'], p['stars'], p['description'])
+                                for p in get_leaderboard(conn, domain)]
+            else:
+                cursor.execute("""
+                SELECT COUNT(*),
+                       ROUND(AVG(stars)),
+                       MAX(stars),
+                       MIN(stars)
+                FROM projects
+                WHERE domain = ?
+                """, (domain,))
+
+                count, avg_stars, max_stars, min_stars = cursor.fetchone()
+
+                # Top 5 项目
+                cursor.execute("""
+                SELECT name, stars, description
+                FROM projects
+                WHERE domain = ?
+                ORDER BY stars DESC
+                LIMIT 5
+                """, (domain,))
+                top_projects = cursor.fetchall()
 
             click.echo(f"领域: {click.style(domain.upper(), fg='blue', bold=True)}\n")
             click.echo(f"  项目总数: {click.style(str(count), fg='green')}")
@@ -220,23 +249,12 @@ def stats(domain):
             click.echo(f"  最高 Stars: {click.style(f'{int(max_stars):,}', fg='green')}")
             click.echo(f"  最低 Stars: {click.style(f'{int(min_stars):,}', fg='red')}")
 
-            # Top 5 项目
-            cursor.execute("""
-            SELECT name, stars, description
-            FROM projects
-            WHERE domain = ?
-            ORDER BY stars DESC
-            LIMIT 5
-            """, (domain,))
-
             click.echo(f"\n{click.style('Top 5 项目:', fg='yellow', bold=True)}\n")
-            for i, (name, stars, desc) in enumerate(cursor.fetchall(), 1):
+            for i, (name, stars, desc) in enumerate(top_projects, 1):
                 desc_short = desc[:60] + '...' if desc and len(desc) > 60 else desc or ''
                 click.echo(f"  {i}. {click.style(name, fg='cyan')} ({stars:,} ⭐)")
                 click.echo(f"     {desc_short}\n")
 
-        conn.close()
-
     except Exception as e:
         click.echo(click.style(f'\n❌ 错误: {str(e)}', fg='red', bold=True))
         sys.exit(1)
@@ -248,14 +266,19 @@ def stats(domain):
               required=True,
               help='领域')
 @click.option('--limit', '-n',
-              type=int,
+              type=click.IntRange(min=1),
               default=10,
               help='显示数量')
 @click.option('--sort',
-              type=click.Choice(['stars', 'activity', 'forks'], case_sensitive=False),
+              type=click.Choice(sorted(SORT_KEYS), case_sensitive=False),
               default='stars',
               help='排序方式')
-def list(domain, limit, sort):
+@click.option('--asc', is_flag=True, help='升序排列（默认降序）')
+@click.option('--language', '-l', multiple=True, help='编程语言筛选（可多次指定）')
+@click.option('--license', multiple=True, help='许可证筛选（可多次指定）')
+@click.option('--min-stars', type=int, default=None, help='最少 Stars')
+@click.option('--cursor', default=None, help='从上一页输出的游标继续')
+def list(domain, limit, sort, asc, language, license, min_stars, cursor):
     """
     📋 列出项目
 
@@ -263,30 +286,38 @@ def list(domain, limit, sort):
     \b
     cli.py list -d latex
     cli.py list --domain cad --limit 20 --sort activity
+    cli.py list -d framework -l python --min-stars 1000 --sort updated
     """
-    import sqlite3
-
     click.echo(click.style(f'\n📋 {domain.upper()} 领域项目\n', fg='cyan', bold=True))
 
     try:
-        conn = sqlite3.connect('data/projects.db')
-        cursor = conn.cursor()
-
-        sort_column = {
-            'stars': 'stars',
-            'activity': 'activity_score',
-            'forks': 'forks'
-        }[sort]
-
-        cursor.execute(f"""
-        SELECT name, full_name, stars, forks, activity_score, description, url
-        FROM projects
-        WHERE domain = ?
-        ORDER BY {sort_column} DESC
-        LIMIT ?
-        """, (domain, limit))
-
-        for i, (name, full_name, stars, forks, activity, desc, url) in enumerate(cursor.fetchall(), 1):
+        conn = get_store('data/projects.db', migrate=False).reader()
+
+        # 每页最多 MAX_PAGE_SIZE 条，按游标连续翻页直到满足 --limit
+        projects = []
+        while True:
+            page = list_projects(
+                conn,
+                filters={
+                    "domains": [domain],
+                    "languages": language,
+                    "licenses": license,
+                    "min_stars": min_stars,
+                },
+                sort=sort,
+                order='asc' if asc else 'desc',
+                page_size=min(limit - len(projects), MAX_PAGE_SIZE),
+                cursor=cursor,
+                facets=False
+            )
+            projects.extend(page['items'])
+            cursor = page['next_cursor']
+            if not cursor or len(projects) >= limit:
+                break
+
+        for i, project in enumerate(projects, 1):
+            name, full_name, url, desc = project['name'], project['full_name'], project['url'], project['description']
+            stars, forks, activity = project['stars'] or 0, project['forks'] or 0, project['activity_score']
             click.echo(f"{click.style(f'#{i}', fg='yellow')} {click.style(name, fg='white', bold=True)}")
             click.echo(f"   {full_name}")
             click.echo(f"   ⭐ {stars:,} | 🍴 {forks:,} | 📈 {activity}")
@@ -296,7 +327,8 @@ def list(domain, limit, sort):
             click.echo(f"   🔗 {click.style(url, fg='blue', underline=True)}")
             click.echo()
 
-        conn.close()
+        if page['next_cursor']:
+            click.echo(f"下一页: --cursor {page['next_cursor']}")
 
     except Exception as e:
         click.echo(click.style(f'\n❌ 错误: {str(e)}', fg='red', bold=True))
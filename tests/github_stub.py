@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+GitHub API 本地桩服务（测试用）
+在 127.0.0.1 的随机端口上提供 /rate_limit 与 /search/repositories：
+响应带 X-RateLimit-* 头（search 额度按窗口计数，用完后返回 403），搜索页带 ETag，
+If-None-Match 匹配时返回 304（与 GitHub 一致，304 不计入额度）
+"""
+
+import hashlib
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+
+def make_repo(index: int) -> Dict:
+    """第 index 个仓库（stars 递减，与 sort=stars 的顺序一致）"""
+    return {
+        "name": f"repo-{index:03d}",
+        "full_name": f"stub/repo-{index:03d}",
+        "html_url": f"https://github.com/stub/repo-{index:03d}",
+        "stargazers_count": 10000 - index,
+        "forks_count": 10,
+        "watchers_count": 10,
+        "open_issues_count": 1,
+        "description": f"stub repository {index}",
+        "language": "Python",
+        "updated_at": "2026-01-01T00:00:00Z",
+        "created_at": "2025-01-01T00:00:00Z",
+        "license": {"name": "MIT License"},
+        "topics": ["latex"],
+    }
+
+
+class GitHubStub:
+    """本地桩服务；requests 记录收到的每个请求 (path, params, headers)"""
+
+    def __init__(self, total_count: int = 250, search_limit: int = 30, window: int = 60):
+        """
+        Args:
+            total_count: 搜索结果总数
+            search_limit: 每个窗口的 search 额度
+            window: 额度窗口（秒）
+        """
+        self.repos = [make_repo(i) for i in range(total_count)]
+        self.search_limit = search_limit
+        self.window = window
+        self.remaining = search_limit
+        self.reset_at = math.ceil(time.time()) + window
+        self.requests: List[tuple] = []
+        self.over_limit = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start(self) -> str:
+        """启动服务，返回 base_url"""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def search_requests(self) -> List[tuple]:
+        return [request for request in self.requests if request[0] == "/search/repositories"]
+
+    def _rate_headers(self) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.search_limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(self.reset_at),
+            "X-RateLimit-Resource": "search",
+        }
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        url = urlparse(handler.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with self._lock:
+            self.requests.append((url.path, params, dict(handler.headers)))
+            now = time.time()
+            if now >= self.reset_at:
+                self.remaining = self.search_limit
+                self.reset_at = math.ceil(now) + self.window
+
+            if url.path == "/rate_limit":
+                info = {"limit": self.search_limit, "remaining": self.remaining, "reset": self.reset_at}
+                body = {"resources": {"search": info, "core": dict(info, limit=5000, remaining=5000)}}
+                return self._send(handler, 200, json.dumps(body).encode("utf-8"), {})
+
+            if url.path != "/search/repositories":
+                return self._send(handler, 404, b'{"message": "Not Found"}', {})
+
+            per_page = min(int(params.get("per_page", 30)), 100)
+            page = int(params.get("page", 1))
+            items = self.repos[(page - 1) * per_page:page * per_page]
+            body = json.dumps({"total_count": len(self.repos), "items": items}).encode("utf-8")
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+            if handler.headers.get("If-None-Match") == etag:
+                self.not_modified += 1
+                return self._send(handler, 304, b"", dict(self._rate_headers(), ETag=etag))
+
+            if self.remaining <= 0:
+                self.over_limit += 1
+                message = b'{"message": "API rate limit exceeded"}'
+                return self._send(handler, 403, message, self._rate_headers())
+
+            self.remaining -= 1
+            self._send(handler, 200, body, dict(self._rate_headers(), ETag=etag))
+
+    @staticmethod
+    def _send(handler: BaseHTTPRequestHandler, status: int, body: bytes, headers: Dict[str, str]):
+        handler.send_response(status)
+        if status != 304:
+            handler.send_header("Content-Type", "application/json; charset=utf-8")
+            handler.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        if status != 304:
+            handler.wfile.write(body)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+AsyncCrawler 并发搜索测试（本地桩服务发送 X-RateLimit-* 头）
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from github_stub import GitHubStub
+from github_searcher import GitHubSearcher
+from async_crawler import AsyncCrawler, PER_PAGE
+
+
+class AsyncCrawlerTest(unittest.TestCase):
+
+    def start(self, **stub_options) -> GitHubSearcher:
+        self.stub = GitHubStub(**stub_options)
+        base_url = self.stub.start()
+        self.addCleanup(self.stub.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        return GitHubSearcher(token="test", db_path=os.path.join(tmp.name, "projects.db"), base_url=base_url)
+
+    def test_pages_merged_in_order(self):
+        searcher = self.start(total_count=250)
+        results = searcher.crawl([
+            {"query": "latex ai", "domain": "latex", "max_results": 250},
+            {"query": "tikz", "domain": "latex", "max_results": 30},
+        ])
+
+        self.assertEqual([p["full_name"] for p in results[0]],
+                         [f"stub/repo-{i:03d}" for i in range(250)])
+        self.assertEqual([p["full_name"] for p in results[1]],
+                         [f"stub/repo-{i:03d}" for i in range(30)])
+
+        # 每页固定 100 条：第一个关键词 3 页，第二个 1 页
+        requests = self.stub.search_requests()
+        self.assertEqual(len(requests), 4)
+        self.assertTrue(all(params["per_page"] == str(PER_PAGE) for _, params, _ in requests))
+
+    def test_bucket_waits_when_remaining_runs_out(self):
+        searcher = self.start(total_count=600, search_limit=4, window=2)
+        crawler = AsyncCrawler(searcher)
+        start = time.time()
+        results = crawler.run([{"query": "latex ai", "domain": "latex", "max_results": 600}])
+
+        self.assertEqual([p["full_name"] for p in results[0]],
+                         [f"stub/repo-{i:03d}" for i in range(600)])
+        # 6 页超过一个窗口的 4 次额度：令牌桶等到窗口重置，服务端从未拒绝请求
+        self.assertEqual(self.stub.over_limit, 0)
+        self.assertEqual(crawler.stats["limited"], 0)
+        self.assertGreater(crawler.buckets["search"].waited, 0)
+        self.assertGreaterEqual(time.time() - start, 1.0)
+        self.assertEqual(crawler.buckets["search"].remaining, self.stub.remaining)
+
+    def test_zero_max_results(self):
+        searcher = self.start(total_count=50)
+        results = searcher.crawl([
+            {"query": "latex ai", "domain": "latex", "max_results": 0},
+            {"query": "tikz", "domain": "latex", "max_results": 5},
+        ])
+
+        self.assertEqual(results[0], [])
+        self.assertEqual([p["full_name"] for p in results[1]],
+                         [f"stub/repo-{i:03d}" for i in range(5)])
+        self.assertEqual(len(self.stub.search_requests()), 1)
+
+    def test_transport_error_fails_only_that_query(self):
+        searcher = self.start(total_count=50)
+        get = searcher.http.get
+
+        def flaky_get(url, params=None, **kwargs):
+            if params and params["q"].startswith("broken"):
+                raise requests.ConnectionError("connection reset by peer")
+            return get(url, params=params, **kwargs)
+
+        searcher.http.get = flaky_get
+        crawler = AsyncCrawler(searcher)
+        results = crawler.run([
+            {"query": "broken", "domain": "latex", "max_results": 50},
+            {"query": "tikz", "domain": "latex", "max_results": 5},
+        ])
+
+        self.assertEqual(results[0], [])
+        self.assertEqual([p["full_name"] for p in results[1]],
+                         [f"stub/repo-{i:03d}" for i in range(5)])
+        self.assertEqual(crawler.stats["failed"], 1)
+
+    def test_not_modified_does_not_exceed_server_remaining(self):
+        searcher = self.start(total_count=50)
+        crawler = AsyncCrawler(searcher)
+        crawler.cache = None
+        params = {"q": "latex ai", "per_page": PER_PAGE, "page": 1}
+
+        async def fetch_twice():
+            crawler._semaphore = asyncio.Semaphore(1)
+            first = await crawler.fetch("/search/repositories", params)
+            # 服务端进入新窗口且额度已被其他客户端用掉一部分
+            self.stub.remaining = 10
+            self.stub.reset_at += 60
+            second = await crawler.fetch("/search/repositories", params)
+            return first, second
+
+        first, second = asyncio.run(fetch_twice())
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        # 304 不计入额度，但归还的令牌不能叠加在服务端计数之上
+        self.assertEqual(crawler.buckets["search"].remaining, 10)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+HTTPClient 条件请求测试（本地桩服务返回 ETag / 304）
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from github_stub import GitHubStub
+from http_client import HTTPClient
+
+
+class HTTPClientETagTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = GitHubStub(total_count=30)
+        self.base_url = self.stub.start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store_path = os.path.join(self.tmp.name, "http_cache.db")
+        self.url = f"{self.base_url}/search/repositories"
+        self.params = {"q": "latex ai", "per_page": 10, "page": 1}
+
+    def tearDown(self):
+        self.stub.stop()
+        self.tmp.cleanup()
+
+    def test_not_modified_reuses_stored_body(self):
+        with HTTPClient(store_path=self.store_path) as client:
+            first = client.get(self.url, params=self.params)
+            second = client.get(self.url, params=self.params)
+
+            self.assertEqual(first.status_code, 200)
+            self.assertFalse(first.from_cache)
+            self.assertEqual(second.status_code, 200)
+            self.assertTrue(second.from_cache)
+            self.assertEqual(second.content, first.content)
+            self.assertEqual(second.json()["items"][0]["full_name"], "stub/repo-000")
+            self.assertEqual(client.stats, {"requests": 2, "not_modified": 1, "downloaded": 1})
+
+        requests = self.stub.search_requests()
+        self.assertNotIn("If-None-Match", requests[0][2])
+        self.assertEqual(requests[1][2]["If-None-Match"], first.headers["ETag"])
+        # 304 的速率限制头覆盖本地副本中的旧值
+        self.assertEqual(second.headers["X-RateLimit-Remaining"], str(self.stub.remaining))
+
+    def test_validators_persist_between_runs(self):
+        with HTTPClient(store_path=self.store_path) as client:
+            first = client.get(self.url, params=self.params)
+            self.assertEqual(len(client.store), 1)
+
+        with HTTPClient(store_path=self.store_path) as client:
+            second = client.get(self.url, params=self.params)
+            self.assertTrue(second.from_cache)
+            self.assertEqual(second.content, first.content)
+            self.assertEqual(client.stats["not_modified"], 1)
+
+        self.assertEqual(self.stub.not_modified, 1)
+
+    def test_unconditional_request_skips_validator(self):
+        with HTTPClient(store_path=self.store_path) as client:
+            client.get(self.url, params=self.params)
+            response = client.get(self.url, params=self.params, conditional=False)
+
+            self.assertFalse(response.from_cache)
+            self.assertEqual(client.stats["downloaded"], 2)
+
+        self.assertNotIn("If-None-Match", self.stub.search_requests()[1][2])
+        self.assertEqual(self.stub.not_modified, 0)
+
+    def test_without_store_no_conditional_requests(self):
+        with HTTPClient() as client:
+            client.get(self.url, params=self.params)
+            response = client.get(self.url, params=self.params)
+            self.assertFalse(response.from_cache)
+
+        self.assertEqual(self.stub.not_modified, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+搜索缓存键的规范化测试
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+
+from search_cache import normalize_query, request_key
+
+
+class NormalizeQueryTest(unittest.TestCase):
+
+    def test_whitespace_and_qualifier_order(self):
+        self.assertEqual(normalize_query("  latex   ai  stars:>50 language:Python "),
+                         "latex ai language:Python stars:>50")
+        self.assertEqual(normalize_query("language:Python latex ai stars:>50"),
+                         normalize_query("latex ai stars:>50 language:Python"))
+
+    def test_operators_and_case_preserved(self):
+        self.assertEqual(normalize_query("latex OR tikz"), "latex OR tikz")
+        self.assertNotEqual(request_key({"q": "latex OR tikz"}), request_key({"q": "latex or tikz"}))
+        self.assertNotEqual(request_key({"q": "language:Python"}), request_key({"q": "language:python"}))
+
+    def test_quoted_phrases_kept_whole(self):
+        self.assertEqual(normalize_query('"latex  ai"   tikz'), '"latex  ai" tikz')
+        self.assertEqual(normalize_query('topic:"machine learning"  latex'), 'latex topic:"machine learning"')
+        self.assertNotEqual(request_key({"q": '"latex ai" OR tikz'}),
+                            request_key({"q": '"latex" ai or tikz'}))
+
+    def test_qualifiers_next_to_operators_stay_in_place(self):
+        self.assertEqual(normalize_query("NOT language:tex ai"), "NOT language:tex ai")
+        self.assertEqual(normalize_query("(latex OR tikz)  stars:>5 ai"), "(latex OR tikz) stars:>5 ai")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Async Crawler
+并发抓取 GitHub 搜索结果：关键词与分页同时进行，请求前从按资源（search / core）划分的令牌桶取令牌，
+令牌数由响应头 X-RateLimit-Remaining / X-RateLimit-Reset 校正，额度用完时等到窗口重置；
+遇到 403 / 429 二级限流按 Retry-After（或指数退避）暂停整个资源，不使用固定间隔
+
+HTTP 请求通过 GitHubSearcher 的连接池客户端在线程中执行（保留 ETag 条件请求与 304 本地副本）；
+搜索页先查 GitHubSearcher 的搜索结果缓存，有效期内命中时不取令牌、不发请求。
+"""
+
+import asyncio
+import json
+import math
+import time
+from http import HTTPStatus
+from typing import Dict, List, Optional
+
+import requests
+
+# 搜索接口每页最大数量；搜索结果最多返回前 1000 条
+PER_PAGE = 100
+MAX_SEARCH_RESULTS = 1000
+
+# 未知额度时的保守默认值（认证后 search 为 30 次/分钟）
+DEFAULT_LIMITS = {"search": 30, "core": 5000}
+
+# 二级限流没有 Retry-After 时的首次退避秒数（之后每次翻倍）
+SECONDARY_BACKOFF = 60.0
+MAX_RETRIES = 5
+
+# 重置时间按秒取整，且与本地时钟可能有偏差
+RESET_MARGIN = 1.0
+
+
+def _local_response(url: str, status_code: int, body: bytes) -> requests.Response:
+    """由本地数据构造响应（搜索缓存命中 / 离线未命中 / 网络错误）"""
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = HTTPStatus(status_code).phrase
+    response.url = url
+    response.headers["Content-Type"] = "application/json; charset=utf-8"
+    response._content = body
+    response.encoding = "utf-8"
+    response.from_cache = True
+    return response
+
+
+class RateLimitBucket:
+    """
+    单个资源的令牌桶
+
+    令牌数 = 当前窗口的剩余额度：取令牌时本地扣减（并发请求不超发），
+    响应到达后按 X-RateLimit-Remaining 向下校正，窗口重置后恢复为 limit。
+    """
+
+    def __init__(self, limit: int, remaining: Optional[int] = None, reset_at: float = 0.0):
+        self.limit = limit
+        self.remaining = limit if remaining is None else remaining
+        self.reset_at = reset_at
+        self.blocked_until = 0.0
+        self.waited = 0.0
+        self._estimated = False  # reset_at 为本地估计值（尚未收到新窗口的响应头）
+        self._lock = asyncio.Lock()
+        self._changed = asyncio.Event()  # 响应头校正后唤醒等待者重新计算
+
+    async def acquire(self):
+        """取一个令牌；额度用完或处于退避期时等待"""
+        async with self._lock:
+            while True:
+                now = time.time()
+                if now < self.blocked_until:
+                    delay = self.blocked_until - now
+                elif self.remaining > 0:
+                    self.remaining -= 1
+                    return
+                elif now >= self.reset_at:
+                    # 窗口已重置但尚未收到新的响应头：按 limit 恢复，重置时间待响应头校正
+                    self.remaining = self.limit
+                    self.reset_at = now + 60
+                    self._estimated = True
+                    continue
+                else:
+                    delay = self.reset_at - now + RESET_MARGIN
+                self._changed.clear()
+                start = time.time()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                self.waited += time.time() - start
+
+    def update(self, headers):
+        """按响应头校正额度"""
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset_at = float(headers["X-RateLimit-Reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if "X-RateLimit-Limit" in headers:
+            self.limit = int(headers["X-RateLimit-Limit"])
+
+        if self._estimated:
+            # 本地已按新窗口恢复额度并扣减了已发出的请求：只校正重置时间，额度取两者较小值
+            self.reset_at = reset_at
+            self.remaining = min(self.remaining, remaining)
+            self._estimated = False
+        elif reset_at > self.reset_at:
+            # 新窗口：以服务端计数为准
+            self.reset_at = reset_at
+            self.remaining = remaining
+        else:
+            self.remaining = min(self.remaining, remaining)
+        self._changed.set()
+
+    def refund(self):
+        """归还一个令牌（请求未消耗额度）"""
+        self.remaining = min(self.remaining + 1, self.limit)
+
+    def block(self, seconds: float):
+        """暂停该资源的所有请求"""
+        self.blocked_until = max(self.blocked_until, time.time() + seconds)
+
+
+class AsyncCrawler:
+    """基于 GitHubSearcher 的并发搜索引擎"""
+
+    def __init__(self, searcher, max_concurrency: int = 4, secondary_backoff: float = SECONDARY_BACKOFF):
+        """
+        Args:
+            searcher: GitHubSearcher（提供 base_url、连接池客户端与数据转换）
+            max_concurrency: 同时进行的请求数
+            secondary_backoff: 二级限流没有 Retry-After 时的首次退避秒数
+        """
+        self.searcher = searcher
+        self.http = searcher.http
+        self.cache = getattr(searcher, "search_cache", None)
+        self.max_concurrency = max_concurrency
+        self.secondary_backoff = secondary_backoff
+        self.buckets: Dict[str, RateLimitBucket] = {}
+        self.stats = {"requests": 0, "cached": 0, "limited": 0, "failed": 0}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _bucket(self, resource: str) -> RateLimitBucket:
+        if resource not in self.buckets:
+            self.buckets[resource] = RateLimitBucket(DEFAULT_LIMITS.get(resource, DEFAULT_LIMITS["core"]))
+        return self.buckets[resource]
+
+    async def prime(self):
+        """用 /rate_limit（不计入额度）初始化各资源的令牌桶"""
+        try:
+            response = await asyncio.to_thread(
+                self.http.get, f"{self.searcher.base_url}/rate_limit", conditional=False)
+        except Exception as e:
+            print(f"⚠️  无法获取速率限制，使用默认额度: {e}")
+            return
+        if response.status_code != 200:
+            return
+        for resource, info in response.json().get("resources", {}).items():
+            self.buckets[resource] = RateLimitBucket(info["limit"], info["remaining"], float(info["reset"]))
+
+    @staticmethod
+    def _is_rate_limited(response) -> bool:
+        """403 / 429 是否为限流（而非权限等错误）"""
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        if "Retry-After" in response.headers or response.headers.get("X-RateLimit-Remaining") == "0":
+            return True
+        try:
+            return "rate limit" in response.json().get("message", "").lower()
+        except ValueError:
+            return False
+
+    def _retry_delay(self, response, attempt: int) -> float:
+        """限流后的等待秒数：Retry-After > 主额度重置时间 > 指数退避"""
+        headers = response.headers
+        if "Retry-After" in headers:
+            try:
+                return float(headers["Retry-After"])
+            except ValueError:
+                pass
+        if headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in headers:
+            return max(float(headers["X-RateLimit-Reset"]) - time.time(), 0) + RESET_MARGIN
+        return self.secondary_backoff * (2 ** attempt)
+
+    async def fetch(self, path: str, params: Dict, resource: str = "search"):
+        """
+        带令牌桶与限流重试的 GET
+
+        Returns:
+            requests.Response；重试用尽仍被限流时返回最后一次响应；
+            离线模式下未缓存的请求返回 504（与 HTTP 缓存的 only-if-cached 一致）；
+            连接池重试后仍有网络错误时返回本地构造的 502（不抛出，其他关键词照常进行）
+        """
+        bucket = self._bucket(resource)
+        url = f"{self.searcher.base_url}{path}"
+
+        cache_request = {"backend": "rest", "path": path, **params}
+        if self.cache is not None:
+            body = await asyncio.to_thread(self.cache.get, cache_request)
+            if body is not None:
+                self.stats["cached"] += 1
+                return _local_response(url, 200, body)
+            if self.cache.offline:
+                message = json.dumps({"message": "Offline mode: request not in search cache"})
+                return _local_response(url, 504, message.encode("utf-8"))
+
+        for attempt in range(MAX_RETRIES + 1):
+            await bucket.acquire()
+            try:
+                async with self._semaphore:
+                    response = await asyncio.to_thread(self.http.get, url, params=params)
+            except requests.RequestException as e:
+                message = json.dumps({"message": f"{type(e).__name__}: {e}"})
+                return _local_response(url, 502, message.encode("utf-8"))
+            self.stats["requests"] += 1
+
+            # 304 不计入额度：先归还本地令牌，再由响应头中服务端的剩余额度校正（不会超出服务端计数）
+            if response.from_cache:
+                bucket.refund()
+            bucket.update(response.headers)
+            if response.status_code == 200 and self.cache is not None:
+                await asyncio.to_thread(self.cache.put, cache_request, response.content)
+            if not self._is_rate_limited(response) or attempt == MAX_RETRIES:
+                return response
+
+            delay = self._retry_delay(response, attempt)
+            self.stats["limited"] += 1
+            bucket.block(delay)
+            print(f"  ⏳ [{resource}] 触发限流 ({response.status_code})，{delay:.0f} 秒后重试")
+
+    async def search(self,
+                     query: str,
+                     domain: str,
+                     sort: str = "stars",
+                     order: str = "desc",
+                     max_results: int = 100,
+                     min_stars: int = 10) -> List[Dict]:
+        """
+        搜索单个关键词：第一页得到总数后，其余页并发请求
+
+        Returns:
+            与 GitHubSearcher.search_repositories 相同的项目列表（按页序）
+        """
+        if max_results <= 0:
+            return []
+
+        search_query = f"{query} stars:>{min_stars}"
+        print(f"\n🔍 搜索: {search_query} (领域: {domain})")
+
+        def params(page: int) -> Dict:
+            # 每页固定取满（减少搜索请求），合并后再截取 max_results
+            return {"q": search_query, "sort": sort, "order": order, "per_page": PER_PAGE, "page": page}
+
+        first = await self.fetch("/search/repositories", params(1))
+        if first.status_code != 200:
+            self._report_failure(first)
+            return []
+
+        data = first.json()
+        total = min(data.get("total_count", max_results), max_results, MAX_SEARCH_RESULTS)
+        pages_needed = max(1, math.ceil(total / PER_PAGE))
+
+        responses = [first] + await asyncio.gather(*(
+            self.fetch("/search/repositories", params(page))
+            for page in range(2, pages_needed + 1)
+        ))
+
+        repos = []
+        for response in responses:
+            if response.status_code != 200:
+                self._report_failure(response)
+                break
+            items = response.json().get("items", [])
+            if not items:
+                break
+            repos.extend(items)
+
+        projects = [self.searcher.extract_repo_data(repo, domain) for repo in repos[:max_results]]
+        print(f"  ✅ [{domain}] {query}: {len(projects)} 个项目")
+        return projects
+
+    def _report_failure(self, response):
+        self.stats["failed"] += 1
+        try:
+            message = response.json().get("message", "Unknown error")
+        except ValueError:
+            message = "Unknown error"
+        print(f"❌ 搜索失败: {response.status_code}")
+        print(f"   错误: {message}")
+
+    async def crawl(self, queries: List[Dict]) -> List[List[Dict]]:
+        """
+        并发搜索多个关键词
+
+        Args:
+            queries: search() 的关键字参数列表
+
+        Returns:
+            与 queries 顺序对应的项目列表
+        """
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.cache is None or not self.cache.offline:
+            await self.prime()
+        return await asyncio.gather(*(self.search(**query) for query in queries))
+
+    def run(self, queries: List[Dict]) -> List[List[Dict]]:
+        """同步入口"""
+        return asyncio.run(self.crawl(queries))
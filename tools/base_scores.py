@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Base Score Precompute
+离线预计算基础分表：对每个领域、每个 (experience, priority) 组合，
+计算与功能/语言无关的基础分并按降序排列，保存在数据库旁的 .npz 文件中
+"""
+
+import os
+import sys
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from scoring_kernel import PRIORITIES, DomainColumns, base_scores
+
+
+# 基础分表覆盖的经验水平取值
+EXPERIENCES = ("beginner", "intermediate", "advanced")
+
+BaseTable = Tuple[np.ndarray, np.ndarray]
+
+
+def base_scores_path(db_path: str) -> str:
+    """基础分文件路径（与数据库同目录）"""
+    return os.path.splitext(db_path)[0] + ".base_scores.npz"
+
+
+def compute_base_table(columns: DomainColumns, experience: str, priority: str) -> BaseTable:
+    """计算单个组合的基础分及其降序排列"""
+    base = base_scores(columns, experience, priority)
+    order = np.argsort(-base, kind="stable").astype(np.int32)
+    return base, order
+
+
+def precompute_base_scores(db_path: str, output_path: Optional[str] = None) -> str:
+    """
+    为所有领域和组合预计算基础分表
+
+    Returns:
+        输出文件路径
+    """
+    # 延迟导入，避免与 recommendation_engine 循环依赖
+    from recommendation_engine import RecommendationEngine, Domain
+
+    output_path = output_path or base_scores_path(db_path)
+    engine = RecommendationEngine(db_path=db_path, result_cache_size=0)
+
+    arrays: Dict[str, np.ndarray] = {}
+    for domain in Domain:
+        corpus = engine.get_corpus(domain.value)
+        arrays[f"{domain.value}/version"] = np.array(corpus.version)
+        arrays[f"{domain.value}/ids"] = np.array([p['id'] for p in corpus.projects], dtype=np.int64)
+
+        for experience in EXPERIENCES:
+            for priority in PRIORITIES:
+                base, order = compute_base_table(corpus.columns, experience, priority)
+                arrays[f"{domain.value}/{experience}/{priority}/base"] = base
+                arrays[f"{domain.value}/{experience}/{priority}/order"] = order
+
+        print(f"  {domain.value:12} - {len(corpus):,} 个项目 × "
+              f"{len(EXPERIENCES) * len(PRIORITIES)} 个组合")
+
+    # 先写临时文件再替换，读取方不会看到写了一半的文件
+    tmp_path = output_path + ".tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, output_path)
+
+    return output_path
+
+
+def load_base_tables(path: str,
+                     domain: str,
+                     version: str,
+                     project_ids: np.ndarray) -> Dict[Tuple[str, str], BaseTable]:
+    """
+    读取某领域的预计算基础分表
+
+    仅当文件中的数据版本与项目顺序均与当前语料一致时返回，否则返回空字典。
+    """
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        with np.load(path) as data:
+            if f"{domain}/version" not in data.files:
+                return {}
+            if str(data[f"{domain}/version"]) != version:
+                return {}
+            if not np.array_equal(data[f"{domain}/ids"], project_ids):
+                return {}
+
+            return {
+                (experience, priority): (
+                    data[f"{domain}/{experience}/{priority}/base"],
+                    data[f"{domain}/{experience}/{priority}/order"],
+                )
+                for experience in EXPERIENCES
+                for priority in PRIORITIES
+            }
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def main():
+    """主函数"""
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "../data/projects.db"
+
+    print("\n📐 预计算基础分表...")
+    output_path = precompute_base_scores(db_path)
+    print(f"\n✅ 基础分表已保存到: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
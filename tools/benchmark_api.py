@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+API Load Benchmark
+推荐 API 压测：生成合成数据库，按请求比例混合回放各接口（进程内测试客户端或本机回环 HTTP），
+输出每个接口的吞吐量与 p50/p95/p99 延迟；可保存为 JSON 基线，并在性能回退超过阈值时失败退出
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmark_ranking import create_synthetic_database, percentile, random_requirements
+from recommendation_engine import Domain
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api')
+
+# 默认请求比例（接口 → 权重）
+DEFAULT_MIX = {
+    "recommend": 55,
+    "recommend_stream": 5,
+    "recommend_page": 10,
+    "stats": 5,
+    "projects": 10,
+    "domains": 5,
+    "commercial_tools": 5,
+    "metrics": 5,
+}
+
+# 回退判定：延迟高于基线 (1 + threshold) 倍、或吞吐低于基线 (1 - threshold) 倍即视为回退；
+# 绝对差值小于 MIN_DELTA_MS 的延迟变化视为噪声
+DEFAULT_THRESHOLD = 0.25
+MIN_DELTA_MS = 1.0
+
+
+def parse_mix(text: Optional[str]) -> Dict[str, int]:
+    """解析 "recommend=70,stats=10" 形式的请求比例"""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown endpoint: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def requirements_body(rng: random.Random, top_n: int) -> Dict:
+    """随机需求画像的请求 JSON"""
+    requirements = random_requirements(rng)
+    return {
+        "domain": requirements.domain.value,
+        "experience": requirements.experience.value,
+        "budget": requirements.budget.value,
+        "features": requirements.features,
+        "priority": requirements.priority,
+        "language_preference": requirements.language_preference,
+        "top_n": top_n,
+    }
+
+
+def build_request(endpoint: str, rng: random.Random, top_n: int) -> Tuple[str, str, Optional[Dict]]:
+    """(方法, 路径, 请求体)"""
+    if endpoint == "recommend":
+        return "POST", "/api/recommend", requirements_body(rng, top_n)
+    if endpoint == "recommend_stream":
+        return "POST", "/api/recommend", {**requirements_body(rng, top_n), "stream": True}
+    if endpoint == "recommend_page":
+        return "POST", "/api/recommend/page", {**requirements_body(rng, top_n), "page_size": top_n}
+    if endpoint == "stats":
+        return "GET", "/api/stats", None
+    if endpoint == "projects":
+        sort = rng.choice(["stars", "forks", "activity", "updated", "created", "name"])
+        return "GET", f"/api/projects?domain={rng.choice(list(Domain)).value}&sort={sort}", None
+    if endpoint == "domains":
+        return "GET", "/api/domains", None
+    if endpoint == "commercial_tools":
+        return "GET", f"/api/commercial-tools/{rng.choice(list(Domain)).value}", None
+    if endpoint == "metrics":
+        return "GET", "/api/metrics", None
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+def load_app(db_path: str):
+    """以指定数据库重新导入 Flask 应用（关闭限流与预热，只测量处理本身）"""
+    os.environ.update({
+        "PROJECTS_DB": db_path,
+        "API_WARMUP": "0",
+        "RATE_LIMIT_RPS": "0",
+        "RECOMMEND_MAX_CONCURRENT": "0",
+    })
+    if API_DIR not in sys.path:
+        sys.path.insert(0, API_DIR)
+    sys.modules.pop("recommendation_api", None)
+    return importlib.import_module("recommendation_api")
+
+
+def client_sender(app) -> Callable[[str, str, Optional[Dict]], int]:
+    """进程内测试客户端（每个线程一个客户端）"""
+    local = threading.local()
+
+    def send(method: str, path: str, body: Optional[Dict]) -> int:
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        response = client.open(path, method=method, json=body)
+        response.get_data()  # 读完流式响应
+        return response.status_code
+
+    return send
+
+
+def loopback_sender(base_url: str) -> Callable[[str, str, Optional[Dict]], int]:
+    """本机回环 HTTP"""
+    def send(method: str, path: str, body: Optional[Dict]) -> int:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(base_url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    return send
+
+
+def start_loopback_server(app) -> Tuple[str, Callable[[], None]]:
+    """在后台线程中启动 WSGI 服务，返回 (地址, 关闭函数)"""
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return f"http://127.0.0.1:{server.server_port}", server.shutdown
+
+
+def replay(send: Callable,
+           mix: Dict[str, int],
+           requests: int,
+           concurrency: int,
+           top_n: int,
+           seed: int) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    """按比例回放请求，返回 ({接口: 延迟列表}, {接口: 错误数}, 总耗时秒)"""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    plan = []
+    for _ in range(requests):
+        endpoint = rng.choices(names, weights)[0]
+        plan.append((endpoint,) + build_request(endpoint, rng, top_n))
+
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    lock = threading.Lock()
+
+    def run(item):
+        endpoint, method, path, body = item
+        start = time.perf_counter()
+        status = send(method, path, body)
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies[endpoint].append(elapsed)
+            if status >= 400:
+                errors[endpoint] += 1
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        for item in plan:
+            run(item)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(run, plan))
+    return latencies, errors, time.perf_counter() - start
+
+
+def summarize(samples: List[float], errors: int, duration: float) -> Dict:
+    """单个接口的统计"""
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / duration, 1) if duration else 0.0,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+    }
+
+
+def benchmark_engine(engine, requests: int, top_n: int, seed: int) -> Dict:
+    """直接调用引擎（不经过 HTTP 层）作为对照"""
+    rng = random.Random(seed)
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        requirements = random_requirements(rng)
+        t = time.perf_counter()
+        engine.get_recommendations(requirements, top_n=top_n)
+        latencies.append((time.perf_counter() - t) * 1000)
+    return summarize(latencies, 0, time.perf_counter() - start)
+
+
+def run_benchmark(sizes: List[int],
+                  requests: int,
+                  mix: Dict[str, int],
+                  transport: str = "client",
+                  concurrency: int = 1,
+                  top_n: int = 10,
+                  warmup_requests: int = 20,
+                  seed: int = 42) -> Dict[str, Dict]:
+    """
+    对每个领域规模回放混合请求
+
+    Returns:
+        {"<规模>/<接口>": 统计}
+    """
+    results: Dict[str, Dict] = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            db_path = os.path.join(tmp_dir, f"projects_{size}.db")
+            print(f"\n🧪 生成合成数据: 每领域 {size:,} 个项目...")
+            create_synthetic_database(db_path, size, seed)
+
+            api = load_app(db_path)
+            api.engine.warmup()
+
+            stop = None
+            if transport == "loopback":
+                base_url, stop = start_loopback_server(api.app)
+                send = loopback_sender(base_url)
+            else:
+                send = client_sender(api.app)
+
+            try:
+                # 预热请求（不计入结果）：填充各级缓存与连接
+                replay(send, mix, warmup_requests, 1, top_n, seed + 1)
+                latencies, errors, duration = replay(send, mix, requests, concurrency, top_n, seed)
+            finally:
+                if stop is not None:
+                    stop()
+
+            total = sum(len(samples) for samples in latencies.values())
+            results[f"{size}/all"] = summarize(
+                [x for samples in latencies.values() for x in samples], sum(errors.values()), duration)
+            for endpoint, samples in latencies.items():
+                if samples:
+                    results[f"{size}/{endpoint}"] = summarize(samples, errors[endpoint], duration)
+            results[f"{size}/engine"] = benchmark_engine(api.engine, min(requests, 200), top_n, seed)
+
+            print(f"  {'endpoint':18} {'requests':>8} {'errors':>6} {'rps':>9} "
+                  f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+            for key, stats in results.items():
+                if not key.startswith(f"{size}/"):
+                    continue
+                print(f"  {key.split('/', 1)[1]:18} {stats['requests']:>8} {stats['errors']:>6} "
+                      f"{stats['throughput_rps']:>9.1f} {stats['p50_ms']:>9.2f} "
+                      f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+            print(f"  共 {total} 个请求, {duration:.2f}s")
+
+    return results
+
+
+def compare_with_baseline(results: Dict[str, Dict],
+                          baseline: Dict[str, Dict],
+                          threshold: float = DEFAULT_THRESHOLD,
+                          min_delta_ms: float = MIN_DELTA_MS) -> List[str]:
+    """返回回退项说明（空列表表示无回退）"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            old, new = previous[metric], current[metric]
+            if new > old * (1 + threshold) and new - old >= min_delta_ms:
+                regressions.append(f"{key} {metric}: {old:.2f} → {new:.2f} ms (+{(new / old - 1) * 100:.0f}%)"
+                                   if old else f"{key} {metric}: {old:.2f} → {new:.2f} ms")
+
+        old, new = previous["throughput_rps"], current["throughput_rps"]
+        if old and new < old * (1 - threshold):
+            regressions.append(f"{key} throughput: {old:.1f} → {new:.1f} rps ({(new / old - 1) * 100:.0f}%)")
+
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{key} errors: {previous['errors']} → {current['errors']}")
+
+    return regressions
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="推荐 API 压测")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="每个领域的项目数")
+    parser.add_argument("--requests", type=int, default=500, help="每种规模回放的请求数")
+    parser.add_argument("--mix", help="请求比例，如 recommend=70,stats=10,domains=5"
+                                      f"（可用接口: {', '.join(DEFAULT_MIX)}）")
+    parser.add_argument("--transport", choices=["client", "loopback"], default="client",
+                        help="client: 进程内测试客户端；loopback: 本机 HTTP")
+    parser.add_argument("--concurrency", type=int, default=1, help="并发请求数")
+    parser.add_argument("--top-n", type=int, default=10, help="推荐数量")
+    parser.add_argument("--warmup-requests", type=int, default=20, help="预热请求数（不计入结果）")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--output", help="结果 JSON 输出路径")
+    parser.add_argument("--save-baseline", help="把本次结果保存为基线 JSON")
+    parser.add_argument("--baseline", help="与基线 JSON 比较，回退时以非零状态退出")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="回退阈值（相对变化，默认 0.25）")
+    parser.add_argument("--min-delta-ms", type=float, default=MIN_DELTA_MS,
+                        help="延迟变化小于该毫秒数时不视为回退")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("📊 推荐 API 压测")
+    print("=" * 80)
+
+    results = run_benchmark(
+        args.sizes, args.requests, parse_mix(args.mix),
+        transport=args.transport,
+        concurrency=args.concurrency,
+        top_n=args.top_n,
+        warmup_requests=args.warmup_requests,
+        seed=args.seed,
+    )
+
+    report = {
+        "config": {
+            "sizes": args.sizes,
+            "requests": args.requests,
+            "mix": parse_mix(args.mix),
+            "transport": args.transport,
+            "concurrency": args.concurrency,
+            "top_n": args.top_n,
+        },
+        "results": results,
+    }
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ 结果已保存到: {path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print("⚠️  基线的压测配置与本次不同，比较结果仅供参考")
+
+        regressions = compare_with_baseline(
+            results, baseline.get("results", {}), args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n❌ 发现 {len(regressions)} 项性能回退（阈值 {args.threshold:.0%}）:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\n✅ 与基线相比无回退（阈值 {args.threshold:.0%}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Ranking Benchmark
+推荐排序基准测试：生成合成数据库，测量不同领域规模下 get_recommendations 的 p50/p99 延迟
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from domain_stats import update_domain_stats
+from project_store import get_store
+from recommendation_engine import (
+    RecommendationEngine,
+    UserRequirements,
+    Domain,
+    Experience,
+    Budget
+)
+
+
+# 合成数据词表
+SYNTHETIC_WORDS = [
+    "ai", "latex", "gpt", "llm", "agent", "automation", "parametric", "cad",
+    "circuit", "pcb", "spice", "simulation", "verification", "ocr", "tikz",
+    "templates", "collaboration", "editor", "3d", "model", "design", "python",
+    "framework", "multi-agent", "routing", "generation", "formula", "writing",
+]
+SYNTHETIC_LANGUAGES = ["Python", "JavaScript", "TypeScript", "C++", "Rust", "Go", "Java", None]
+SYNTHETIC_LICENSES = ["MIT License", "Apache License 2.0", "GNU General Public License v3.0",
+                      "BSD 3-Clause \"New\" or \"Revised\" License", ""]
+PRIORITIES = ["performance", "ease_of_use", "features", "community"]
+
+
+def create_synthetic_database(db_path: str, projects_per_domain: int, seed: int = 42) -> int:
+    """生成合成项目数据库，返回写入的项目总数"""
+    rng = random.Random(seed)
+
+    today = datetime.now()
+    rows = []
+    for domain in Domain:
+        for i in range(projects_per_domain):
+            owner = f"{domain.value}-org{i % 997}"
+            name = f"{domain.value}-project-{i}"
+            description = " ".join(rng.choice(SYNTHETIC_WORDS) for _ in range(rng.randint(3, 14)))
+            rows.append((
+                domain.value,
+                name,
+                f"{owner}/{name}",
+                f"https://github.com/{owner}/{name}",
+                int(rng.paretovariate(1.1) * 20),
+                int(rng.paretovariate(1.2) * 4),
+                rng.randint(0, 500),
+                description if rng.random() > 0.05 else None,
+                rng.choice(SYNTHETIC_LANGUAGES),
+                (today - timedelta(days=rng.randint(0, 900))).strftime("%Y-%m-%d"),
+                (today - timedelta(days=rng.randint(900, 4000))).strftime("%Y-%m-%d"),
+                round(rng.uniform(0, 100), 2),
+                rng.choice(SYNTHETIC_LICENSES),
+                json.dumps(rng.sample(SYNTHETIC_WORDS, rng.randint(0, 5))),
+            ))
+
+    with get_store(db_path).transaction() as conn:
+        conn.executemany("""
+        INSERT OR REPLACE INTO projects (
+            domain, name, full_name, url, stars, forks, open_issues,
+            description, main_language, last_updated, created_at,
+            activity_score, license, topics
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        update_domain_stats(conn, [domain.value for domain in Domain])
+
+    return len(rows)
+
+
+def random_requirements(rng: random.Random) -> UserRequirements:
+    """随机生成一个用户需求画像"""
+    return UserRequirements(
+        domain=rng.choice(list(Domain)),
+        experience=rng.choice(list(Experience)),
+        budget=rng.choice(list(Budget)),
+        features=rng.sample(SYNTHETIC_WORDS, rng.randint(1, 4)),
+        priority=rng.choice(PRIORITIES),
+        language_preference=rng.sample(SYNTHETIC_LANGUAGES[:-1], rng.randint(0, 2)) or None
+    )
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def run_benchmark(sizes: List[int],
+                  requests: int,
+                  top_n: int,
+                  candidate_pool: int,
+                  seed: int = 42) -> List[Dict]:
+    """对每个领域规模分别测量精确排序与候选集模式的延迟"""
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            db_path = os.path.join(tmp_dir, f"projects_{size}.db")
+            print(f"\n🧪 生成合成数据: 每领域 {size:,} 个项目...")
+            create_synthetic_database(db_path, size, seed)
+
+            modes = {
+                "exact": RecommendationEngine(db_path=db_path),
+                "exact(uncached)": RecommendationEngine(db_path=db_path, cache_corpus=False),
+                f"candidates({candidate_pool})": RecommendationEngine(
+                    db_path=db_path, candidate_pool=candidate_pool),
+            }
+
+            for mode, engine in modes.items():
+                rng = random.Random(seed)
+                latencies = []
+                for _ in range(requests):
+                    requirements = random_requirements(rng)
+                    start = time.perf_counter()
+                    engine.get_recommendations(requirements, top_n=top_n)
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+                result = {
+                    "projects_per_domain": size,
+                    "mode": mode,
+                    "requests": requests,
+                    "p50_ms": round(percentile(latencies, 50), 2),
+                    "p99_ms": round(percentile(latencies, 99), 2),
+                }
+                results.append(result)
+                print(f"  {mode:20} p50 {result['p50_ms']:9.2f} ms | p99 {result['p99_ms']:9.2f} ms")
+
+    return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="推荐排序基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="每个领域的项目数")
+    parser.add_argument("--requests", type=int, default=100, help="每种规模的请求数")
+    parser.add_argument("--top-n", type=int, default=10, help="推荐数量")
+    parser.add_argument("--candidate-pool", type=int, default=500, help="候选集模式的每路候选数")
+    parser.add_argument("--output", help="结果 JSON 输出路径")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("📊 推荐排序基准测试")
+    print("=" * 80)
+
+    results = run_benchmark(args.sizes, args.requests, args.top_n, args.candidate_pool)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ 结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
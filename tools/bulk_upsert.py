@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Bulk Upsert
+采集器共用的批量写入：executemany + INSERT ... ON CONFLICT(full_name) DO UPDATE，
+按块写入同一个事务（ProjectStore 的读写连接，WAL 日志），倒排索引与领域排行榜在同一事务中刷新
+
+ON CONFLICT DO UPDATE 会触发 UPDATE 触发器，领域统计物化表保持一致（INSERT OR REPLACE 则不会）。
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, List
+
+from domain_stats import update_domain_stats
+from feature_index import index_projects
+from project_store import ProjectStore, get_store
+
+
+# 写入的列（与采集器生成的项目字典键一致）
+PROJECT_COLUMNS = (
+    "domain", "name", "full_name", "url", "stars", "forks", "watchers",
+    "open_issues", "description", "main_language", "last_updated",
+    "created_at", "activity_score", "license", "topics",
+)
+
+# 已存在的项目只刷新这些列（领域、名称、创建时间等保持首次采集的值）
+UPDATE_COLUMNS = (
+    "stars", "forks", "watchers", "open_issues", "description",
+    "last_updated", "activity_score", "license", "topics",
+)
+
+# 项目字典缺少某列时的默认值（与表定义一致）
+COLUMN_DEFAULTS = {
+    "stars": 0, "forks": 0, "watchers": 0, "open_issues": 0,
+    "activity_score": 0, "topics": "[]",
+}
+
+# 每次 executemany 的行数
+CHUNK_SIZE = 5000
+
+_INSERT = f"""
+INSERT INTO projects ({', '.join(PROJECT_COLUMNS)})
+VALUES ({', '.join('?' * len(PROJECT_COLUMNS))})
+"""
+
+UPSERT_SQL = _INSERT + f"""
+ON CONFLICT(full_name) DO UPDATE SET
+    {', '.join(f'{column} = excluded.{column}' for column in UPDATE_COLUMNS)},
+    collected_at = CURRENT_TIMESTAMP
+"""
+
+INSERT_NEW_SQL = _INSERT + "ON CONFLICT(full_name) DO NOTHING"
+
+
+def _row(project: Dict) -> tuple:
+    values = []
+    for column in PROJECT_COLUMNS:
+        value = project.get(column)
+        if value is None:
+            value = COLUMN_DEFAULTS.get(column)
+        elif column == "topics" and not isinstance(value, str):
+            value = json.dumps(value)
+        values.append(value)
+    return tuple(values)
+
+
+def upsert_projects(conn: sqlite3.Connection,
+                    projects: List[Dict],
+                    update: bool = True,
+                    chunk_size: int = CHUNK_SIZE) -> Dict:
+    """
+    批量写入项目（在调用方的事务中执行）
+
+    Args:
+        projects: 项目字典（键见 PROJECT_COLUMNS）
+        update: 已存在的项目是否刷新（False 时跳过已存在的项目）
+
+    Returns:
+        {"rows", "inserted", "updated", "skipped"}
+    """
+    sql = UPSERT_SQL if update else INSERT_NEW_SQL
+    before = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+    for start in range(0, len(projects), chunk_size):
+        conn.executemany(sql, [_row(p) for p in projects[start:start + chunk_size]])
+
+    inserted = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0] - before
+    existing = len(projects) - inserted
+    return {
+        "rows": len(projects),
+        "inserted": inserted,
+        "updated": existing if update else 0,
+        "skipped": 0 if update else existing,
+    }
+
+
+def save_projects(store: ProjectStore, projects: List[Dict], update: bool = True) -> Dict:
+    """
+    采集器入库：单个事务内批量写入、更新倒排索引与领域排行榜
+
+    Returns:
+        upsert_projects 的统计，另含 "seconds" 与 "rows_per_sec"
+    """
+    start = time.perf_counter()
+    with store.transaction() as conn:
+        result = upsert_projects(conn, projects, update=update)
+
+        # 更新功能倒排索引
+        index_projects(conn, [project["full_name"] for project in projects])
+
+        # 更新领域统计排行榜（聚合值由触发器维护）
+        update_domain_stats(conn, {project["domain"] for project in projects})
+
+    seconds = time.perf_counter() - start
+    result["seconds"] = round(seconds, 3)
+    result["rows_per_sec"] = round(len(projects) / seconds) if seconds > 0 else 0
+    return result
+
+
+def load_json_exports(paths: Iterable[str]) -> List[Dict]:
+    """读取 export_to_json 导出的文件（领域取自所在目录名，如 data/latex/projects.json）"""
+    projects = []
+    for path in paths:
+        domain = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        with open(path, "r", encoding="utf-8") as f:
+            for project in json.load(f):
+                projects.append({"domain": domain, **project})
+    return projects
+
+
+def main():
+    """把导出的 JSON 批量写回数据库"""
+    if len(sys.argv) < 3:
+        print("用法: python bulk_upsert.py <数据库> <data/领域/projects.json>...")
+        sys.exit(1)
+
+    db_path, paths = sys.argv[1], sys.argv[2:]
+    projects = load_json_exports(paths)
+    result = save_projects(get_store(db_path), projects)
+
+    print(f"💾 数据库保存: ✅ 新增 {result['inserted']} | 🔄 更新 {result['updated']} | "
+          f"{result['rows']:,} 行, {result['seconds']:.2f}s ({result['rows_per_sec']:,} 行/秒)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Commercial Tool Catalog
+商业工具目录：从版本化数据文件加载，加载时编译为类型化记录与列式数组，
+文件修改时间变化后自动重新加载，评分时只做字段查找
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from feature_index import tokenize
+
+
+DEFAULT_CATALOG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "data", "commercial_tools.json")
+
+# 预算与经验水平取值（与 recommendation_engine 中的枚举一致）
+BUDGETS = ("free", "low", "medium", "high")
+EXPERIENCE_BITS = {"beginner": 1, "intermediate": 2, "advanced": 4}
+
+# 价格文本中的月费金额，例如 "$4.99/mo"
+PRICE_PATTERN = re.compile(r"\$\s*(\d+(?:\.\d+)?)")
+
+
+class PriceTier(Enum):
+    """价格层级"""
+    OPEN_SOURCE = "open_source"
+    FREE = "free"
+    FREEMIUM = "freemium"
+    PAID = "paid"
+    USAGE_BASED = "usage_based"
+    ENTERPRISE = "enterprise"
+    UNKNOWN = "unknown"
+
+
+def parse_monthly_price(price: str) -> Optional[float]:
+    """解析价格文本中的第一个美元金额"""
+    match = PRICE_PATTERN.search(price or "")
+    return float(match.group(1)) if match else None
+
+
+def classify_price(price: str) -> PriceTier:
+    """根据价格文本判定价格层级"""
+    text = (price or "").lower()
+    if "open source" in text:
+        return PriceTier.OPEN_SOURCE
+    if "free" in text:
+        return PriceTier.FREEMIUM if "$" in text else PriceTier.FREE
+    if "enterprise" in text or "contact" in text:
+        return PriceTier.ENTERPRISE
+    if "usage" in text:
+        return PriceTier.USAGE_BASED
+    if "$" in text:
+        return PriceTier.PAID
+    return PriceTier.UNKNOWN
+
+
+def budget_points(price: str, monthly_price: Optional[float]) -> Dict[str, float]:
+    """价格匹配分 (30分)：每种预算下的得分"""
+    text = (price or "").lower()
+    points = dict.fromkeys(BUDGETS, 0.0)
+
+    if "free" in text or "open source" in text:
+        points["free"] = 30.0
+    elif monthly_price is not None and monthly_price <= 10:
+        points["free"] = 15.0
+
+    if "free" in text:
+        points["low"] = 20.0
+    elif "$" in text and "contact" not in text:
+        points["low"] = 30.0
+
+    if "pro" in text or "premium" in text:
+        points["medium"] = 30.0
+
+    if "enterprise" in text or "contact" in text:
+        points["high"] = 30.0
+
+    return points
+
+
+def experience_points(mask: int) -> Dict[str, float]:
+    """经验水平匹配分 (20分)：完全匹配 20 分，初学者可用中级工具 10 分"""
+    points = {}
+    for level, bit in EXPERIENCE_BITS.items():
+        if mask & bit:
+            points[level] = 20.0
+        elif level == "beginner" and mask & EXPERIENCE_BITS["intermediate"]:
+            points[level] = 10.0
+        else:
+            points[level] = 0.0
+    return points
+
+
+@dataclass(frozen=True, eq=False)
+class CommercialTool:
+    """编译后的商业工具记录（含字典字段，按对象身份比较与哈希）"""
+    domain: str
+    name: str
+    price: str
+    price_tier: PriceTier
+    monthly_price: Optional[float]
+    feature_terms: frozenset
+    experience_mask: int
+    activity_score: float
+    budget_points: Dict[str, float] = field(repr=False)
+    experience_points: Dict[str, float] = field(repr=False)
+    record: Dict = field(repr=False, compare=False)
+
+    @classmethod
+    def compile(cls, domain: str, record: Dict) -> "CommercialTool":
+        """由数据文件中的原始记录编译"""
+        price = record.get("price", "")
+        monthly_price = parse_monthly_price(price)
+        mask = 0
+        for level in record.get("experience_level", []):
+            mask |= EXPERIENCE_BITS.get(level, 0)
+
+        terms = set()
+        for feature in record.get("features", []):
+            terms.update(tokenize(feature))
+
+        return cls(
+            domain=domain,
+            name=record["name"],
+            price=price,
+            price_tier=classify_price(price),
+            monthly_price=monthly_price,
+            feature_terms=frozenset(terms),
+            experience_mask=mask,
+            activity_score=float(record.get("activity_score", 0)),
+            budget_points=budget_points(price, monthly_price),
+            experience_points=experience_points(mask),
+            record=record,
+        )
+
+    def matches(self, feature: str) -> bool:
+        """功能的所有 term 均出现在工具功能中即视为命中"""
+        tokens = tokenize(feature)
+        return bool(tokens) and all(token in self.feature_terms for token in tokens)
+
+    def to_dict(self) -> Dict:
+        """输出用的原始字段"""
+        return dict(self.record)
+
+
+class DomainCatalog:
+    """单个领域的商业工具（记录 + 列式数组 + 功能倒排表）"""
+
+    def __init__(self, tools: List[CommercialTool]):
+        self.tools = tools
+        size = len(tools)
+
+        self.budget_points = {
+            budget: np.array([t.budget_points[budget] for t in tools], dtype=np.float64)
+            for budget in BUDGETS
+        }
+        self.experience_points = {
+            level: np.array([t.experience_points[level] for t in tools], dtype=np.float64)
+            for level in EXPERIENCE_BITS
+        }
+        self.activity_points = np.array(
+            [(t.activity_score / 100) * 20 for t in tools], dtype=np.float64)
+
+        postings: Dict[str, List[int]] = {}
+        for position, tool in enumerate(tools):
+            for term in tool.feature_terms:
+                postings.setdefault(term, []).append(position)
+        self.postings = {term: np.array(rows, dtype=np.int64) for term, rows in postings.items()}
+        self.size = size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def feature_hits(self, feature: str) -> np.ndarray:
+        """命中某功能的工具掩码"""
+        hits = np.zeros(self.size, dtype=bool)
+        tokens = tokenize(feature)
+        if not tokens or any(token not in self.postings for token in tokens):
+            return hits
+        rows = self.postings[tokens[0]]
+        for token in tokens[1:]:
+            rows = np.intersect1d(rows, self.postings[token], assume_unique=True)
+        hits[rows] = True
+        return hits
+
+
+def score_commercial(catalog: DomainCatalog, requirements) -> np.ndarray:
+    """
+    整域计算商业工具相关度 (0-100)
+
+    与 RecommendationEngine.calculate_commercial_score 逐位一致：
+    四个分项按相同顺序以 float64 累加。
+    """
+    # 1. 价格匹配 (30分)
+    score = catalog.budget_points[requirements.budget.value].copy()
+
+    # 2. 经验水平匹配 (20分)
+    score += catalog.experience_points[requirements.experience.value]
+
+    # 3. 功能匹配 (30分)
+    if requirements.features:
+        matched = np.sum([catalog.feature_hits(f) for f in requirements.features], axis=0)
+        score += (matched / len(requirements.features)) * 30
+
+    # 4. 活跃度和用户基数 (20分)
+    score += catalog.activity_points
+
+    return np.minimum(score, 100.0)
+
+
+class CatalogSnapshot:
+    """某一版本的完整目录（加载后只读）"""
+
+    def __init__(self, version: str, mtime_ns: int, domains: Dict[str, DomainCatalog]):
+        self.version = version
+        self.mtime_ns = mtime_ns
+        self.domains = domains
+        self.checked_at = time.monotonic()
+
+    def domain(self, name: str) -> DomainCatalog:
+        return self.domains.get(name) or DomainCatalog([])
+
+
+def load_catalog(path: str) -> CatalogSnapshot:
+    """读取并编译目录文件"""
+    mtime_ns = os.stat(path).st_mtime_ns
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    domains = {
+        domain: DomainCatalog([CommercialTool.compile(domain, record) for record in records])
+        for domain, records in data.get("domains", {}).items()
+    }
+    version = f"{data.get('version', '')}@{mtime_ns}"
+    return CatalogSnapshot(version, mtime_ns, domains)
+
+
+class CommercialCatalog:
+    """
+    商业工具目录（热加载）
+
+    每 check_interval 秒最多检查一次文件修改时间，变化时在锁外重新编译并整体替换；
+    新文件解析失败时保留旧目录。
+    """
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot = load_catalog(path)
+        self._reload_lock = threading.Lock()
+        self._failed_mtime_ns: Optional[int] = None
+
+    def snapshot(self) -> CatalogSnapshot:
+        """当前目录，必要时重新加载"""
+        snapshot = self._snapshot
+        if time.monotonic() - snapshot.checked_at < self.check_interval:
+            return snapshot
+
+        with self._reload_lock:
+            snapshot = self._snapshot
+            if time.monotonic() - snapshot.checked_at < self.check_interval:
+                return snapshot
+            try:
+                mtime_ns = os.stat(self.path).st_mtime_ns
+            except OSError as e:
+                print(f"⚠️  商业工具目录不可读，继续使用旧版本: {e}")
+                mtime_ns = snapshot.mtime_ns
+
+            if mtime_ns not in (snapshot.mtime_ns, self._failed_mtime_ns):
+                try:
+                    self._snapshot = load_catalog(self.path)
+                    print(f"🔄 商业工具目录已重新加载: {self._snapshot.version}")
+                    return self._snapshot
+                except Exception as e:
+                    # 任何解析或结构错误都保留旧目录（每个请求都会触发检查）；
+                    # 同一份损坏文件只报告一次，文件再次修改后重试
+                    self._failed_mtime_ns = mtime_ns
+                    print(f"⚠️  商业工具目录重新加载失败，继续使用旧版本: {type(e).__name__}: {e}")
+
+            snapshot.checked_at = time.monotonic()
+            return snapshot
+
+    @property
+    def version(self) -> str:
+        return self.snapshot().version
+
+    def domain(self, name: str) -> DomainCatalog:
+        return self.snapshot().domain(name)
+
+    def to_dict(self) -> Dict[str, List[Dict]]:
+        """{领域: [工具原始字段]}"""
+        return {
+            name: [tool.to_dict() for tool in catalog.tools]
+            for name, catalog in self.snapshot().domains.items()
+        }
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Domain Corpus Cache
+按领域缓存解析后的项目语料，以数据版本判定是否需要重新加载
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from base_scores import BaseTable, compute_base_table
+from feature_index import FeatureIndex
+from scoring_kernel import DomainColumns
+
+
+class DomainCorpus:
+    """领域语料：解析后的项目、列式数据、倒排索引与基础分表（加载后只读）"""
+
+    def __init__(self,
+                 domain: str,
+                 version: str,
+                 projects: Sequence[Dict],
+                 feature_index: Optional[FeatureIndex] = None,
+                 base_tables: Optional[Dict[Tuple[str, str], BaseTable]] = None,
+                 columns: Optional[DomainColumns] = None,
+                 nbytes: Optional[int] = None):
+        """
+        columns / nbytes 可由调用方直接提供（如 mmap 快照），此时不遍历项目记录
+        """
+        self.domain = domain
+        self.version = version
+        self.projects = projects
+        self.columns = columns if columns is not None else DomainColumns(projects, feature_index)
+        self._base_tables: Dict[Tuple[str, str], BaseTable] = dict(base_tables or {})
+        self._base_lock = threading.Lock()
+        self._positions: Optional[Dict[int, int]] = None
+        self.nbytes = nbytes if nbytes is not None else self._estimate_nbytes()
+        self.checked_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.projects)
+
+    def position_of(self, project_id: int) -> Optional[int]:
+        """项目 id 对应的行号（首次调用时建立映射；快照记录自带 id 索引）"""
+        if hasattr(self.projects, "position_of"):
+            return self.projects.position_of(project_id)
+        if self._positions is None:
+            self._positions = {p['id']: i for i, p in enumerate(self.projects)}
+        return self._positions.get(project_id)
+
+    def base_table(self, experience: str, priority: str) -> BaseTable:
+        """(基础分, 降序行号)：优先使用预计算文件，否则首次使用时计算"""
+        key = (experience, priority)
+        table = self._base_tables.get(key)
+        if table is None:
+            table = compute_base_table(self.columns, experience, priority)
+            with self._base_lock:
+                table = self._base_tables.setdefault(key, table)
+        return table
+
+    def _estimate_nbytes(self) -> int:
+        """估算内存占用（项目字典 + 列式数组 + 倒排索引）"""
+        total = sys.getsizeof(self.projects) + self.columns.nbytes
+        for project in self.projects:
+            total += sys.getsizeof(project)
+            for value in project.values():
+                total += sys.getsizeof(value)
+        return total
+
+
+class CorpusCache:
+    """
+    领域语料缓存
+
+    - 懒加载：首次访问或数据版本变化时才读取数据库
+    - 版本检查节流：每个领域最多每 check_interval 秒查询一次版本
+    - 原子替换：新语料在锁外构建完成后整体替换，读取方始终拿到完整语料
+    - 可选内存上限：超出后按 LRU 淘汰其他领域
+    """
+
+    def __init__(self,
+                 loader: Callable[[str], DomainCorpus],
+                 version_of: Callable[[str], str],
+                 max_bytes: Optional[int] = None,
+                 check_interval: float = 1.0):
+        self.loader = loader
+        self.version_of = version_of
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval
+
+        self._entries: "OrderedDict[str, DomainCorpus]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, domain: str) -> DomainCorpus:
+        """获取领域语料，必要时重新加载"""
+        with self._lock:
+            corpus = self._entries.get(domain)
+            if corpus is not None:
+                self._entries.move_to_end(domain)
+                if time.monotonic() - corpus.checked_at < self.check_interval:
+                    self.hits += 1
+                    return corpus
+
+        if corpus is not None and self.version_of(domain) == corpus.version:
+            corpus.checked_at = time.monotonic()
+            self.hits += 1
+            return corpus
+
+        # 同一领域只允许一个线程重新加载
+        with self._load_lock(domain):
+            with self._lock:
+                current = self._entries.get(domain)
+            if current is not None and current is not corpus:
+                self.hits += 1
+                return current
+
+            self.misses += 1
+            fresh = self.loader(domain)
+            with self._lock:
+                self._entries[domain] = fresh
+                self._entries.move_to_end(domain)
+                self._evict()
+            return fresh
+
+    def invalidate(self, domain: Optional[str] = None):
+        """丢弃缓存（None 表示全部领域）"""
+        with self._lock:
+            if domain is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(domain, None)
+
+    @property
+    def nbytes(self) -> int:
+        """当前缓存的语料总大小（估算）"""
+        with self._lock:
+            return sum(corpus.nbytes for corpus in self._entries.values())
+
+    def domains(self) -> Dict[str, DomainCorpus]:
+        """当前缓存的领域语料快照"""
+        with self._lock:
+            return dict(self._entries)
+
+    def _load_lock(self, domain: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(domain, threading.Lock())
+
+    def _evict(self):
+        """超出内存上限时淘汰最久未使用的领域（至少保留最新加载的一个）"""
+        if self.max_bytes is None:
+            return
+        total = sum(corpus.nbytes for corpus in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted.nbytes
+            self.evictions += 1
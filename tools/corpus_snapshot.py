@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Corpus Snapshot
+领域语料只读快照：列式数组、功能倒排表、基础分表与项目记录写入同一个二进制文件，
+各 worker 进程以 mmap 只读映射，共享同一份页缓存，启动时无需读取 SQLite、解析项目
+
+文件结构（小端）：
+    MAGIC | 按 64 字节对齐的数组区 | JSON 目录 | 目录偏移 (u64) | 目录长度 (u64) | MAGIC
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from base_scores import EXPERIENCES
+from corpus_cache import DomainCorpus
+from feature_index import FeatureIndex
+from scoring_kernel import PRIORITIES, DomainColumns
+
+
+MAGIC = b"AICSNAP1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+TRAILER = struct.Struct("<QQ")
+
+
+def snapshot_path(db_path: str) -> str:
+    """快照文件路径（与数据库同目录）"""
+    return os.path.splitext(db_path)[0] + ".corpus.snap"
+
+
+class SnapshotProjects(Sequence):
+    """快照中的项目记录：按行号读取时才解码，不在进程内保留全部项目字典"""
+
+    def __init__(self,
+                 records: np.ndarray,
+                 offsets: np.ndarray,
+                 ids: np.ndarray,
+                 sorted_ids: np.ndarray,
+                 id_order: np.ndarray):
+        self._records = records
+        self._offsets = offsets
+        self.ids = ids
+        self._sorted_ids = sorted_ids
+        self._id_order = id_order
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return json.loads(self._records[start:end].tobytes())
+
+    def position_of(self, project_id: int) -> Optional[int]:
+        """项目 id 对应的行号（二分查找）"""
+        slot = int(np.searchsorted(self._sorted_ids, project_id))
+        if slot < len(self._sorted_ids) and self._sorted_ids[slot] == project_id:
+            return int(self._id_order[slot])
+        return None
+
+
+class CSRPostings(Mapping):
+    """倒排表的只读视图：term → 行号数组（按需切片，不复制）"""
+
+    def __init__(self, terms: List[str], offsets: np.ndarray, rows: np.ndarray):
+        self._index = {term: i for i, term in enumerate(terms)}
+        self._offsets = offsets
+        self._rows = rows
+
+    def __getitem__(self, term: str) -> np.ndarray:
+        i = self._index[term]
+        return self._rows[self._offsets[i]:self._offsets[i + 1]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class _SnapshotWriter:
+    """顺序写入对齐的数组，记录 (偏移, dtype, 长度)"""
+
+    def __init__(self, f):
+        self.f = f
+        self.f.write(MAGIC)
+
+    def array(self, values: np.ndarray) -> List:
+        values = np.ascontiguousarray(values)
+        padding = -self.f.tell() % ALIGNMENT
+        self.f.write(b"\0" * padding)
+        offset = self.f.tell()
+        self.f.write(values.tobytes())
+        return [offset, values.dtype.str, int(values.size)]
+
+    def finish(self, directory: Dict):
+        payload = json.dumps(directory, ensure_ascii=False).encode("utf-8")
+        offset = self.f.tell()
+        self.f.write(payload)
+        self.f.write(TRAILER.pack(offset, len(payload)))
+        self.f.write(MAGIC)
+
+
+def _write_domain(writer: _SnapshotWriter, corpus: DomainCorpus) -> Dict:
+    """写入单个领域，返回其目录项"""
+    columns = corpus.columns
+    arrays = {name: writer.array(getattr(columns, name)) for name in DomainColumns.ARRAYS}
+
+    # 项目记录：逐行 JSON + 偏移
+    encoded = [json.dumps(p, ensure_ascii=False).encode("utf-8") for p in corpus.projects]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    arrays["record_offsets"] = writer.array(offsets)
+    arrays["records"] = writer.array(np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    ids = np.array([p['id'] for p in corpus.projects], dtype=np.int64)
+    arrays["ids"] = writer.array(ids)
+    id_order = np.argsort(ids, kind="stable")
+    arrays["sorted_ids"] = writer.array(ids[id_order])
+    arrays["id_order"] = writer.array(id_order)
+
+    # 功能倒排表（CSR）
+    postings = columns.feature_index.postings
+    terms = sorted(postings)
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum([len(postings[t]) for t in terms], out=term_offsets[1:])
+    rows = np.concatenate([postings[t] for t in terms]) if terms else np.zeros(0, dtype=np.int64)
+    arrays["term_offsets"] = writer.array(term_offsets)
+    arrays["term_rows"] = writer.array(rows.astype(np.int64))
+
+    # 基础分表
+    for experience in EXPERIENCES:
+        for priority in PRIORITIES:
+            base, order = corpus.base_table(experience, priority)
+            arrays[f"base/{experience}/{priority}"] = writer.array(base)
+            arrays[f"order/{experience}/{priority}"] = writer.array(order)
+
+    return {
+        "version": corpus.version,
+        "language_vocab": columns.language_vocab,
+        "terms": terms,
+        "arrays": arrays,
+    }
+
+
+def build_snapshot(db_path: str, output_path: Optional[str] = None) -> str:
+    """
+    为所有领域构建语料快照
+
+    Returns:
+        输出文件路径
+    """
+    # 延迟导入，避免与 recommendation_engine 循环依赖
+    from recommendation_engine import RecommendationEngine, Domain
+
+    output_path = output_path or snapshot_path(db_path)
+    engine = RecommendationEngine(db_path=db_path, result_cache_size=0, ranking_cache_size=0)
+
+    # 先写临时文件再替换：已映射旧文件的进程不受影响
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        writer = _SnapshotWriter(f)
+        domains = {}
+        for domain in Domain:
+            corpus = engine.get_corpus(domain.value)
+            domains[domain.value] = _write_domain(writer, corpus)
+            print(f"  {domain.value:12} - {len(corpus):,} 个项目")
+        writer.finish({"format": FORMAT_VERSION, "domains": domains})
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, output_path)
+
+    return output_path
+
+
+class CorpusSnapshot:
+    """只读映射的语料快照（映射在进程生命周期内保持打开）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        size = len(self._mmap)
+        tail = len(MAGIC) + TRAILER.size
+        if size < len(MAGIC) + tail or self._mmap[:len(MAGIC)] != MAGIC or self._mmap[-len(MAGIC):] != MAGIC:
+            raise ValueError(f"Not a corpus snapshot: {path}")
+        offset, length = TRAILER.unpack(self._mmap[size - tail:size - len(MAGIC)])
+        directory = json.loads(self._mmap[offset:offset + length])
+        if directory.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format: {directory.get('format')}")
+
+        self.domains: Dict[str, Dict] = directory["domains"]
+        self.nbytes = size
+
+    def _array(self, spec: List) -> np.ndarray:
+        offset, dtype, count = spec
+        return np.frombuffer(self._mmap, dtype=np.dtype(dtype), count=count, offset=offset)
+
+    def version(self, domain: str) -> Optional[str]:
+        entry = self.domains.get(domain)
+        return entry["version"] if entry else None
+
+    def corpus(self, domain: str, version: Optional[str] = None) -> Optional[DomainCorpus]:
+        """
+        领域语料（数组均为映射视图）
+
+        快照中没有该领域或数据版本与 version 不一致时返回 None。
+        """
+        entry = self.domains.get(domain)
+        if entry is None or (version is not None and entry["version"] != version):
+            return None
+
+        arrays = {name: self._array(spec) for name, spec in entry["arrays"].items()}
+        feature_index = FeatureIndex(
+            CSRPostings(entry["terms"], arrays["term_offsets"], arrays["term_rows"]),
+            len(arrays["ids"])
+        )
+        columns = DomainColumns.from_arrays(arrays, entry["language_vocab"], feature_index)
+        projects = SnapshotProjects(
+            arrays["records"], arrays["record_offsets"],
+            arrays["ids"], arrays["sorted_ids"], arrays["id_order"])
+        base_tables = {
+            (experience, priority): (
+                arrays[f"base/{experience}/{priority}"],
+                arrays[f"order/{experience}/{priority}"],
+            )
+            for experience in EXPERIENCES
+            for priority in PRIORITIES
+        }
+        nbytes = sum(spec[2] * np.dtype(spec[1]).itemsize for spec in entry["arrays"].values())
+
+        return DomainCorpus(domain, entry["version"], projects,
+                            base_tables=base_tables, columns=columns, nbytes=nbytes)
+
+
+def main():
+    """主函数"""
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "../data/projects.db"
+    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+
+    print("\n📦 构建语料快照...")
+    output_path = build_snapshot(db_path, output_path)
+    print(f"\n✅ 语料快照已保存到: {output_path} ({os.path.getsize(output_path) / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,20 +5,25 @@
 """
 
 import subprocess
-import json
-import sqlite3
 import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Set
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import defaultdict
 
+from bulk_upsert import save_projects
+from project_store import get_store
+from search_cache import OfflineCacheMiss, SearchCache, gh_search_repos, search_cache_path
+
 
 class DeepSearchEngine:
     """深度搜索引擎"""
 
     def __init__(self, db_path: str = "../data/projects.db"):
         self.db_path = db_path
+        self.store = get_store(db_path)
+        # 搜索结果缓存：重复运行时直接使用本地结果（SEARCH_CACHE_OFFLINE=1 时不访问网络）
+        self.search_cache = SearchCache(search_cache_path(db_path))
         self.existing_repos: Set[str] = self._load_existing_repos()
 
         # 扩展搜索关键词库
@@ -136,12 +141,8 @@ class DeepSearchEngine:
     def _load_existing_repos(self) -> Set[str]:
         """加载已存在的仓库，避免重复"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT full_name FROM projects")
-            repos = {row[0] for row in cursor.fetchall()}
-            conn.close()
-            return repos
+            cursor = self.store.reader().execute("SELECT full_name FROM projects")
+            return {row[0] for row in cursor.fetchall()}
         except:
             return set()
 
@@ -150,21 +151,7 @@ class DeepSearchEngine:
         print(f"  🔍 搜索: {query[:50]}...")
 
         try:
-            cmd = [
-                "gh", "search", "repos",
-                query,
-                "--limit", str(limit),
-                "--sort", "stars",
-                "--json", "name,owner,stargazersCount,forksCount,description,url,updatedAt,createdAt,language,license,openIssuesCount"
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
-            if result.returncode != 0:
-                print(f"    ❌ 搜索失败: {result.stderr[:100]}")
-                return {"query": query, "domain": domain, "count": 0}, []
-
-            repos = json.loads(result.stdout)
+            repos = gh_search_repos(self.search_cache, query, limit, timeout=30)
 
             # 过滤已存在的仓库
             new_repos = []
@@ -183,6 +170,12 @@ class DeepSearchEngine:
                 "total": len(repos)
             }, new_repos
 
+        except subprocess.CalledProcessError as e:
+            print(f"    ❌ 搜索失败: {e.stderr[:100]}")
+            return {"query": query, "domain": domain, "count": 0}, []
+        except OfflineCacheMiss:
+            print(f"    📴 离线模式：缓存中没有该查询")
+            return {"query": query, "domain": domain, "count": 0, "error": "offline"}, []
         except subprocess.TimeoutExpired:
             print(f"    ⏱️  搜索超时")
             return {"query": query, "domain": domain, "count": 0, "error": "timeout"}, []
@@ -256,33 +249,18 @@ class DeepSearchEngine:
         return round(score, 2)
 
     def save_to_database(self, repos: List[Dict], domain: str):
-        """保存到数据库"""
+        """保存到数据库（已存在的项目跳过）"""
         if not repos:
             return 0
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        saved_count = 0
+        projects = []
         for repo in repos:
+            full_name = repo.get("name", "")
             try:
                 owner_login = repo["owner"]["login"]
                 name = repo["name"]
                 full_name = f"{owner_login}/{name}"
 
-                # 检查是否已存在
-                cursor.execute("SELECT COUNT(*) FROM projects WHERE full_name = ?", (full_name,))
-                if cursor.fetchone()[0] > 0:
-                    continue
-
-                stars = repo.get("stargazersCount", 0)
-                forks = repo.get("forksCount", 0)
-                description = repo.get("description", "")
-                url = repo.get("url", "")
-                updated_at = repo.get("updatedAt", "")
-                created_at = repo.get("createdAt", "")
-                language = repo.get("language", "")
-
                 license_name = ""
                 if repo.get("license"):
                     if isinstance(repo["license"], dict):
@@ -290,33 +268,32 @@ class DeepSearchEngine:
                     else:
                         license_name = repo["license"]
 
-                # 计算质量分数
-                quality_score = self.calculate_quality_score(repo)
-
                 # 注意：数据库中没有 owner 列，owner 信息包含在 full_name 中
-                open_issues = repo.get("openIssuesCount", 0)
-
-                cursor.execute("""
-                INSERT INTO projects (
-                    domain, name, full_name, url, description,
-                    stars, forks, open_issues, main_language, license, topics,
-                    created_at, last_updated, activity_score
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    domain, name, full_name, url, description,
-                    stars, forks, open_issues, language, license_name, "[]",
-                    created_at, updated_at, quality_score
-                ))
-
-                saved_count += 1
+                projects.append({
+                    "domain": domain,
+                    "name": name,
+                    "full_name": full_name,
+                    "url": repo.get("url", ""),
+                    "description": repo.get("description", ""),
+                    "stars": repo.get("stargazersCount", 0),
+                    "forks": repo.get("forksCount", 0),
+                    "open_issues": repo.get("openIssuesCount", 0),
+                    "main_language": repo.get("language", ""),
+                    "license": license_name,
+                    "topics": "[]",
+                    "created_at": repo.get("createdAt", ""),
+                    "last_updated": repo.get("updatedAt", ""),
+                    "activity_score": self.calculate_quality_score(repo),  # 质量分数
+                })
 
             except Exception as e:
                 print(f"    ⚠️  保存失败 {full_name}: {str(e)[:50]}")
 
-        conn.commit()
-        conn.close()
+        if not projects:
+            return 0
 
-        return saved_count
+        result = save_projects(self.store, projects, update=False)
+        return result["inserted"]
 
     def parallel_deep_search(self, domains: List[str], max_workers: int = 10):
         """并行深度搜索"""
@@ -416,6 +393,7 @@ def main():
 
     stats, total = engine.parallel_deep_search(domains, max_workers=10)
 
+    print(engine.search_cache.report())
     print(f"\n✅ 深度搜索完成！新增 {total} 个项目")
 
 
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Materialized Domain Statistics
+领域统计物化表：按领域维护项目数、Stars/活跃度汇总与 Stars 排行榜，
+统计接口只读这两张小表，延迟不随 projects 表增长
+
+- domain_stats: 由 projects 表上的触发器在写入事务中增量维护
+- domain_leaderboard: 由采集器的 save_to_database 在同一事务中刷新（沿 idx_domain_stars 只读前几行）
+
+- data_version: 按领域的数据版本（写入计数 + 最近采集时间），由触发器在每次写入时递增，
+  语料缓存与 ETag 读取它而不扫描 projects 表
+
+注意：INSERT OR REPLACE 覆盖已有行时不会触发 DELETE 触发器，此类写入后需调用 rebuild_domain_stats。
+触发器内不使用 OR IGNORE：外层语句的冲突策略（如 OR REPLACE）会覆盖触发器内的冲突子句。
+"""
+
+import sqlite3
+import sys
+from typing import Dict, Iterable, List, Optional
+
+
+# 每个领域保留的排行榜长度
+LEADERBOARD_SIZE = 5
+
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS domain_stats (
+    domain TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0,
+    stars_count INTEGER NOT NULL DEFAULT 0,
+    sum_stars INTEGER NOT NULL DEFAULT 0,
+    max_stars INTEGER,
+    min_stars INTEGER,
+    activity_count INTEGER NOT NULL DEFAULT 0,
+    sum_activity REAL NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS domain_leaderboard (
+    domain TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    name TEXT,
+    full_name TEXT,
+    stars INTEGER,
+    description TEXT,
+    PRIMARY KEY (domain, rank)
+);
+
+CREATE INDEX IF NOT EXISTS idx_domain_stars ON projects(domain, stars DESC);
+
+CREATE TRIGGER IF NOT EXISTS trg_domain_stats_insert AFTER INSERT ON projects
+BEGIN
+    INSERT INTO domain_stats (domain)
+    SELECT NEW.domain WHERE NOT EXISTS (SELECT 1 FROM domain_stats WHERE domain = NEW.domain);
+    UPDATE domain_stats SET
+        count = count + 1,
+        stars_count = stars_count + (NEW.stars IS NOT NULL),
+        sum_stars = sum_stars + COALESCE(NEW.stars, 0),
+        activity_count = activity_count + (NEW.activity_score IS NOT NULL),
+        sum_activity = sum_activity + COALESCE(NEW.activity_score, 0),
+        max_stars = (SELECT MAX(stars) FROM projects WHERE domain = NEW.domain),
+        min_stars = (SELECT MIN(stars) FROM projects WHERE domain = NEW.domain)
+    WHERE domain = NEW.domain;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_domain_stats_delete AFTER DELETE ON projects
+BEGIN
+    UPDATE domain_stats SET
+        count = count - 1,
+        stars_count = stars_count - (OLD.stars IS NOT NULL),
+        sum_stars = sum_stars - COALESCE(OLD.stars, 0),
+        activity_count = activity_count - (OLD.activity_score IS NOT NULL),
+        sum_activity = sum_activity - COALESCE(OLD.activity_score, 0),
+        max_stars = (SELECT MAX(stars) FROM projects WHERE domain = OLD.domain),
+        min_stars = (SELECT MIN(stars) FROM projects WHERE domain = OLD.domain)
+    WHERE domain = OLD.domain;
+    DELETE FROM domain_stats WHERE domain = OLD.domain AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_domain_stats_update
+AFTER UPDATE OF domain, stars, activity_score ON projects
+BEGIN
+    UPDATE domain_stats SET
+        count = count - 1,
+        stars_count = stars_count - (OLD.stars IS NOT NULL),
+        sum_stars = sum_stars - COALESCE(OLD.stars, 0),
+        activity_count = activity_count - (OLD.activity_score IS NOT NULL),
+        sum_activity = sum_activity - COALESCE(OLD.activity_score, 0)
+    WHERE domain = OLD.domain;
+    INSERT INTO domain_stats (domain)
+    SELECT NEW.domain WHERE NOT EXISTS (SELECT 1 FROM domain_stats WHERE domain = NEW.domain);
+    UPDATE domain_stats SET
+        count = count + 1,
+        stars_count = stars_count + (NEW.stars IS NOT NULL),
+        sum_stars = sum_stars + COALESCE(NEW.stars, 0),
+        activity_count = activity_count + (NEW.activity_score IS NOT NULL),
+        sum_activity = sum_activity + COALESCE(NEW.activity_score, 0)
+    WHERE domain = NEW.domain;
+    UPDATE domain_stats SET
+        max_stars = (SELECT MAX(stars) FROM projects WHERE domain = domain_stats.domain),
+        min_stars = (SELECT MIN(stars) FROM projects WHERE domain = domain_stats.domain)
+    WHERE domain IN (OLD.domain, NEW.domain);
+    DELETE FROM domain_stats WHERE domain = OLD.domain AND count <= 0;
+END;
+"""
+
+
+# 数据版本：行只增不删（总版本取各领域之和，单调递增）；新领域的初始计数取当前毫秒时间戳，
+# 重建的数据库不会复用旧数据库的版本号。DELETE 无采集时间，按删除时间计。
+DATA_VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS data_version (
+    domain TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    last_collected TEXT
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_data_version_insert AFTER INSERT ON projects
+BEGIN
+    INSERT INTO data_version (domain, version)
+    SELECT NEW.domain, CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)
+    WHERE NOT EXISTS (SELECT 1 FROM data_version WHERE domain = NEW.domain);
+    UPDATE data_version SET
+        version = version + 1,
+        last_collected = MAX(COALESCE(last_collected, ''), COALESCE(NEW.collected_at, CURRENT_TIMESTAMP))
+    WHERE domain = NEW.domain;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_data_version_update AFTER UPDATE ON projects
+BEGIN
+    INSERT INTO data_version (domain, version)
+    SELECT NEW.domain, CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)
+    WHERE NOT EXISTS (SELECT 1 FROM data_version WHERE domain = NEW.domain);
+    UPDATE data_version SET
+        version = version + 1,
+        last_collected = MAX(COALESCE(last_collected, ''), COALESCE(NEW.collected_at, CURRENT_TIMESTAMP))
+    WHERE domain IN (OLD.domain, NEW.domain);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_data_version_delete AFTER DELETE ON projects
+BEGIN
+    UPDATE data_version SET
+        version = version + 1,
+        last_collected = MAX(COALESCE(last_collected, ''), CURRENT_TIMESTAMP)
+    WHERE domain = OLD.domain;
+END;
+"""
+
+
+def has_domain_stats(conn: sqlite3.Connection) -> bool:
+    """数据库中是否已有统计物化表"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'domain_stats'"
+    ).fetchone()
+    return row is not None
+
+
+def ensure_domain_stats(conn: sqlite3.Connection):
+    """创建统计表与触发器；首次创建时从 projects 表回填（在调用方的事务中执行）"""
+    if has_domain_stats(conn):
+        return
+    for statement in STATS_SCHEMA.split(";\n\n"):
+        conn.execute(statement)
+    rebuild_domain_stats(conn)
+
+
+def has_data_version(conn: sqlite3.Connection) -> bool:
+    """数据库中是否已有数据版本表"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'data_version'"
+    ).fetchone()
+    return row is not None
+
+
+def ensure_data_version(conn: sqlite3.Connection):
+    """创建数据版本表与触发器；首次创建时按领域初始化（在调用方的事务中执行）"""
+    if has_data_version(conn):
+        return
+    for statement in DATA_VERSION_SCHEMA.split(";\n\n"):
+        conn.execute(statement)
+    conn.execute("""
+    INSERT INTO data_version (domain, version, last_collected)
+    SELECT domain, CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER), MAX(collected_at)
+    FROM projects
+    GROUP BY domain
+    """)
+
+
+def read_data_version(conn: sqlite3.Connection, domain: Optional[str] = None) -> Optional[str]:
+    """
+    数据版本 "最近采集时间#写入计数"（domain 为 None 时为整个数据库）
+
+    数据库尚未建立数据版本表时返回 None
+    """
+    if not has_data_version(conn):
+        return None
+    if domain is None:
+        latest, version = conn.execute(
+            "SELECT MAX(last_collected), SUM(version) FROM data_version").fetchone()
+    else:
+        row = conn.execute(
+            "SELECT last_collected, version FROM data_version WHERE domain = ?", (domain,)).fetchone()
+        latest, version = row or (None, None)
+    return f"{latest or ''}#{version or 0}"
+
+
+def rebuild_domain_stats(conn: sqlite3.Connection):
+    """从 projects 表完整重算统计与排行榜"""
+    conn.execute("DELETE FROM domain_stats")
+    conn.execute("""
+    INSERT INTO domain_stats (
+        domain, count, stars_count, sum_stars, max_stars, min_stars,
+        activity_count, sum_activity
+    )
+    SELECT domain, COUNT(*), COUNT(stars), COALESCE(SUM(stars), 0), MAX(stars), MIN(stars),
+           COUNT(activity_score), COALESCE(SUM(activity_score), 0)
+    FROM projects
+    GROUP BY domain
+    """)
+    domains = [row[0] for row in conn.execute("SELECT domain FROM domain_stats")]
+    conn.execute("DELETE FROM domain_leaderboard")
+    refresh_leaderboards(conn, domains)
+
+
+def refresh_leaderboards(conn: sqlite3.Connection, domains: Iterable[str]):
+    """刷新指定领域的 Stars 排行榜（在调用方的事务中执行）"""
+    for domain in set(domains):
+        conn.execute("DELETE FROM domain_leaderboard WHERE domain = ?", (domain,))
+        conn.execute("""
+        INSERT INTO domain_leaderboard (domain, rank, project_id, name, full_name, stars, description)
+        SELECT domain, ROW_NUMBER() OVER (ORDER BY stars DESC, id), id, name, full_name, stars, description
+        FROM (
+            SELECT * FROM projects WHERE domain = ? ORDER BY stars DESC, id LIMIT ?
+        )
+        """, (domain, LEADERBOARD_SIZE))
+
+
+def update_domain_stats(conn: sqlite3.Connection, domains: Iterable[str]):
+    """入库后调用：确保物化表存在并刷新写入领域的排行榜"""
+    ensure_domain_stats(conn)
+    refresh_leaderboards(conn, domains)
+
+
+def get_domain_stats(conn: sqlite3.Connection, domain: Optional[str] = None) -> Optional[List[Dict]]:
+    """
+    读取领域统计（按项目数降序）
+
+    Returns:
+        [{domain, count, avg_stars, max_stars, min_stars, avg_activity}]；
+        数据库尚未建立物化表时返回 None
+    """
+    if not has_domain_stats(conn):
+        return None
+
+    query = """
+    SELECT domain, count,
+           ROUND(CAST(sum_stars AS REAL) / NULLIF(stars_count, 0)),
+           max_stars, min_stars,
+           ROUND(sum_activity / NULLIF(activity_count, 0))
+    FROM domain_stats
+    WHERE count > 0
+    """
+    params = ()
+    if domain is not None:
+        query += " AND domain = ?"
+        params = (domain,)
+    query += " ORDER BY count DESC, domain"
+
+    return [
+        {
+            "domain": row[0],
+            "count": row[1],
+            "avg_stars": row[2],
+            "max_stars": row[3],
+            "min_stars": row[4],
+            "avg_activity": row[5],
+        }
+        for row in conn.execute(query, params).fetchall()
+    ]
+
+
+def get_leaderboard(conn: sqlite3.Connection,
+                    domain: Optional[str] = None,
+                    limit: int = LEADERBOARD_SIZE) -> Optional[List[Dict]]:
+    """
+    读取 Stars 排行榜（domain 为 None 时为全部领域合并）
+
+    数据库尚未建立物化表时返回 None
+    """
+    if not has_domain_stats(conn):
+        return None
+
+    query = "SELECT domain, name, full_name, stars, description FROM domain_leaderboard"
+    params: tuple = ()
+    if domain is not None:
+        query += " WHERE domain = ?"
+        params = (domain,)
+    query += " ORDER BY stars DESC, project_id LIMIT ?"
+    params += (min(limit, LEADERBOARD_SIZE),)
+
+    return [
+        {"domain": row[0], "name": row[1], "full_name": row[2], "stars": row[3], "description": row[4]}
+        for row in conn.execute(query, params).fetchall()
+    ]
+
+
+def main():
+    """为已有数据库建立（或重建）统计物化表"""
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "../data/projects.db"
+
+    conn = sqlite3.connect(db_path)
+    if has_domain_stats(conn):
+        rebuild_domain_stats(conn)
+    else:
+        ensure_domain_stats(conn)
+    conn.commit()
+
+    for stats in get_domain_stats(conn):
+        print(f"  {stats['domain']:12} {stats['count']:>8,} 个项目")
+    conn.close()
+
+    print(f"✅ 领域统计已重建: {db_path}")
+
+
+if __name__ == "__main__":
+    main()
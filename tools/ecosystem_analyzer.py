@@ -4,23 +4,24 @@
 分析项目间关系、技术栈组合、开发者网络、趋势
 """
 
-import sqlite3
 import json
 from typing import Dict, List
 from collections import defaultdict, Counter
 from datetime import datetime
 
+from project_store import get_store
+
 
 class EcosystemAnalyzer:
     """生态系统分析器"""
 
     def __init__(self, db_path: str = "../data/projects.db"):
         self.db_path = db_path
+        self.store = get_store(db_path, migrate=False)
 
     def analyze_tech_stack_combinations(self) -> Dict:
         """分析技术栈组合"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.store.reader().cursor()
 
         cursor.execute("""
         SELECT domain, main_language, COUNT(*) as count
@@ -34,13 +35,11 @@ class EcosystemAnalyzer:
         for domain, lang, count in cursor.fetchall():
             combos[domain].append({"language": lang, "count": count})
 
-        conn.close()
         return dict(combos)
 
     def analyze_temporal_trends(self) -> Dict:
         """分析时间趋势"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.store.reader().cursor()
 
         # 按年份分组
         cursor.execute("""
@@ -80,8 +79,6 @@ class EcosystemAnalyzer:
         for domain, period, count in cursor.fetchall():
             update_trends[domain][period] = count
 
-        conn.close()
-
         return {
             "creation_trends": dict(trends),
             "update_trends": dict(update_trends)
@@ -89,8 +86,7 @@ class EcosystemAnalyzer:
 
     def identify_emerging_projects(self) -> List[Dict]:
         """识别新兴项目（高增长、新创建）"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.store.reader().cursor()
 
         # 2024-2025 创建且高活跃度的项目
         cursor.execute("""
@@ -115,13 +111,11 @@ class EcosystemAnalyzer:
                 "activity_score": score
             })
 
-        conn.close()
         return emerging
 
     def analyze_domain_maturity(self) -> Dict:
         """分析领域成熟度"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.store.reader().cursor()
 
         maturity = {}
 
@@ -165,7 +159,6 @@ class EcosystemAnalyzer:
                     "maturity_score": round(maturity_score, 1)
                 }
 
-        conn.close()
         return maturity
 
     def generate_ecosystem_report(self, output_path: str = None) -> Dict:
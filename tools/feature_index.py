@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Feature Inverted Index
+功能倒排索引：入库时对项目描述和 topics 分词，建立 term → 项目 的倒排表，
+推荐时通过求交倒排列表得到功能命中，替代逐项子串扫描
+"""
+
+import json
+import re
+import sqlite3
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+
+# 分词：按非字母数字字符切分（下划线、连字符均视为分隔符）
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# 单次 SQL 语句中的最大参数个数
+SQL_CHUNK_SIZE = 500
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """将文本切分为小写 term"""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def project_terms(description: Optional[str], topics: Iterable[str]) -> Set[str]:
+    """项目的全部 term（描述 + topics）"""
+    terms = set(tokenize(description))
+    for topic in topics or []:
+        terms.update(tokenize(topic))
+    return terms
+
+
+def feature_matches(feature: str, terms: Set[str]) -> bool:
+    """功能的所有 term 均出现在项目中即视为命中"""
+    tokens = tokenize(feature)
+    return bool(tokens) and all(token in terms for token in tokens)
+
+
+def _parse_topics(raw) -> List[str]:
+    """解析数据库中的 topics JSON 字段"""
+    if isinstance(raw, list):
+        return raw
+    try:
+        return json.loads(raw) if raw else []
+    except (TypeError, ValueError):
+        return []
+
+
+def ensure_feature_index(conn: sqlite3.Connection):
+    """创建倒排表（与 projects 表同库）"""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS project_terms (
+        term TEXT NOT NULL,
+        project_id INTEGER NOT NULL,
+        PRIMARY KEY (term, project_id)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_project_terms_project ON project_terms(project_id)
+    """)
+
+
+def has_feature_index(conn: sqlite3.Connection) -> bool:
+    """数据库中是否已有倒排表"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'project_terms'"
+    ).fetchone()
+    return row is not None
+
+
+def index_projects(conn: sqlite3.Connection, full_names: Optional[Sequence[str]] = None) -> int:
+    """
+    为项目（重新）建立倒排记录，在调用方的事务中执行
+
+    Args:
+        conn: 数据库连接（由调用方提交）
+        full_names: 需要更新的项目；None 表示重建全部
+
+    Returns:
+        写入的 posting 数
+    """
+    ensure_feature_index(conn)
+
+    if full_names is None:
+        conn.execute("DELETE FROM project_terms")
+        batches = [conn.execute("SELECT id, description, topics FROM projects").fetchall()]
+    else:
+        names = list(full_names)
+        batches = []
+        for start in range(0, len(names), SQL_CHUNK_SIZE):
+            chunk = names[start:start + SQL_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT id, description, topics FROM projects WHERE full_name IN ({placeholders})",
+                chunk
+            ).fetchall()
+            ids = [row[0] for row in rows]
+            if ids:
+                conn.execute(
+                    f"DELETE FROM project_terms WHERE project_id IN ({', '.join('?' * len(ids))})",
+                    ids
+                )
+            batches.append(rows)
+
+    postings = 0
+    for rows in batches:
+        entries = [
+            (term, project_id)
+            for project_id, description, topics in rows
+            for term in project_terms(description, _parse_topics(topics))
+        ]
+        conn.executemany("INSERT OR IGNORE INTO project_terms (term, project_id) VALUES (?, ?)", entries)
+        postings += len(entries)
+
+    return postings
+
+
+class FeatureIndex:
+    """内存中的倒排索引：term → 项目行号（升序）"""
+
+    def __init__(self, postings: Dict[str, np.ndarray], size: int):
+        self.postings = postings
+        self.size = size
+
+    @classmethod
+    def from_projects(cls, projects: List[Dict]) -> "FeatureIndex":
+        """由已加载的项目直接构建"""
+        lists: Dict[str, List[int]] = {}
+        for position, project in enumerate(projects):
+            for term in project_terms(project.get('description'), project.get('topics', [])):
+                lists.setdefault(term, []).append(position)
+
+        postings = {term: np.array(rows, dtype=np.int64) for term, rows in lists.items()}
+        return cls(postings, len(projects))
+
+    @classmethod
+    def from_database(cls,
+                      conn: sqlite3.Connection,
+                      project_ids: Sequence[int],
+                      terms: Optional[Iterable[str]] = None,
+                      domain: Optional[str] = None) -> "FeatureIndex":
+        """
+        从入库时建立的倒排表加载
+
+        Args:
+            conn: 数据库连接
+            project_ids: 语料中按行排列的项目 id
+            terms: 只加载这些 term；None 表示加载全部
+            domain: 加载全部 term 时只读取该领域的 posting
+        """
+        ids = np.asarray(project_ids, dtype=np.int64)
+        if ids.size == 0:
+            return cls({}, 0)
+        order = np.argsort(ids, kind="stable")
+        sorted_ids = ids[order]
+
+        if terms is None and domain is not None:
+            rows = conn.execute("""
+            SELECT t.term, t.project_id
+            FROM project_terms t JOIN projects p ON p.id = t.project_id
+            WHERE p.domain = ?
+            """, (domain,)).fetchall()
+        elif terms is None:
+            rows = conn.execute("SELECT term, project_id FROM project_terms").fetchall()
+        else:
+            wanted = sorted(set(terms))
+            rows = []
+            for start in range(0, len(wanted), SQL_CHUNK_SIZE):
+                chunk = wanted[start:start + SQL_CHUNK_SIZE]
+                rows.extend(conn.execute(
+                    f"SELECT term, project_id FROM project_terms "
+                    f"WHERE term IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall())
+
+        grouped: Dict[str, List[int]] = {}
+        for term, project_id in rows:
+            grouped.setdefault(term, []).append(project_id)
+
+        postings = {}
+        for term, term_ids in grouped.items():
+            candidates = np.asarray(term_ids, dtype=np.int64)
+            slots = np.minimum(np.searchsorted(sorted_ids, candidates), sorted_ids.size - 1)
+            found = sorted_ids[slots] == candidates
+            postings[term] = np.sort(order[slots[found]])
+
+        return cls(postings, len(ids))
+
+    @property
+    def nbytes(self) -> int:
+        """倒排列表占用的内存（字节）"""
+        return sum(positions.nbytes for positions in self.postings.values())
+
+    def match(self, feature: str) -> np.ndarray:
+        """命中某功能的项目行号：求交各 term 的倒排列表"""
+        tokens = tokenize(feature)
+        if not tokens:
+            return np.zeros(0, dtype=np.int64)
+
+        lists = [self.postings.get(token) for token in tokens]
+        if any(positions is None for positions in lists):
+            return np.zeros(0, dtype=np.int64)
+
+        lists.sort(key=len)
+        result = lists[0]
+        for positions in lists[1:]:
+            result = np.intersect1d(result, positions, assume_unique=True)
+        return result
+
+
+def main():
+    """重建已有数据库的倒排表"""
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "../data/projects.db"
+
+    conn = sqlite3.connect(db_path)
+    postings = index_projects(conn)
+    conn.commit()
+    conn.close()
+
+    print(f"✅ 倒排索引重建完成: {db_path} ({postings} 条 posting)")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,26 +7,37 @@ GitHub Project Searcher
 import os
 import json
 import time
-import sqlite3
 from typing import List, Dict, Optional
 from datetime import datetime
-import requests
-from urllib.parse import urlencode
+
+from bulk_upsert import save_projects
+from project_store import get_store
+from http_client import HTTPClient
+from async_crawler import AsyncCrawler
+from search_cache import SearchCache, search_cache_path as default_search_cache_path
 
 class GitHubSearcher:
     """GitHub 项目搜索和分析工具"""
 
-    def __init__(self, token: Optional[str] = None, db_path: str = "../data/projects.db"):
+    def __init__(self,
+                 token: Optional[str] = None,
+                 db_path: str = "../data/projects.db",
+                 base_url: str = "https://api.github.com",
+                 http_cache_path: Optional[str] = None,
+                 search_cache_path: Optional[str] = None):
         """
         初始化 GitHub 搜索器
 
         Args:
             token: GitHub Personal Access Token (可选，但强烈推荐)
             db_path: SQLite 数据库路径
+            base_url: API 地址（测试时可指向本地桩服务）
+            http_cache_path: 条件请求的本地副本路径（默认与数据库同目录的 http_cache.db）
+            search_cache_path: 搜索结果缓存路径（默认与数据库同目录的 search_cache.db）
         """
         self.token = token or os.getenv("GITHUB_TOKEN")
         self.db_path = db_path
-        self.base_url = "https://api.github.com"
+        self.base_url = base_url.rstrip("/")
 
         # 请求头
         self.headers = {
@@ -35,6 +46,15 @@ class GitHubSearcher:
         if self.token:
             self.headers["Authorization"] = f"token {self.token}"
 
+        # 连接池 + ETag 条件请求：未变化的搜索页返回 304（不计入速率限制），使用本地副本
+        self.http = HTTPClient(
+            headers=self.headers,
+            store_path=http_cache_path or os.path.join(os.path.dirname(db_path) or ".", "http_cache.db")
+        )
+
+        # 搜索结果缓存：有效期内的搜索页不发请求（SEARCH_CACHE_OFFLINE=1 时不访问网络）
+        self.search_cache = SearchCache(search_cache_path or default_search_cache_path(db_path))
+
         # 速率限制跟踪
         self.remaining_requests = None
         self.reset_time = None
@@ -43,68 +63,13 @@ class GitHubSearcher:
         self.init_database()
 
     def init_database(self):
-        """初始化 SQLite 数据库"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # 创建项目表
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS projects (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            domain TEXT NOT NULL,
-            name TEXT NOT NULL,
-            full_name TEXT UNIQUE NOT NULL,
-            url TEXT NOT NULL,
-            stars INTEGER DEFAULT 0,
-            forks INTEGER DEFAULT 0,
-            watchers INTEGER DEFAULT 0,
-            open_issues INTEGER DEFAULT 0,
-            description TEXT,
-            main_language TEXT,
-            tech_stack TEXT,
-            last_updated DATE,
-            created_at DATE,
-            activity_score REAL DEFAULT 0,
-            relevance_score REAL DEFAULT 0,
-            readme_summary TEXT,
-            license TEXT,
-            topics TEXT,
-            contributors_count INTEGER DEFAULT 0,
-            collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(full_name)
-        )
-        """)
-
-        # 创建功能特性表
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS project_features (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            project_id INTEGER NOT NULL,
-            feature_type TEXT NOT NULL,
-            description TEXT,
-            FOREIGN KEY (project_id) REFERENCES projects(id)
-        )
-        """)
-
-        # 创建索引
-        cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_domain ON projects(domain)
-        """)
-        cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_stars ON projects(stars DESC)
-        """)
-
-        conn.commit()
-        conn.close()
-
+        """初始化 SQLite 数据库（表结构与索引由 project_store 的迁移维护）"""
+        self.store = get_store(self.db_path)
         print(f"✅ 数据库初始化完成: {self.db_path}")
 
     def check_rate_limit(self):
         """检查 GitHub API 速率限制"""
-        response = requests.get(
-            f"{self.base_url}/rate_limit",
-            headers=self.headers
-        )
+        response = self.http.get(f"{self.base_url}/rate_limit", conditional=False)
 
         if response.status_code == 200:
             data = response.json()
@@ -145,62 +110,30 @@ class GitHubSearcher:
         Returns:
             项目列表
         """
-        all_repos = []
-        page = 1
-        per_page = 100  # GitHub API 最大值
-
-        # 构建查询字符串，添加 stars 过滤
-        search_query = f"{query} stars:>{min_stars}"
-
-        print(f"\n🔍 搜索: {search_query} (领域: {domain})")
-
-        while len(all_repos) < max_results:
-            # 检查速率限制
-            if self.remaining_requests and self.remaining_requests < 10:
-                self.check_rate_limit()
-
-            # 构建请求 URL
-            params = {
-                "q": search_query,
-                "sort": sort,
-                "order": order,
-                "per_page": per_page,
-                "page": page
-            }
-
-            url = f"{self.base_url}/search/repositories?{urlencode(params)}"
-
-            response = requests.get(url, headers=self.headers)
-
-            # 更新速率限制信息
-            self.remaining_requests = int(response.headers.get("X-RateLimit-Remaining", 0))
-
-            if response.status_code != 200:
-                print(f"❌ 搜索失败: {response.status_code}")
-                print(f"   错误: {response.json().get('message', 'Unknown error')}")
-                break
-
-            data = response.json()
-            items = data.get("items", [])
-
-            if not items:
-                print(f"✅ 搜索完成，共找到 {len(all_repos)} 个项目")
-                break
-
-            # 处理每个仓库
-            for repo in items:
-                if len(all_repos) >= max_results:
-                    break
-
-                project_data = self.extract_repo_data(repo, domain)
-                all_repos.append(project_data)
+        return self.crawl([{
+            "query": query,
+            "domain": domain,
+            "sort": sort,
+            "order": order,
+            "max_results": max_results,
+            "min_stars": min_stars,
+        }])[0]
 
-                print(f"  ⭐ {repo['full_name']}: {repo['stargazers_count']} stars")
+    def crawl(self, queries: List[Dict]) -> List[List[Dict]]:
+        """
+        并发执行多个搜索（关键词与分页同时进行，按 X-RateLimit 响应头控制请求速率）
 
-            page += 1
-            time.sleep(1)  # 避免触发速率限制
+        Args:
+            queries: search_repositories 的关键字参数列表
 
-        return all_repos
+        Returns:
+            与 queries 顺序对应的项目列表
+        """
+        crawler = AsyncCrawler(self)
+        results = crawler.run(queries)
+        if "search" in crawler.buckets:
+            self.remaining_requests = crawler.buckets["search"].remaining
+        return results
 
     def extract_repo_data(self, repo: Dict, domain: str) -> Dict:
         """从 GitHub API 响应中提取项目数据"""
@@ -251,75 +184,13 @@ class GitHubSearcher:
         return round(min(score, 100), 2)
 
     def save_to_database(self, projects: List[Dict]):
-        """将项目保存到数据库"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        saved_count = 0
-        updated_count = 0
-
-        for project in projects:
-            try:
-                # 尝试插入
-                cursor.execute("""
-                INSERT INTO projects (
-                    domain, name, full_name, url, stars, forks, watchers,
-                    open_issues, description, main_language, last_updated,
-                    created_at, activity_score, license, topics
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    project["domain"],
-                    project["name"],
-                    project["full_name"],
-                    project["url"],
-                    project["stars"],
-                    project["forks"],
-                    project["watchers"],
-                    project["open_issues"],
-                    project["description"],
-                    project["main_language"],
-                    project["last_updated"],
-                    project["created_at"],
-                    project["activity_score"],
-                    project["license"],
-                    project["topics"]
-                ))
-                saved_count += 1
-            except sqlite3.IntegrityError:
-                # 已存在，更新
-                cursor.execute("""
-                UPDATE projects SET
-                    stars = ?,
-                    forks = ?,
-                    watchers = ?,
-                    open_issues = ?,
-                    description = ?,
-                    last_updated = ?,
-                    activity_score = ?,
-                    license = ?,
-                    topics = ?,
-                    collected_at = CURRENT_TIMESTAMP
-                WHERE full_name = ?
-                """, (
-                    project["stars"],
-                    project["forks"],
-                    project["watchers"],
-                    project["open_issues"],
-                    project["description"],
-                    project["last_updated"],
-                    project["activity_score"],
-                    project["license"],
-                    project["topics"],
-                    project["full_name"]
-                ))
-                updated_count += 1
-
-        conn.commit()
-        conn.close()
+        """将项目保存到数据库（批量 UPSERT）"""
+        result = save_projects(self.store, projects)
 
         print(f"\n💾 数据库保存完成:")
-        print(f"   ✅ 新增: {saved_count} 个项目")
-        print(f"   🔄 更新: {updated_count} 个项目")
+        print(f"   ✅ 新增: {result['inserted']} 个项目")
+        print(f"   🔄 更新: {result['updated']} 个项目")
+        print(f"   ⚡ 写入: {result['rows_per_sec']:,} 行/秒")
 
     def search_latex_projects(self, max_results: int = 100):
         """搜索 LaTeX 相关项目"""
@@ -345,15 +216,17 @@ class GitHubSearcher:
 
         all_projects = []
 
-        for keyword in latex_keywords:
-            projects = self.search_repositories(
-                query=keyword,
-                domain="latex",
-                max_results=max_results // len(latex_keywords),
-                min_stars=50  # LaTeX 项目相对小众，降低门槛
-            )
+        results = self.crawl([
+            {
+                "query": keyword,
+                "domain": "latex",
+                "max_results": max_results // len(latex_keywords),
+                "min_stars": 50  # LaTeX 项目相对小众，降低门槛
+            }
+            for keyword in latex_keywords
+        ])
+        for projects in results:
             all_projects.extend(projects)
-            time.sleep(2)  # 避免触发速率限制
 
         # 去重（基于 full_name）
         unique_projects = {}
@@ -368,6 +241,9 @@ class GitHubSearcher:
         print(f"\n📊 搜索统计:")
         print(f"   总计找到: {len(all_projects)} 个项目（含重复）")
         print(f"   去重后: {len(final_projects)} 个唯一项目")
+        print(f"   API 请求: {self.http.stats['requests']} 次"
+              f"（未变化 304: {self.http.stats['not_modified']} 次）")
+        print(f"   {self.search_cache.report()}")
 
         # 保存到数据库
         self.save_to_database(final_projects)
@@ -376,8 +252,7 @@ class GitHubSearcher:
 
     def export_to_json(self, domain: str, output_path: str):
         """导出数据为 JSON"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.store.reader().cursor()
 
         cursor.execute("""
         SELECT * FROM projects WHERE domain = ? ORDER BY stars DESC
@@ -394,8 +269,6 @@ class GitHubSearcher:
                 project["topics"] = json.loads(project["topics"])
             projects.append(project)
 
-        conn.close()
-
         # 写入文件
         with open(output_path, "w", encoding="utf-8") as f:
             json.dump(projects, f, indent=2, ensure_ascii=False)
@@ -415,8 +288,9 @@ def main():
     # 初始化搜索器
     searcher = GitHubSearcher(db_path="../data/projects.db")
 
-    # 检查 API 速率限制
-    searcher.check_rate_limit()
+    # 检查 API 速率限制（离线模式只使用搜索缓存）
+    if not searcher.search_cache.offline:
+        searcher.check_rate_limit()
 
     # 搜索 LaTeX 项目
     projects = searcher.search_latex_projects(max_results=100)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+HTTP Client
+带连接池的 HTTP 客户端：复用 keep-alive 连接（不再每页重新握手 TCP + TLS），
+按请求 URL 在本地保存 ETag / Last-Modified 与响应体，重复请求携带 If-None-Match / If-Modified-Since，
+服务端返回 304 时直接使用本地副本（GitHub 的 304 响应不计入速率限制）
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+
+# 连接池大小（每个主机保持的 keep-alive 连接数）
+POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30
+
+# 网络错误与网关错误的自动重试（速率限制的 403 / 429 由调用方处理）
+RETRY = Retry(
+    total=3,
+    connect=3,
+    read=2,
+    status=3,
+    backoff_factor=0.5,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset({"GET", "HEAD"}),
+    raise_on_status=False,
+)
+
+# 与传输编码相关的头不保存（本地副本是解压后的响应体）；
+# 304 时用新响应覆盖副本中的其余头（速率限制等随请求变化），Content-Type 保持与副本一致
+_TRANSFER_HEADERS = {"content-length", "content-encoding", "transfer-encoding"}
+_BODY_HEADERS = _TRANSFER_HEADERS | {"content-type"}
+
+
+def _stored_headers(headers) -> Dict[str, str]:
+    return {name: value for name, value in headers.items() if name.lower() not in _TRANSFER_HEADERS}
+
+
+VALIDATOR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_validators (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    stored_at REAL NOT NULL
+)
+"""
+
+
+class ValidatorStore:
+    """按 URL 保存校验头与响应体的本地存储（SQLite，多线程共享一个连接）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(VALIDATOR_SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, headers, body FROM http_validators WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "headers": json.loads(row[2]),
+            "body": row[3],
+        }
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str],
+            headers: Dict[str, str], body: bytes):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_validators VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps(headers), body, time.time())
+            )
+            self._conn.commit()
+
+    def delete(self, url: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM http_validators WHERE url = ?", (url,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM http_validators").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class HTTPClient:
+    """
+    连接池 + 条件请求
+
+    - get() 返回 requests.Response；命中 304 时返回由本地副本重建的 200 响应，
+      其 from_cache 属性为 True，头部已合并 304 响应中的最新值（如 X-RateLimit-Remaining）
+    - store_path 为 None 时只使用连接池，不做条件请求
+    """
+
+    def __init__(self,
+                 headers: Optional[Dict[str, str]] = None,
+                 store_path: Optional[str] = None,
+                 pool_size: int = POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=RETRY)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.store = ValidatorStore(store_path) if store_path else None
+        self.timeout = timeout
+
+        self.stats = {"requests": 0, "not_modified": 0, "downloaded": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def get(self, url: str, params: Optional[Dict] = None, conditional: bool = True) -> requests.Response:
+        """
+        GET 请求
+
+        Args:
+            url: 请求地址
+            params: 查询参数（并入 URL，作为本地副本的键）
+            conditional: 是否使用本地副本做条件请求（如速率限制查询应设为 False）
+        """
+        if params:
+            url = requests.Request("GET", url, params=params).prepare().url
+
+        stored = self.store.get(url) if (self.store is not None and conditional) else None
+        headers = {}
+        if stored is not None:
+            if stored["etag"]:
+                headers["If-None-Match"] = stored["etag"]
+            if stored["last_modified"]:
+                headers["If-Modified-Since"] = stored["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        self._count("requests")
+
+        if response.status_code == 304 and stored is not None:
+            self._count("not_modified")
+            return self._from_store(url, stored, response)
+
+        response.from_cache = False
+        if response.status_code == 200:
+            self._count("downloaded")
+            if self.store is not None and conditional:
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+                if etag or last_modified:
+                    self.store.put(url, etag, last_modified, _stored_headers(response.headers),
+                                   response.content)
+        return response
+
+    def _from_store(self, url: str, stored: Dict, not_modified: requests.Response) -> requests.Response:
+        """由本地副本与 304 响应的头构造 200 响应"""
+        headers = CaseInsensitiveDict(stored["headers"])
+        for name, value in not_modified.headers.items():
+            if name.lower() not in _BODY_HEADERS:
+                headers[name] = value
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = url
+        response.headers = headers
+        response._content = stored["body"]
+        response.encoding = requests.utils.get_encoding_from_headers(headers)
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.from_cache = True
+
+        # 服务端更新了校验值时同步保存
+        etag = not_modified.headers.get("ETag") or stored["etag"]
+        if etag != stored["etag"]:
+            self.store.put(url, etag, stored["last_modified"], _stored_headers(headers), stored["body"])
+        return response
+
+    def close(self):
+        self.session.close()
+        if self.store is not None:
+            self.store.close()
+
+    def __enter__(self) -> "HTTPClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
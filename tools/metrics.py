@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Stage Timing Metrics
+推荐流程分阶段计时：单次请求的阶段耗时 + 按阶段聚合的延迟直方图，
+以及导出为 Prometheus 文本格式的指标注册表
+
+计数器与直方图按线程分片：记录时只写当前线程的分片，不加锁；
+导出时合并各分片（只在线程首次记录时加一次锁）。已结束线程的分片并入基础分片，
+每请求一个线程的服务器上分片数不会随请求数增长。
+"""
+
+import bisect
+import math
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# 推荐流程的阶段（按执行顺序）
+STAGES = ("fetch", "decode", "score_oss", "score_commercial", "sort", "reasoning")
+
+# 直方图桶上界（毫秒）
+DEFAULT_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class _Sharded:
+    """按线程分片的指标基类：每个线程只写自己的分片"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._base = None  # 已结束线程的累计值
+        self._shards: List[Tuple[weakref.ref, object]] = []
+        self._lock = threading.Lock()  # 只保护分片列表与基础分片
+
+    def _new_shard(self):
+        raise NotImplementedError
+
+    def _merge(self, base, shard):
+        """返回 base 与 shard 合并后的新分片（不修改二者，读取方拿到的旧分片保持一致）"""
+        raise NotImplementedError
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._new_shard()
+            with self._lock:
+                self._reap()
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+            self._local.shard = shard
+        return shard
+
+    def _reap(self):
+        """把已结束线程的分片并入基础分片（线程结束后不会再写入，持有锁时调用）"""
+        alive = []
+        for thread_ref, shard in self._shards:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                alive.append((thread_ref, shard))
+            else:
+                self._base = shard if self._base is None else self._merge(self._base, shard)
+        self._shards = alive
+
+    def _all_shards(self) -> List:
+        with self._lock:
+            self._reap()
+            shards = [shard for _, shard in self._shards]
+            return shards if self._base is None else [self._base] + shards
+
+
+class Counter(_Sharded):
+    """单调递增计数器"""
+
+    def _new_shard(self) -> List[float]:
+        return [0.0]
+
+    def _merge(self, base: List[float], shard: List[float]) -> List[float]:
+        return [base[0] + shard[0]]
+
+    def inc(self, amount: float = 1.0):
+        self._shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return sum(shard[0] for shard in self._all_shards())
+
+
+class Gauge(Counter):
+    """可增可减的当前值（如进行中的请求数）"""
+
+    def dec(self, amount: float = 1.0):
+        self._shard()[0] -= amount
+
+
+class _HistogramShard:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class _Timing:
+    """把代码块耗时记入直方图的上下文"""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: "Histogram"):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe((time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class Histogram(_Sharded):
+    """固定桶延迟直方图（毫秒）"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        super().__init__()
+        self.buckets = tuple(buckets)
+
+    def _new_shard(self) -> _HistogramShard:
+        return _HistogramShard(len(self.buckets) + 1)  # 最后一个桶为 +Inf
+
+    def _merge(self, base: _HistogramShard, shard: _HistogramShard) -> _HistogramShard:
+        merged = self._new_shard()
+        merged.counts = [a + b for a, b in zip(base.counts, shard.counts)]
+        merged.count = base.count + shard.count
+        merged.sum = base.sum + shard.sum
+        return merged
+
+    def observe(self, value_ms: float):
+        """记录一次观测值"""
+        shard = self._shard()
+        shard.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        shard.count += 1
+        shard.sum += value_ms
+
+    def time(self) -> _Timing:
+        """计时上下文：with histogram.time(): ..."""
+        return _Timing(self)
+
+    def merged(self) -> Tuple[List[int], int, float]:
+        """合并各线程分片：(各桶计数, 总数, 总和)"""
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0
+        total_ms = 0.0
+        for shard in self._all_shards():
+            for slot, count in enumerate(shard.counts):
+                counts[slot] += count
+            total += shard.count
+            total_ms += shard.sum
+        return counts, total, total_ms
+
+    @property
+    def count(self) -> int:
+        return self.merged()[1]
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按桶估算分位数（返回所在桶的上界）"""
+        counts, total, _ = self.merged()
+        return self._quantile(counts, total, q)
+
+    def _quantile(self, counts: List[int], total: int, q: float) -> Optional[float]:
+        if total == 0:
+            return None
+        rank = q * total
+        seen = 0
+        for upper, count in zip(self.buckets + (float("inf"),), counts):
+            seen += count
+            if seen >= rank:
+                return upper
+        return float("inf")
+
+    def snapshot(self) -> Dict:
+        """导出统计"""
+        counts, total, total_ms = self.merged()
+        cumulative = []
+        seen = 0
+        for count in counts:
+            seen += count
+            cumulative.append(seen)
+        return {
+            "count": total,
+            "sum_ms": round(total_ms, 3),
+            "mean_ms": round(total_ms / total, 3) if total else None,
+            "p50_ms": self._quantile(counts, total, 0.5),
+            "p90_ms": self._quantile(counts, total, 0.9),
+            "p99_ms": self._quantile(counts, total, 0.99),
+            "buckets": {
+                ("+Inf" if upper == float("inf") else str(upper)): cum
+                for upper, cum in zip(self.buckets + (float("inf"),), cumulative)
+            },
+        }
+
+
+class _Stage:
+    """单个阶段的计时上下文（同名阶段多次进入时累加）"""
+
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer: "StageTimer", name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stages = self.timer.stages
+        stages[self.name] = stages.get(self.name, 0.0) + elapsed
+        return False
+
+
+class _NullStage:
+    """关闭计时时使用的空上下文"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class StageTimer:
+    """单次请求的阶段计时器"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.start = time.perf_counter()
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def as_dict(self) -> Dict[str, float]:
+        """{阶段: 毫秒}"""
+        return {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+
+
+class _NullTimer:
+    """关闭计时时使用的空计时器"""
+
+    def stage(self, name: str) -> _NullStage:
+        return NULL_STAGE
+
+
+NULL_TIMER = _NullTimer()
+
+# 当前线程正在计时的请求（语料加载等深层调用通过它记录阶段）
+_local = threading.local()
+
+
+def current_timer():
+    """当前线程的计时器；未启用时返回空计时器"""
+    return getattr(_local, "timer", NULL_TIMER)
+
+
+@contextmanager
+def activate(timer: StageTimer):
+    """在当前线程上启用计时器"""
+    previous = getattr(_local, "timer", NULL_TIMER)
+    _local.timer = timer
+    try:
+        yield timer
+    finally:
+        _local.timer = previous
+
+
+class StageMetrics:
+    """按阶段聚合的延迟直方图"""
+
+    def __init__(self, stages: Sequence[str] = STAGES, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.histograms: Dict[str, Histogram] = {name: Histogram(buckets) for name in stages}
+        self.histograms["total"] = Histogram(buckets)
+        self._lock = threading.Lock()
+
+    def observe(self, timer: StageTimer, total_ms: float):
+        """记录一次请求的各阶段耗时"""
+        for name, seconds in timer.stages.items():
+            self._histogram(name).observe(seconds * 1000)
+        self.histograms["total"].observe(total_ms)
+
+    def _histogram(self, name: str) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram(self.buckets))
+        return histogram
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """{阶段: 直方图统计}"""
+        return {name: histogram.snapshot() for name, histogram in list(self.histograms.items())}
+
+
+# ---------------------------------------------------------------------------
+# Prometheus 导出
+# ---------------------------------------------------------------------------
+
+# 导出格式：(指标名, 类型, 说明, 标签名, [(标签值, 数值或 Histogram)])
+MetricSamples = Tuple[str, str, str, Tuple[str, ...], List[Tuple[Tuple[str, ...], object]]]
+
+_METRIC_TYPES = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}
+
+
+class MetricFamily:
+    """同名指标按标签取值区分的一组子指标"""
+
+    def __init__(self,
+                 name: str,
+                 kind: str,
+                 help_text: str,
+                 labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        if kind not in _METRIC_TYPES:
+            raise ValueError(f"Unknown metric type: {kind}")
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()  # 只在新标签组合首次出现时使用
+
+    def labels(self, *values: str):
+        """标签取值对应的子指标（已存在时不加锁）"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = Histogram(self.buckets) if self.kind == "histogram" else _METRIC_TYPES[self.kind]()
+                    self._children[values] = child
+        return child
+
+    def collect(self) -> MetricSamples:
+        with self._lock:
+            children = list(self._children.items())
+        return self.name, self.kind, self.help_text, self.labelnames, children
+
+
+class MetricsRegistry:
+    """指标注册表：直接记录的指标族 + 导出时才计算的采集函数"""
+
+    def __init__(self):
+        self._families: List[MetricFamily] = []
+        self._collectors: List[Callable[[], Iterable[MetricSamples]]] = []
+
+    def register(self, family: MetricFamily) -> MetricFamily:
+        """注册已有的指标族（例如引擎内部的 SQLite 查询耗时）"""
+        self._families.append(family)
+        return family
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self.register(MetricFamily(name, "counter", help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self.register(MetricFamily(name, "gauge", help_text, labelnames))
+
+    def histogram(self,
+                  name: str,
+                  help_text: str,
+                  labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS_MS) -> MetricFamily:
+        return self.register(MetricFamily(name, "histogram", help_text, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricSamples]]):
+        """注册导出时调用的采集函数（缓存命中率、语料大小等当前状态）"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus 文本格式（直方图由毫秒换算为秒）"""
+        lines: List[str] = []
+        for family in self._families:
+            _render_samples(lines, family.collect())
+        for collector in self._collectors:
+            for samples in collector():
+                _render_samples(lines, samples)
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _render_samples(lines: List[str], samples: MetricSamples):
+    name, kind, help_text, labelnames, children = samples
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for values, metric in children:
+        if kind != "histogram":
+            value = metric.value if isinstance(metric, Counter) else metric
+            lines.append(f"{name}{_format_labels(labelnames, values)} {_format_value(value)}")
+            continue
+
+        counts, total, total_ms = metric.merged()
+        bucket_names = labelnames + ("le",)
+        cumulative = 0
+        for upper, count in zip(metric.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = _format_value(upper / 1000)
+            lines.append(f"{name}_bucket{_format_labels(bucket_names, values + (le,))} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, values)} {_format_value(total_ms / 1000)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, values)} {total}")
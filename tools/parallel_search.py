@@ -6,74 +6,42 @@ Parallel GitHub Search Tool
 
 import json
 import subprocess
-import sqlite3
 import time
 from datetime import datetime
 from typing import List, Dict, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
+from bulk_upsert import save_projects
+from project_store import get_store
+from search_cache import OfflineCacheMiss, SearchCache, gh_search_repos, search_cache_path
+
 class ParallelGitHubSearcher:
     """并行 GitHub 搜索器"""
 
     def __init__(self, db_path: str = "../data/projects.db"):
         self.db_path = db_path
         self.lock = threading.Lock()
+        # 搜索结果缓存：重复运行时直接使用本地结果（SEARCH_CACHE_OFFLINE=1 时不访问网络）
+        self.search_cache = SearchCache(search_cache_path(db_path))
         self.init_database()
 
     def init_database(self):
-        """初始化数据库"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS projects (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            domain TEXT NOT NULL,
-            name TEXT NOT NULL,
-            full_name TEXT UNIQUE NOT NULL,
-            url TEXT NOT NULL,
-            stars INTEGER DEFAULT 0,
-            forks INTEGER DEFAULT 0,
-            watchers INTEGER DEFAULT 0,
-            open_issues INTEGER DEFAULT 0,
-            description TEXT,
-            main_language TEXT,
-            tech_stack TEXT,
-            last_updated DATE,
-            created_at DATE,
-            activity_score REAL DEFAULT 0,
-            relevance_score REAL DEFAULT 0,
-            readme_summary TEXT,
-            license TEXT,
-            topics TEXT,
-            contributors_count INTEGER DEFAULT 0,
-            collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(full_name)
-        )
-        """)
-
-        conn.commit()
-        conn.close()
+        """初始化数据库（表结构与索引由 project_store 的迁移维护）"""
+        self.store = get_store(self.db_path)
         print(f"✅ 数据库初始化完成: {self.db_path}")
 
     def search_with_gh(self, query: str, domain: str, limit: int = 30) -> Tuple[str, List[Dict]]:
         """使用 gh CLI 搜索仓库"""
         print(f"🔍 [{domain}] 搜索: {query}")
 
-        cmd = [
-            "gh", "search", "repos",
-            query,
-            "--limit", str(limit),
-            "--sort", "stars",
-            "--json", "name,owner,stargazersCount,forksCount,description,url,updatedAt,createdAt,language,license,openIssuesCount"
-        ]
-
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            repos = json.loads(result.stdout)
+            repos = gh_search_repos(self.search_cache, query, limit)
             print(f"  ✅ [{domain}] 找到 {len(repos)} 个项目")
             return (domain, repos)
+        except OfflineCacheMiss:
+            print(f"  📴 [{domain}] 离线模式：缓存中没有该查询")
+            return (domain, [])
         except subprocess.CalledProcessError as e:
             print(f"  ❌ [{domain}] 搜索失败: {e.stderr}")
             return (domain, [])
@@ -138,52 +106,10 @@ class ParallelGitHubSearcher:
     def save_to_database(self, projects: List[Dict]):
         """批量保存到数据库（线程安全）"""
         with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            result = save_projects(self.store, projects)
 
-            saved_count = 0
-            updated_count = 0
-
-            for project in projects:
-                try:
-                    cursor.execute("""
-                    INSERT INTO projects (
-                        domain, name, full_name, url, stars, forks, watchers,
-                        open_issues, description, main_language, last_updated,
-                        created_at, activity_score, license, topics
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        project["domain"], project["name"], project["full_name"],
-                        project["url"], project["stars"], project["forks"],
-                        project["watchers"], project["open_issues"],
-                        project["description"], project["main_language"],
-                        project["last_updated"], project["created_at"],
-                        project["activity_score"], project["license"],
-                        project["topics"]
-                    ))
-                    saved_count += 1
-                except sqlite3.IntegrityError:
-                    cursor.execute("""
-                    UPDATE projects SET
-                        stars = ?, forks = ?, watchers = ?,
-                        open_issues = ?, description = ?,
-                        last_updated = ?, activity_score = ?,
-                        license = ?, topics = ?,
-                        collected_at = CURRENT_TIMESTAMP
-                    WHERE full_name = ?
-                    """, (
-                        project["stars"], project["forks"],
-                        project["watchers"], project["open_issues"],
-                        project["description"], project["last_updated"],
-                        project["activity_score"], project["license"],
-                        project["topics"], project["full_name"]
-                    ))
-                    updated_count += 1
-
-            conn.commit()
-            conn.close()
-
-            return saved_count, updated_count
+        print(f"⚡ 写入 {result['rows']:,} 行, {result['rows_per_sec']:,} 行/秒")
+        return result["inserted"], result["updated"]
 
     def parallel_search(self, search_queries: List[Tuple[str, str]], max_workers: int = 10):
         """并行执行多个搜索查询"""
@@ -223,8 +149,7 @@ class ParallelGitHubSearcher:
 
     def export_to_json(self, domain: str, output_path: str):
         """导出指定领域的数据为 JSON"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.store.reader().cursor()
 
         cursor.execute("""
         SELECT * FROM projects WHERE domain = ? ORDER BY stars DESC
@@ -243,8 +168,6 @@ class ParallelGitHubSearcher:
                     project["topics"] = []
             projects.append(project)
 
-        conn.close()
-
         with open(output_path, "w", encoding="utf-8") as f:
             json.dump(projects, f, indent=2, ensure_ascii=False)
 
@@ -336,6 +259,7 @@ def main():
         print(f"    语言: {project['main_language'] or 'N/A':12s} | 更新: {project['last_updated']} | 活跃度: {project['activity_score']}")
         print()
 
+    print(searcher.search_cache.report())
     print("✅ 并行搜索完成！")
     print(f"\n📁 数据已保存:")
     print(f"   - 数据库: ../data/projects.db")
@@ -4,7 +4,6 @@
 分析项目质量、活跃度、技术栈、成熟度
 """
 
-import sqlite3
 import subprocess
 import json
 import re
@@ -12,17 +11,20 @@ from typing import Dict, List, Tuple
 from collections import defaultdict, Counter
 from datetime import datetime
 
+from domain_stats import get_domain_stats
+from project_store import get_store
+
 
 class ProjectAnalyzer:
     """项目分析器"""
 
     def __init__(self, db_path: str = "../data/projects.db"):
         self.db_path = db_path
+        self.store = get_store(db_path, migrate=False)
 
     def get_projects(self, domain: str = None, limit: int = None) -> List[Dict]:
         """获取项目列表"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.store.reader().cursor()
 
         if domain:
             query = "SELECT * FROM projects WHERE domain = ? ORDER BY stars DESC"
@@ -39,7 +41,6 @@ class ProjectAnalyzer:
         rows = cursor.fetchall()
 
         projects = [dict(zip(columns, row)) for row in rows]
-        conn.close()
 
         return projects
 
@@ -274,7 +275,21 @@ class ProjectAnalyzer:
 
     def _get_domain_stats(self) -> Dict:
         """获取领域统计"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.store.reader()
+
+        # 优先读取领域统计物化表（入库时维护）
+        materialized = get_domain_stats(conn)
+        if materialized is not None:
+            return {
+                row["domain"]: {
+                    "count": row["count"],
+                    "avg_stars": int(row["avg_stars"]) if row["avg_stars"] else 0,
+                    "max_stars": int(row["max_stars"]) if row["max_stars"] else 0,
+                    "avg_quality": int(row["avg_activity"]) if row["avg_activity"] else 0
+                }
+                for row in materialized
+            }
+
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -298,7 +313,6 @@ class ProjectAnalyzer:
                 "avg_quality": int(avg_quality) if avg_quality else 0
             }
 
-        conn.close()
         return stats
 
     def _print_summary(self, report: Dict):
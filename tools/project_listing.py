@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Project Listing
+项目浏览：按领域 / 语言 / 许可证 / Stars 与活跃度区间 / 更新时间窗口筛选，任意排序键，
+按 (排序值, id) 键集分页，并在同一条查询中返回筛选结果的分面计数
+
+排序值统一为非 NULL 表达式，与 LISTING_INDEXES 中的复合索引一致，
+单领域分页沿 (domain, 排序值, id) 索引读取，翻页代价与页码无关。
+"""
+
+import base64
+import json
+import sqlite3
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# 排序键 → 排序表达式（与索引表达式逐字一致，查询才能使用表达式索引）
+SORT_KEYS = {
+    "stars": "IFNULL(stars, 0)",
+    "forks": "IFNULL(forks, 0)",
+    "activity": "IFNULL(activity_score, 0)",
+    "updated": "IFNULL(last_updated, '')",
+    "created": "IFNULL(created_at, '')",
+    "name": "name",
+}
+
+DEFAULT_SORT = "stars"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# 分面字段
+FACETS = {
+    "domain": "domain",
+    "language": "main_language",
+    "license": "license",
+}
+
+# 每个排序键一个 (domain, 排序值, id) 索引；跨领域浏览只为默认排序建索引（其余排序键需排序）；
+# 分面统计按领域扫描覆盖索引，不读取表行
+LISTING_INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS idx_list_{key} ON projects(domain, {expr}, id)"
+    for key, expr in SORT_KEYS.items()
+] + [
+    f"CREATE INDEX IF NOT EXISTS idx_list_{DEFAULT_SORT}_all ON projects({SORT_KEYS[DEFAULT_SORT]}, id)",
+    "CREATE INDEX IF NOT EXISTS idx_list_facets ON projects(domain, main_language, license)",
+]
+
+LIST_COLUMNS = """
+    id, domain, name, full_name, url, stars, forks, description,
+    main_language, license, activity_score, last_updated, created_at
+"""
+
+
+def ensure_listing_indexes(conn: sqlite3.Connection):
+    """创建浏览接口所用的复合索引（在调用方的事务中执行）"""
+    for statement in LISTING_INDEXES:
+        conn.execute(statement)
+
+
+def encode_cursor(sort: str, order: str, sort_value, project_id: int) -> str:
+    """键集游标：(排序键, 方向, 最后一行的排序值, id)"""
+    payload = json.dumps([sort, order, sort_value, project_id], ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, object, int]:
+    """解析游标；格式错误时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort, order, sort_value, project_id = json.loads(base64.urlsafe_b64decode(padded))
+        return sort, order, sort_value, int(project_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _in_clause(column: str, values: Sequence, params: List, nocase: bool = False) -> str:
+    params.extend(values)
+    collate = " COLLATE NOCASE" if nocase else ""
+    return f"{column}{collate} IN ({', '.join('?' * len(values))})"
+
+
+def build_filters(domains: Sequence[str] = (),
+                  languages: Sequence[str] = (),
+                  licenses: Sequence[str] = (),
+                  min_stars: Optional[int] = None,
+                  max_stars: Optional[int] = None,
+                  min_activity: Optional[float] = None,
+                  max_activity: Optional[float] = None,
+                  updated_after: Optional[str] = None,
+                  updated_before: Optional[str] = None) -> Tuple[str, List]:
+    """
+    筛选条件
+
+    Returns:
+        (WHERE 子句, 参数)；没有条件时子句为 "1"
+    """
+    clauses: List[str] = []
+    params: List = []
+
+    if domains:
+        clauses.append(_in_clause("domain", domains, params))
+    if languages:
+        clauses.append(_in_clause("main_language", languages, params, nocase=True))
+    if licenses:
+        clauses.append(_in_clause("license", licenses, params, nocase=True))
+
+    for column, op, value in (
+        ("stars", ">=", min_stars),
+        ("stars", "<=", max_stars),
+        ("activity_score", ">=", min_activity),
+        ("activity_score", "<=", max_activity),
+        ("last_updated", ">=", updated_after),
+        ("last_updated", "<", updated_before),
+    ):
+        if value is not None:
+            clauses.append(f"{column} {op} ?")
+            params.append(value)
+
+    return " AND ".join(clauses) or "1", params
+
+
+def list_projects(conn: sqlite3.Connection,
+                  filters: Optional[Dict] = None,
+                  sort: str = DEFAULT_SORT,
+                  order: str = "desc",
+                  page_size: int = DEFAULT_PAGE_SIZE,
+                  cursor: Optional[str] = None,
+                  facets: Optional[bool] = None) -> Dict:
+    """
+    浏览项目（单条查询返回当前页与分面计数）
+
+    Args:
+        filters: build_filters 的关键字参数
+        sort: SORT_KEYS 中的排序键
+        order: "desc" / "asc"
+        page_size: 每页数量（不超过 MAX_PAGE_SIZE）
+        cursor: 上一页返回的 next_cursor
+        facets: 是否计算分面计数与总数；默认仅第一页计算（翻页时筛选结果不变）
+
+    Returns:
+        {"items", "next_cursor", "sort", "order", "page_size"}，计算分面时另含 "total" 与 "facets"
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort}")
+    if order not in ("desc", "asc"):
+        raise ValueError(f"Invalid order: {order}")
+    if page_size <= 0:
+        raise ValueError(f"page_size must be positive: {page_size}")
+    page_size = min(page_size, MAX_PAGE_SIZE)
+    if facets is None:
+        facets = cursor is None
+
+    where, params = build_filters(**(filters or {}))
+    expr = SORT_KEYS[sort]
+    direction = "DESC" if order == "desc" else "ASC"
+
+    # 键集条件：排序值与 id 同向；SQLite 不用行值比较定位索引，
+    # 先加排序值的单列边界使 (domain, 排序值, id) 索引从游标处开始范围扫描，行值比较只排除同值的已读行
+    keyset, keyset_params = "", []
+    if cursor:
+        cursor_sort, cursor_order, sort_value, last_id = decode_cursor(cursor)
+        if (cursor_sort, cursor_order) != (sort, order):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        bound, op = ("<=", "<") if order == "desc" else (">=", ">")
+        keyset = f"AND {expr} {bound} ? AND ({expr}, id) {op} (?, ?)"
+        keyset_params = [sort_value, sort_value, last_id]
+
+    page_sql = f"""
+    SELECT {LIST_COLUMNS}, {expr} AS sort_value
+    FROM projects
+    WHERE {where} {keyset}
+    ORDER BY {expr} {direction}, id {direction}
+    LIMIT ?
+    """
+    page_params = params + keyset_params + [page_size + 1]
+
+    if facets:
+        # filtered 被多次引用，SQLite 只物化一次；分面与总数在这一遍扫描的结果上计算
+        facet_columns = ",\n".join(
+            f"(SELECT json_group_array(json_array(value, n)) FROM ("
+            f"SELECT {column} AS value, COUNT(*) AS n FROM filtered GROUP BY 1 ORDER BY 2 DESC, 1"
+            f")) AS facet_{name}"
+            for name, column in FACETS.items()
+        )
+        sql = f"""
+        WITH filtered AS (
+            SELECT {', '.join(FACETS.values())} FROM projects WHERE {where}
+        ),
+        page AS ({page_sql})
+        SELECT summary.*, page.*
+        FROM (
+            SELECT (SELECT COUNT(*) FROM filtered) AS total,
+            {facet_columns}
+        ) AS summary
+        LEFT JOIN page ON 1
+        ORDER BY page.sort_value {direction}, page.id {direction}
+        """
+        rows = conn.execute(sql, params + page_params).fetchall()
+        summary_width = 1 + len(FACETS)
+    else:
+        rows = conn.execute(page_sql, page_params).fetchall()
+        summary_width = 0
+
+    columns = [c.strip() for c in LIST_COLUMNS.split(",")]
+    items = []
+    for row in rows:
+        values = row[summary_width:]
+        if values[0] is None:  # 分面查询在没有结果时仍返回一行汇总
+            continue
+        items.append(dict(zip(columns + ["sort_value"], values)))
+
+    # 多取一行判断是否还有下一页
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(sort, order, items[-1]["sort_value"], items[-1]["id"])
+    for item in items:
+        del item["sort_value"]
+
+    result = {
+        "items": items,
+        "next_cursor": next_cursor,
+        "sort": sort,
+        "order": order,
+        "page_size": page_size,
+    }
+    if facets:
+        summary = rows[0][:summary_width]
+        result["total"] = summary[0]
+        result["facets"] = {
+            name: [{"value": value, "count": count} for value, count in json.loads(raw)]
+            for name, raw in zip(FACETS, summary[1:])
+        }
+    return result
+
+
+def main():
+    """为已有数据库建立浏览索引"""
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "../data/projects.db"
+
+    conn = sqlite3.connect(db_path)
+    ensure_listing_indexes(conn)
+    conn.commit()
+    conn.close()
+
+    print(f"✅ 浏览索引已建立: {db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Project Store
+项目数据库的统一存储层：持有连接（按线程复用）、设置连接参数、执行版本化的表结构迁移
+
+- reader(): 只读 URI 连接（mode=ro），推荐引擎、分析工具与 API 使用
+- writer() / transaction(): 读写连接，采集器入库使用
+- 表结构与索引的演进写在 MIGRATIONS 中，以 PRAGMA user_version 记录已执行的版本，
+  任何工具打开可写存储时都会补齐缺失的迁移
+
+连接不跨进程使用：fork 后的子进程会重新建立连接。
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+from urllib.parse import quote
+
+from domain_stats import ensure_data_version, ensure_domain_stats
+from project_listing import ensure_listing_indexes
+
+
+# 每个连接的参数：页缓存 32MB（负数单位为 KB）、mmap 256MB、锁等待 5 秒
+CONNECTION_PRAGMAS = {
+    "cache_size": -32768,
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+# 读写连接另外设置：WAL（写入时读者不阻塞，设置后持久保存在数据库文件中），
+# WAL 模式下 synchronous=NORMAL 只在检查点时 fsync
+WRITER_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+}
+
+PROJECTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    domain TEXT NOT NULL,
+    name TEXT NOT NULL,
+    full_name TEXT UNIQUE NOT NULL,
+    url TEXT NOT NULL,
+    stars INTEGER DEFAULT 0,
+    forks INTEGER DEFAULT 0,
+    watchers INTEGER DEFAULT 0,
+    open_issues INTEGER DEFAULT 0,
+    description TEXT,
+    main_language TEXT,
+    tech_stack TEXT,
+    last_updated DATE,
+    created_at DATE,
+    activity_score REAL DEFAULT 0,
+    relevance_score REAL DEFAULT 0,
+    readme_summary TEXT,
+    license TEXT,
+    topics TEXT,
+    contributors_count INTEGER DEFAULT 0,
+    collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(full_name)
+);
+
+CREATE TABLE IF NOT EXISTS project_features (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL,
+    feature_type TEXT NOT NULL,
+    description TEXT,
+    FOREIGN KEY (project_id) REFERENCES projects(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_domain ON projects(domain);
+
+CREATE INDEX IF NOT EXISTS idx_stars ON projects(stars DESC)
+"""
+
+# 推荐引擎候选集生成所用的复合索引；语料缓存的数据版本查询（MAX(collected_at) + COUNT）
+RECOMMENDATION_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_domain_activity ON projects(domain, activity_score DESC, stars DESC);
+
+CREATE INDEX IF NOT EXISTS idx_domain_stars ON projects(domain, stars DESC);
+
+CREATE INDEX IF NOT EXISTS idx_domain_forks ON projects(domain, forks DESC);
+
+CREATE INDEX IF NOT EXISTS idx_domain_language
+ON projects(domain, main_language COLLATE NOCASE, activity_score DESC);
+
+CREATE INDEX IF NOT EXISTS idx_domain_collected ON projects(domain, collected_at)
+"""
+
+
+def _execute_script(script: str) -> Callable[[sqlite3.Connection], None]:
+    """逐条执行（executescript 会先提交当前事务）"""
+    def apply(conn: sqlite3.Connection):
+        for statement in script.split(";\n\n"):
+            conn.execute(statement)
+    return apply
+
+
+# 版本化迁移：(版本, 说明, 迁移函数)，版本号只增不改；均为幂等语句，
+# 引入迁移前创建的数据库（user_version = 0）会安全地补齐全部版本
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "项目表与基础索引", _execute_script(PROJECTS_SCHEMA)),
+    (2, "推荐引擎复合索引", _execute_script(RECOMMENDATION_INDEXES)),
+    (3, "领域统计物化表", ensure_domain_stats),
+    (4, "项目浏览排序与分面索引", ensure_listing_indexes),
+    (5, "数据版本计数", ensure_data_version),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """数据库已执行到的迁移版本"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> List[int]:
+    """
+    执行尚未执行的迁移（每个版本一个事务）
+
+    Returns:
+        本次执行的版本号
+    """
+    applied = []
+    for version, description, apply in MIGRATIONS:
+        if version <= schema_version(conn):
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 取得写锁后再确认（其他进程可能已完成同一迁移）
+            if version > schema_version(conn):
+                apply(conn)
+                conn.execute(f"PRAGMA user_version = {version}")
+                applied.append(version)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return applied
+
+
+class ProjectStore:
+    """
+    项目数据库存储
+
+    每个线程各持有一个只读连接与一个读写连接（sqlite3 连接不能跨线程并发使用），
+    线程结束后其连接在下次建连时关闭。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[Tuple[weakref.ref, sqlite3.Connection]] = []
+        self._inherited: List[Tuple[weakref.ref, sqlite3.Connection]] = []
+        self._pid = os.getpid()
+
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        if readonly:
+            uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            for name, value in WRITER_PRAGMAS.items():
+                conn.execute(f"PRAGMA {name} = {value}")
+        for name, value in CONNECTION_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+        with self._lock:
+            # 关闭已结束线程的连接
+            alive = []
+            for thread_ref, other in self._connections:
+                thread = thread_ref()
+                if thread is not None and thread.is_alive():
+                    alive.append((thread_ref, other))
+                else:
+                    other.close()
+            alive.append((weakref.ref(threading.current_thread()), conn))
+            self._connections = alive
+        return conn
+
+    def _connection(self, readonly: bool) -> sqlite3.Connection:
+        if os.getpid() != self._pid:
+            # fork 后的子进程：不再使用继承的连接，也不在子进程中关闭（保留引用）
+            self._inherited = self._connections
+            self._local = threading.local()
+            self._connections = []
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+
+        key = "reader" if readonly else "writer"
+        conn = getattr(self._local, key, None)
+        if conn is None:
+            conn = self._connect(readonly)
+            setattr(self._local, key, conn)
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """当前线程的只读连接（数据库不存在时抛出 sqlite3.OperationalError）"""
+        return self._connection(readonly=True)
+
+    def writer(self) -> sqlite3.Connection:
+        """当前线程的读写连接"""
+        return self._connection(readonly=False)
+
+    @contextmanager
+    def read_transaction(self) -> Iterator[sqlite3.Connection]:
+        """只读事务：事务内的多条查询读取同一个数据快照"""
+        conn = self.reader()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """写事务：正常退出时提交，异常时回滚"""
+        conn = self.writer()
+        conn.execute("BEGIN")
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def migrate(self) -> List[int]:
+        """执行尚未执行的迁移（已是最新版本时只读取一次 user_version）"""
+        return migrate(self.writer())
+
+    def schema_version(self) -> int:
+        return schema_version(self.reader())
+
+    def close(self):
+        """关闭所有线程的连接"""
+        with self._lock:
+            for _, conn in self._connections:
+                conn.close()
+            self._connections = []
+            self._local = threading.local()
+
+
+_stores: Dict[str, ProjectStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(db_path: str, migrate: bool = True) -> ProjectStore:
+    """
+    按数据库路径共享的存储（同一进程内的各模块复用连接）
+
+    Args:
+        migrate: 是否补齐表结构迁移（只读的使用方设为 False，不会创建数据库文件）
+    """
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ProjectStore(db_path)
+    if migrate:
+        store.migrate()
+    return store
+
+
+def main():
+    """对已有数据库执行迁移"""
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "../data/projects.db"
+
+    store = ProjectStore(db_path)
+    applied = store.migrate()
+    for version, description, _ in MIGRATIONS:
+        if version in applied:
+            print(f"  🔧 v{version}: {description}")
+
+    print(f"✅ 数据库结构版本 v{store.schema_version()}: {db_path}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
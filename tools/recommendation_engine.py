@@ -6,10 +6,52 @@ AI Intelligent Recommendation Engine
 
 import json
 import sqlite3
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Iterator, List, Dict, Optional, Tuple
+from dataclasses import dataclass, replace
 from enum import Enum
 
+import numpy as np
+
+from feature_index import (
+    FeatureIndex,
+    feature_matches,
+    has_feature_index,
+    project_terms,
+    tokenize
+)
+from base_scores import base_scores_path, load_base_tables
+from commercial_catalog import (
+    DEFAULT_CATALOG_PATH,
+    CommercialCatalog,
+    CommercialTool,
+    score_commercial
+)
+from corpus_cache import CorpusCache, DomainCorpus
+from corpus_snapshot import CorpusSnapshot
+from domain_stats import read_data_version
+from project_store import get_store
+from metrics import MetricFamily, StageMetrics, StageTimer, activate, current_timer
+from result_cache import CacheEntry, RecommendationCache, compact_result
+from result_pages import KIND_NAMES, RankedResults
+from scoring_kernel import (
+    PRIORITIES,
+    DomainColumns,
+    score_open_source,
+    select_top_k,
+    select_top_k_pruned
+)
+
+# 分页排序缓存的总大小上限（每项 32 字节：10 万行的领域每个需求画像约 3 MB）
+RANKING_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# 流式输出不超过该数量时按 Top-K 选择（与 get_recommendations 共用结果缓存），不对整个领域排序
+STREAM_TOP_K_MAX = 100
+
 
 class Domain(Enum):
     """领域枚举"""
@@ -45,205 +87,299 @@ class UserRequirements:
     language_preference: List[str] = None  # 编程语言偏好
 
 
+def requirements_key(requirements: UserRequirements, ranking_only: bool = False) -> Tuple:
+    """
+    需求的缓存键（只用于查找缓存，需求本身原样用于评分、推荐理由与回显）
+
+    语言偏好只以小写集合参与评分且不回显，统一小写、去重并排序；
+    功能按给出的顺序回显并用于推荐理由、重复项计入匹配比例，因此保持原样。
+    ranking_only 为 True 时（只缓存分数的排序）功能统一小写并排序，保留重复项。
+    """
+    features = requirements.features or []
+    if ranking_only:
+        features = sorted(feature.lower() for feature in features)
+    languages = sorted({lang.lower() for lang in requirements.language_preference or []})
+    return (
+        requirements.domain.value,
+        requirements.experience.value,
+        requirements.budget.value,
+        requirements.priority,
+        tuple(features),
+        tuple(languages),
+    )
+
+
 class RecommendationEngine:
     """AI 推荐引擎"""
 
-    def __init__(self, db_path: str = "../data/projects.db"):
+    def __init__(self,
+                 db_path: str = "../data/projects.db",
+                 vectorized: bool = True,
+                 candidate_pool: Optional[int] = None,
+                 cache_corpus: bool = True,
+                 corpus_max_bytes: Optional[int] = None,
+                 version_check_interval: float = 1.0,
+                 result_cache_size: int = 1024,
+                 result_cache_ttl: float = 300.0,
+                 ranking_cache_size: int = 64,
+                 ranking_cache_max_bytes: Optional[int] = RANKING_CACHE_MAX_BYTES,
+                 commercial_catalog_path: Optional[str] = None,
+                 corpus_snapshot_path: Optional[str] = None,
+                 instrument: bool = False,
+                 domain_workers: int = len(Domain)):
         self.db_path = db_path
+        # 只读连接（按线程复用）；引擎不修改数据库，也不执行迁移
+        self.store = get_store(db_path, migrate=False)
+        # 向量化评分模式：整域列式计算，结果与逐项评分逐位一致
+        self.vectorized = vectorized
+        # 候选集大小：None 表示对整个领域精确排序；设置后仅对索引候选集评分
+        self.candidate_pool = candidate_pool
+
+        # 只读语料快照（mmap，多进程共享页缓存）：版本与数据库一致时直接使用，否则回退到数据库
+        self.corpus_snapshot = CorpusSnapshot(corpus_snapshot_path) if corpus_snapshot_path else None
+
+        # 领域语料缓存：数据版本变化时才重新读取数据库
+        self.corpus_cache = CorpusCache(
+            loader=self._load_corpus,
+            version_of=self.get_data_version,
+            max_bytes=corpus_max_bytes,
+            check_interval=version_check_interval
+        ) if cache_corpus else None
+
+        # 推荐结果缓存：键为规范化需求 + top_n + 数据版本 + 目录版本（size 为 0 时关闭）
+        self.result_cache = RecommendationCache(
+            maxsize=result_cache_size,
+            ttl=result_cache_ttl
+        ) if result_cache_size > 0 else None
+
+        # 分页排序缓存：每个需求画像的完整排序（只含分数与行号），按条目数与总字节数淘汰
+        self.ranking_cache = RecommendationCache(
+            maxsize=ranking_cache_size,
+            ttl=result_cache_ttl,
+            max_bytes=ranking_cache_max_bytes,
+            sizeof=lambda ranking: ranking.nbytes
+        ) if ranking_cache_size > 0 else None
+
+        # 分阶段计时：instrument 开启时每个请求都计入直方图
+        self.instrument = instrument
+        self.stage_metrics = StageMetrics()
+
+        # SQLite 查询耗时（按查询类型，始终记录；可注册到 MetricsRegistry 导出）
+        self.query_metrics = MetricFamily(
+            "sqlite_query_duration_seconds", "histogram",
+            "SQLite query latency by query type", ("query",)
+        )
 
-        # 2025 最新商业工具数据（从 WebSearch 调研获得）
-        self.commercial_tools = {
-            "latex": [
-                {
-                    "name": "Overleaf AI Assist",
-                    "url": "https://www.overleaf.com",
-                    "description": "2025年6月发布，服务2000万用户，AI辅助写作和建议",
-                    "price": "Free with Pro ($15/mo for advanced AI)",
-                    "stars": 20000000,  # user count as proxy
-                    "features": ["ai_writing", "collaboration", "templates", "real_time"],
-                    "experience_level": ["beginner", "intermediate", "advanced"],
-                    "activity_score": 98,
-                    "latest_update": "2025-06-01"
-                },
-                {
-                    "name": "Underleaf",
-                    "url": "https://underleaf.io",
-                    "description": "2025新工具，AI驱动的LaTeX编辑器",
-                    "price": "TBD",
-                    "stars": 0,
-                    "features": ["ai_generation", "modern_ui"],
-                    "experience_level": ["beginner", "intermediate"],
-                    "activity_score": 95,
-                    "latest_update": "2025-01-01"
-                },
-                {
-                    "name": "Paperpal for Overleaf",
-                    "url": "https://paperpal.com/overleaf",
-                    "description": "2025年1月发布，免费无限语法检查",
-                    "price": "Free (grammar), Premium ($12/mo for AI suggestions)",
-                    "stars": 500000,
-                    "features": ["grammar_check", "ai_suggestions", "paraphrasing"],
-                    "experience_level": ["beginner", "intermediate", "advanced"],
-                    "activity_score": 96,
-                    "latest_update": "2025-01-01"
-                },
-                {
-                    "name": "Mathpix Snip",
-                    "url": "https://mathpix.com",
-                    "description": "OCR工具，2025年3月降价，50次/月免费",
-                    "price": "Free (50/mo), Pro ($4.99/mo)",
-                    "stars": 100000,
-                    "features": ["ocr", "handwriting_recognition", "equation_conversion"],
-                    "experience_level": ["intermediate", "advanced"],
-                    "activity_score": 92,
-                    "latest_update": "2025-03-01"
-                }
-            ],
-            "cad": [
-                {
-                    "name": "AdamCAD",
-                    "url": "https://adamcad.com",
-                    "description": "2025年1月24日发布，融资410万美元，文本生成3D模型",
-                    "price": "Free beta",
-                    "stars": 50000,
-                    "features": ["text_to_3d", "ai_generation", "parametric"],
-                    "experience_level": ["beginner", "intermediate"],
-                    "activity_score": 99,
-                    "latest_update": "2025-01-24"
-                },
-                {
-                    "name": "SOLIDWORKS 2025 AURA",
-                    "url": "https://www.solidworks.com",
-                    "description": "2025年7月Beta，内置AI助手",
-                    "price": "Enterprise (contact sales)",
-                    "stars": 1000000,
-                    "features": ["ai_assistant", "automation", "enterprise_features"],
-                    "experience_level": ["intermediate", "advanced"],
-                    "activity_score": 97,
-                    "latest_update": "2025-07-01"
-                },
-                {
-                    "name": "Zoo.dev Text-to-CAD",
-                    "url": "https://zoo.dev",
-                    "description": "文本生成CAD模型，API可用",
-                    "price": "API pricing (usage-based)",
-                    "stars": 20000,
-                    "features": ["text_to_cad", "api", "automation"],
-                    "experience_level": ["intermediate", "advanced"],
-                    "activity_score": 94,
-                    "latest_update": "2025-01-01"
-                },
-                {
-                    "name": "DraftAid",
-                    "url": "https://draftaid.com",
-                    "description": "90% 时间减少，专业CAD辅助",
-                    "price": "Subscription (TBD)",
-                    "stars": 10000,
-                    "features": ["time_saving", "automation", "ai_suggestions"],
-                    "experience_level": ["intermediate", "advanced"],
-                    "activity_score": 93,
-                    "latest_update": "2025-01-01"
-                }
-            ],
-            "circuit": [
-                {
-                    "name": "Quilter",
-                    "url": "https://github.com/freechipsproject/quilter",
-                    "description": "突破性工具：1周完成843组件Linux电脑，一次启动成功",
-                    "price": "Open source",
-                    "stars": 5000,
-                    "features": ["ai_design", "automated_routing", "verification"],
-                    "experience_level": ["advanced"],
-                    "activity_score": 98,
-                    "latest_update": "2025-01-01"
-                },
-                {
-                    "name": "Circuit Mind",
-                    "url": "https://circuitmind.io",
-                    "description": "60秒生成原理图和BOM",
-                    "price": "Contact sales",
-                    "stars": 8000,
-                    "features": ["fast_generation", "bom_generation", "ai_optimization"],
-                    "experience_level": ["intermediate", "advanced"],
-                    "activity_score": 96,
-                    "latest_update": "2025-01-01"
-                },
-                {
-                    "name": "Siemens Solido Design Suite",
-                    "url": "https://www.siemens.com/solido",
-                    "description": "2025年12月发布，SPICE仿真提速2-30倍",
-                    "price": "Enterprise",
-                    "stars": 50000,
-                    "features": ["spice_simulation", "high_performance", "enterprise"],
-                    "experience_level": ["advanced"],
-                    "activity_score": 97,
-                    "latest_update": "2025-12-01"
-                }
-            ],
-            "framework": [
-                {
-                    "name": "Google ADK",
-                    "url": "https://cloud.google.com/adk",
-                    "description": "Cloud NEXT 2025发布的AI开发套件",
-                    "price": "Cloud pricing (usage-based)",
-                    "stars": 100000,
-                    "features": ["cloud_native", "multi_agent", "enterprise"],
-                    "experience_level": ["intermediate", "advanced"],
-                    "activity_score": 99,
-                    "latest_update": "2025-01-01"
-                },
-                {
-                    "name": "CrewAI",
-                    "url": "https://github.com/joaomdmoura/crewAI",
-                    "description": "GitHub stars Q3 2024→Q1 2025增长3倍",
-                    "price": "Open source",
-                    "stars": 30000,
-                    "features": ["multi_agent", "role_playing", "task_automation"],
-                    "experience_level": ["intermediate"],
-                    "activity_score": 98,
-                    "latest_update": "2025-01-01"
-                },
-                {
-                    "name": "Cursor",
-                    "url": "https://cursor.sh",
-                    "description": "基准测试：62.95s vs Copilot 89.91s，准确率51.7%",
-                    "price": "$20/mo Pro",
-                    "stars": 500000,
-                    "features": ["code_completion", "ai_chat", "fast_performance"],
-                    "experience_level": ["beginner", "intermediate", "advanced"],
-                    "activity_score": 97,
-                    "latest_update": "2025-01-01"
-                }
-            ]
+        # 跨领域模式的线程池（首次使用时创建）
+        self.domain_workers = domain_workers
+        self._domain_executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+        # 商业工具目录（2025 调研数据，data/commercial_tools.json；文件修改后自动重新加载）
+        self.commercial_catalog = CommercialCatalog(commercial_catalog_path or DEFAULT_CATALOG_PATH)
+
+    @property
+    def commercial_tools(self) -> Dict[str, List[Dict]]:
+        """{领域: [商业工具]}"""
+        return self.commercial_catalog.to_dict()
+
+    # 项目查询字段
+    PROJECT_COLUMNS = """
+        id, name, full_name, url, stars, forks, description,
+        main_language, activity_score, last_updated, license, topics
+    """
+
+    def get_data_version(self, domain: Optional[str] = None) -> str:
+        """领域数据版本：最近采集时间 + 写入计数（domain 为 None 时为整个数据库）"""
+        with current_timer().stage("fetch"), self.query_metrics.labels("data_version").time():
+            return self._data_version(self.store.reader(), domain)
+
+    @staticmethod
+    def _data_version(conn: sqlite3.Connection, domain: Optional[str] = None) -> str:
+        """读取触发器维护的数据版本；尚未迁移的数据库回退为扫描 projects 表"""
+        version = read_data_version(conn, domain)
+        if version is not None:
+            return version
+        if domain is None:
+            count, latest = conn.execute(
+                "SELECT COUNT(*), MAX(collected_at) FROM projects").fetchone()
+        else:
+            count, latest = conn.execute(
+                "SELECT COUNT(*), MAX(collected_at) FROM projects WHERE domain = ?", (domain,)
+            ).fetchone()
+        return f"{latest or ''}#{count}"
+
+    def get_corpus(self, domain: str) -> DomainCorpus:
+        """获取领域语料（启用缓存时按数据版本复用）"""
+        if self.corpus_cache is not None:
+            return self.corpus_cache.get(domain)
+        return self._load_corpus(domain)
+
+    def warmup(self, domains: Optional[List[Domain]] = None) -> Dict[str, Dict]:
+        """
+        预加载领域语料、功能倒排表与全部基础分表（服务启动时调用）
+
+        各领域并发加载；未启用语料缓存（或使用候选集模式）时无可预热内容。
+
+        Returns:
+            {领域: {"projects": 项目数, "ms": 耗时}}
+        """
+        if self.corpus_cache is None or self.candidate_pool:
+            return {}
+
+        def load(domain: Domain) -> Dict:
+            start = time.perf_counter()
+            corpus = self.corpus_cache.get(domain.value)
+            for experience in Experience:
+                for priority in PRIORITIES:
+                    corpus.base_table(experience.value, priority)
+            return {"projects": len(corpus), "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+        domains = list(dict.fromkeys(domains or list(Domain)))
+        executor = self._get_domain_executor()
+        return {
+            domain.value: summary
+            for domain, summary in zip(domains, executor.map(load, domains))
         }
 
-    def get_github_projects(self, domain: str, limit: int = 50) -> List[Dict]:
-        """从数据库获取GitHub项目"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-        SELECT name, full_name, url, stars, forks, description,
-               main_language, activity_score, last_updated, license, topics
+    def _load_corpus(self, domain: str) -> DomainCorpus:
+        """在同一读事务中加载版本、项目与倒排索引（快照版本一致时直接映射快照）"""
+        if self.corpus_snapshot is not None:
+            version = self.get_data_version(domain)
+            with current_timer().stage("decode"):
+                corpus = self.corpus_snapshot.corpus(domain, version)
+            if corpus is not None:
+                return corpus
+
+        with self.store.read_transaction() as conn:
+            with self.query_metrics.labels("data_version").time():
+                version = self._data_version(conn, domain)
+            projects = self._fetch_projects(f"""
+            SELECT {self.PROJECT_COLUMNS}
+            FROM projects
+            WHERE domain = ?
+            ORDER BY activity_score DESC, stars DESC, id
+            """, (domain,), conn)
+            feature_index = None
+            with current_timer().stage("fetch"), self.query_metrics.labels("feature_index").time():
+                if has_feature_index(conn):
+                    feature_index = FeatureIndex.from_database(
+                        conn, [p['id'] for p in projects], domain=domain)
+
+        with current_timer().stage("decode"):
+            # 离线预计算的基础分表（版本或项目顺序不一致时忽略，改为按需计算）
+            base_tables = load_base_tables(
+                base_scores_path(self.db_path), domain, version,
+                np.array([p['id'] for p in projects], dtype=np.int64)
+            )
+            return DomainCorpus(domain, version, projects, feature_index, base_tables)
+
+    def get_github_projects(self, domain: str, limit: Optional[int] = 50) -> List[Dict]:
+        """从数据库获取GitHub项目（limit 为 None 时返回整个领域）"""
+        query = f"""
+        SELECT {self.PROJECT_COLUMNS}
         FROM projects
         WHERE domain = ?
-        ORDER BY activity_score DESC, stars DESC
-        LIMIT ?
-        """, (domain, limit))
-
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-
-        projects = []
-        for row in rows:
-            project = dict(zip(columns, row))
-            try:
-                project['topics'] = json.loads(project['topics']) if project['topics'] else []
-            except:
-                project['topics'] = []
-            projects.append(project)
-
-        conn.close()
+        ORDER BY activity_score DESC, stars DESC, id
+        """
+        params: Tuple = (domain,)
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+
+        return self._fetch_projects(query, params)
+
+    def get_candidate_projects(self,
+                               requirements: UserRequirements,
+                               pool_size: int) -> List[Dict]:
+        """
+        候选集生成：沿索引取各评分维度的头部项目并合并
+
+        每个来源对应一个复合索引（活跃度、星标、Fork 数、语言），
+        只读取可能进入 Top-K 的行，而不是整个领域。
+        """
+        domain = requirements.domain.value
+        sources = [
+            ("ORDER BY activity_score DESC, stars DESC", ()),
+            ("ORDER BY stars DESC", ()),
+        ]
+        if requirements.priority == "community":
+            sources.append(("ORDER BY forks DESC", ()))
+        if requirements.language_preference:
+            languages = sorted({lang.lower() for lang in requirements.language_preference} | {"python"})
+            placeholders = ", ".join("?" * len(languages))
+            sources.append((
+                f"AND main_language COLLATE NOCASE IN ({placeholders}) "
+                f"ORDER BY activity_score DESC",
+                tuple(languages)
+            ))
+
+        subqueries = []
+        params: Tuple = ()
+        for clause, extra in sources:
+            subqueries.append(
+                f"SELECT id FROM (SELECT id FROM projects WHERE domain = ? {clause} LIMIT ?)"
+            )
+            params += (domain,) + extra + (pool_size,)
+
+        # 功能倒排表：命中任一功能 term 的项目
+        terms = sorted({term for feature in requirements.features or [] for term in tokenize(feature)})
+        if terms and self._has_feature_index():
+            placeholders = ", ".join("?" * len(terms))
+            subqueries.append(f"""SELECT id FROM (
+                SELECT DISTINCT p.id FROM project_terms t JOIN projects p ON p.id = t.project_id
+                WHERE p.domain = ? AND t.term IN ({placeholders})
+                ORDER BY p.activity_score DESC LIMIT ?)""")
+            params += (domain,) + tuple(terms) + (pool_size,)
+
+        query = f"""
+        SELECT {self.PROJECT_COLUMNS}
+        FROM projects
+        WHERE id IN ({" UNION ".join(subqueries)})
+        ORDER BY activity_score DESC, stars DESC, id
+        """
+        return self._fetch_projects(query, params)
+
+    def _has_feature_index(self) -> bool:
+        """数据库是否已建立功能倒排表"""
+        return has_feature_index(self.store.reader())
+
+    def _load_feature_index(self,
+                            projects: List[Dict],
+                            features: List[str]) -> Optional[FeatureIndex]:
+        """加载本次请求所需 term 的倒排列表；数据库未建索引时返回 None"""
+        conn = self.store.reader()
+        if not has_feature_index(conn):
+            return None
+        terms = {term for feature in features or [] for term in tokenize(feature)}
+        with self.query_metrics.labels("feature_index").time():
+            return FeatureIndex.from_database(conn, [p['id'] for p in projects], terms)
+
+    def _fetch_projects(self,
+                        query: str,
+                        params: Tuple,
+                        conn: Optional[sqlite3.Connection] = None) -> List[Dict]:
+        """执行查询并解析项目行"""
+        timer = current_timer()
+
+        with timer.stage("fetch"), self.query_metrics.labels("projects").time():
+            cursor = (conn or self.store.reader()).cursor()
+
+            cursor.execute(query, params)
+
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchall()
+
+        with timer.stage("decode"):
+            projects = []
+            for row in rows:
+                project = dict(zip(columns, row))
+                try:
+                    project['topics'] = json.loads(project['topics']) if project['topics'] else []
+                except:
+                    project['topics'] = []
+                projects.append(project)
+
         return projects
 
     def calculate_relevance_score(self,
@@ -260,7 +396,7 @@ class RecommendationEngine:
 
         # 2. 编程语言匹配 (15分)
         if requirements.language_preference:
-            project_lang = project.get('main_language', '').lower()
+            project_lang = (project.get('main_language', '') or '').lower()
             if project_lang in [lang.lower() for lang in requirements.language_preference]:
                 score += 15
             elif project_lang == 'python':  # Python通用性高
@@ -282,13 +418,11 @@ class RecommendationEngine:
 
         # 4. 功能特性匹配 (25分)
         if requirements.features:
-            project_desc = (project.get('description', '') or '').lower()
-            project_topics = project.get('topics', [])
-            project_text = project_desc + ' ' + ' '.join(project_topics)
+            terms = project_terms(project.get('description'), project.get('topics', []))
 
             matched_features = 0
             for feature in requirements.features:
-                if feature.lower() in project_text:
+                if feature_matches(feature, terms):
                     matched_features += 1
 
             feature_score = (matched_features / len(requirements.features)) * 25
@@ -313,112 +447,368 @@ class RecommendationEngine:
         if 'mit' in license_name or 'apache' in license_name:
             score += 5
 
-        return min(score, 100)
+        return min(score, 100.0)
 
     def calculate_commercial_score(self,
-                                   tool: Dict,
+                                   tool: CommercialTool,
                                    requirements: UserRequirements) -> float:
-        """计算商业工具相关度分数"""
+        """计算商业工具相关度分数（价格与经验得分已在目录加载时预计算）"""
         score = 0.0
 
         # 1. 价格匹配 (30分)
-        price = tool.get('price', '').lower()
-        if requirements.budget == Budget.FREE:
-            if 'free' in price or 'open source' in price:
-                score += 30
-            elif '$' in price:
-                try:
-                    amount = int(''.join(filter(str.isdigit, price.split('/')[0])))
-                    if amount <= 10:
-                        score += 15
-                except:
-                    pass
-        elif requirements.budget == Budget.LOW:
-            if 'free' in price:
-                score += 20
-            elif '$' in price and 'contact' not in price:
-                score += 30
-        elif requirements.budget == Budget.MEDIUM:
-            if 'pro' in price or 'premium' in price:
-                score += 30
-        else:  # HIGH
-            if 'enterprise' in price or 'contact' in price:
-                score += 30
+        score += tool.budget_points[requirements.budget.value]
 
         # 2. 经验水平匹配 (20分)
-        exp_levels = tool.get('experience_level', [])
-        if requirements.experience.value in exp_levels:
-            score += 20
-        elif requirements.experience == Experience.BEGINNER and 'intermediate' in exp_levels:
-            score += 10
+        score += tool.experience_points[requirements.experience.value]
 
         # 3. 功能匹配 (30分)
-        tool_features = tool.get('features', [])
         if requirements.features:
-            matched = sum(1 for f in requirements.features
-                         if any(f.lower() in tf.lower() for tf in tool_features))
+            matched = sum(1 for f in requirements.features if tool.matches(f))
             score += (matched / len(requirements.features)) * 30
 
         # 4. 活跃度和用户基数 (20分)
-        activity = tool.get('activity_score', 0)
-        score += (activity / 100) * 20
+        score += (tool.activity_score / 100) * 20
 
         return min(score, 100)
 
     def get_recommendations(self,
                           requirements: UserRequirements,
-                          top_n: int = 10) -> Dict:
-        """获取推荐结果"""
+                          top_n: int = 10,
+                          include_timings: bool = False) -> Dict:
+        """
+        获取推荐结果（启用结果缓存时返回共享对象，请勿修改）
+
+        include_timings 为 True 时返回带 "timings" 分阶段耗时的副本。
+        """
+        entry, timings = self._recommend(requirements, top_n, include_timings)
+        if timings is None:
+            return entry.result
+        return {**entry.result, "timings": timings}
+
+    def get_recommendations_json(self,
+                                 requirements: UserRequirements,
+                                 top_n: int = 10,
+                                 include_timings: bool = False,
+                                 include_lists: bool = True) -> bytes:
+        """
+        获取序列化后的推荐结果（命中缓存时跳过评分与序列化）
+
+        include_lists 为 False 时只输出 requirements 与 recommendations。
+        """
+        entry, timings = self._recommend(requirements, top_n, include_timings)
+        if timings is None:
+            return RecommendationCache.serialize(entry, include_lists)
+        result = entry.result if include_lists else compact_result(entry.result)
+        return json.dumps({**result, "timings": timings}, ensure_ascii=False).encode("utf-8")
+
+    def stream_recommendations(self,
+                               requirements: UserRequirements,
+                               top_n: int = 10) -> Iterator[Dict]:
+        """
+        按排名逐条生成推荐（NDJSON 流式输出用）
+
+        第一项为 {"requirements", "count"} 头部，之后依次为与
+        get_recommendations 的 "recommendations" 相同的结果项。
+        top_n 不超过 STREAM_TOP_K_MAX 时直接输出 get_recommendations 的结果（Top-K 选择，共用结果缓存）；
+        更大的 top_n 复用分页的完整排序，结果字典与推荐理由逐条生成。
+        评分在调用时完成，参数错误在开始输出前抛出。
+        """
+        if top_n <= 0:
+            raise ValueError(f"top_n must be positive: {top_n}")
+
+        if top_n <= STREAM_TOP_K_MAX:
+            entry, _ = self._recommend(requirements, top_n, False)
+            recommendations = entry.result["recommendations"]
+            header = {"requirements": entry.result["requirements"], "count": len(recommendations)}
+            return chain([header], recommendations)
+
+        ranking, _ = self._timed(lambda: self._get_ranking(requirements), False)
+        header = {
+            "requirements": self._describe_requirements(requirements),
+            "count": min(top_n, len(ranking)),
+        }
+
+        def items() -> Iterator[Dict]:
+            for score, kind, record in ranking.iter_items(0, top_n):
+                item = {**record, "relevance_score": score, "type": KIND_NAMES[kind]}
+                item["reasoning"] = self._generate_reasoning(item, requirements)
+                yield item
+
+        return chain([header], items())
+
+    def get_multi_domain_recommendations(self,
+                                         requirements: UserRequirements,
+                                         domains: Optional[List[Domain]] = None,
+                                         top_n: int = 10,
+                                         include_lists: bool = True) -> Dict:
+        """
+        跨领域推荐：各领域并发评分（复用语料与结果缓存），再对各领域 Top-K 做 k 路归并
+
+        Args:
+            requirements: 用户需求（domain 字段被忽略）
+            domains: 参与的领域，None 表示全部领域
+            top_n: 推荐数量
+            include_lists: 是否输出 commercial_tools / open_source_projects 分类型列表
+        """
+        if top_n <= 0:
+            raise ValueError(f"top_n must be positive: {top_n}")
+
+        domains = list(dict.fromkeys(domains or list(Domain)))
+        executor = self._get_domain_executor()
+        futures = [
+            executor.submit(self.get_recommendations, replace(requirements, domain=domain), top_n)
+            for domain in domains
+        ]
+        per_domain = [(domain.value, future.result()) for domain, future in zip(domains, futures)]
+
         results = {
             "requirements": {
-                "domain": requirements.domain.value,
+                "domains": [domain.value for domain in domains],
                 "experience": requirements.experience.value,
                 "budget": requirements.budget.value,
                 "features": requirements.features,
                 "priority": requirements.priority
-            },
+            }
+        }
+        if include_lists:
+            results["commercial_tools"] = self._merge_ranked(per_domain, "commercial_tools", top_n)
+            results["open_source_projects"] = self._merge_ranked(per_domain, "open_source_projects", top_n)
+        results["recommendations"] = self._merge_ranked(per_domain, "recommendations", top_n)
+        return results
+
+    @staticmethod
+    def _merge_ranked(per_domain: List[Tuple[str, Dict]], field: str, top_n: int) -> List[Dict]:
+        """k 路归并各领域已按分数降序排列的列表，只复制最终入选的项"""
+        streams = [
+            [(domain, item) for item in results[field]]
+            for domain, results in per_domain
+        ]
+        # heapq.merge 是稳定的：同分时按领域顺序、领域内原有顺序输出
+        merged = heapq.merge(*streams, key=lambda entry: -entry[1]["relevance_score"])
+        return [{**item, "domain": domain} for domain, item in islice(merged, top_n)]
+
+    def _get_domain_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._domain_executor is None:
+                self._domain_executor = ThreadPoolExecutor(
+                    max_workers=self.domain_workers,
+                    thread_name_prefix="domain-scoring"
+                )
+            return self._domain_executor
+
+    def get_recommendations_page(self,
+                                 requirements: UserRequirements,
+                                 page_size: int = 10,
+                                 cursor: Optional[str] = None,
+                                 include_timings: bool = False) -> Dict:
+        """
+        分页获取推荐（商业工具与开源项目合并排序）
+
+        首次请求对整个领域评分并缓存排序，之后每页只按游标切片，
+        推荐理由与结果字典只为当前页生成。数据版本变化后旧游标失效（CursorExpired）。
+        """
+        if page_size <= 0:
+            raise ValueError(f"page_size must be positive: {page_size}")
+
+        page, timings = self._timed(
+            lambda: self._build_page(requirements, page_size, cursor), include_timings)
+        if timings is not None:
+            page["timings"] = timings
+        return page
+
+    def _build_page(self,
+                    requirements: UserRequirements,
+                    page_size: int,
+                    cursor: Optional[str]) -> Dict:
+        """按游标切出一页结果"""
+        timer = current_timer()
+        ranking = self._get_ranking(requirements)
+        start = ranking.resume(cursor) if cursor else 0
+
+        with timer.stage("sort"):
+            items = [
+                {**record, "relevance_score": score, "type": KIND_NAMES[kind]}
+                for score, kind, record in ranking.page(start, page_size)
+            ]
+
+        with timer.stage("reasoning"):
+            for item in items:
+                item["reasoning"] = self._generate_reasoning(item, requirements)
+
+        return {
+            "requirements": self._describe_requirements(requirements),
+            "recommendations": items,
+            "total": len(ranking),
+            "next_cursor": ranking.next_cursor(start, page_size),
+        }
+
+    def _get_ranking(self, requirements: UserRequirements) -> RankedResults:
+        """获取需求画像的完整排序（按数据版本与目录版本缓存）"""
+        corpus = self.get_corpus(requirements.domain.value)
+        snapshot = self.commercial_catalog.snapshot()
+        version = f"{corpus.version}|{snapshot.version}"
+
+        def rank() -> RankedResults:
+            timer = current_timer()
+            catalog = snapshot.domain(requirements.domain.value)
+            with timer.stage("score_commercial"):
+                commercial_scores = score_commercial(catalog, requirements)
+            with timer.stage("score_oss"):
+                oss_scores = score_open_source(corpus.columns, requirements)
+            with timer.stage("sort"):
+                return RankedResults(version, corpus, catalog, oss_scores, commercial_scores)
+
+        if self.ranking_cache is None:
+            return rank()
+
+        key = (*requirements_key(requirements, ranking_only=True), version)
+        return self.ranking_cache.get_or_compute(key, rank).result
+
+    def _recommend(self,
+                   requirements: UserRequirements,
+                   top_n: int,
+                   include_timings: bool) -> Tuple[CacheEntry, Optional[Dict]]:
+        """获取缓存条目；计时开启时记录各阶段耗时"""
+        return self._timed(lambda: self._get_cache_entry(requirements, top_n), include_timings)
+
+    def _timed(self, compute, include_timings: bool) -> Tuple[object, Optional[Dict]]:
+        """执行 compute；计时开启时计入直方图，include_timings 时同时返回本次耗时"""
+        if not (self.instrument or include_timings):
+            return compute(), None
+
+        timer = StageTimer()
+        with activate(timer):
+            value = compute()
+        total_ms = timer.total_ms()
+        self.stage_metrics.observe(timer, total_ms)
+
+        if not include_timings:
+            return value, None
+        return value, {
+            # 未经过开源评分阶段即为命中缓存
+            "cached": "score_oss" not in timer.stages,
+            "total_ms": round(total_ms, 3),
+            "stages": timer.as_dict(),
+        }
+
+    def _get_cache_entry(self, requirements: UserRequirements, top_n: int) -> CacheEntry:
+        """按规范化的需求键查询结果缓存，未命中时计算"""
+        if self.result_cache is None:
+            return CacheEntry(self._compute_recommendations(requirements, top_n), 0.0)
+
+        key = (
+            *requirements_key(requirements),
+            top_n,
+            self._current_version(requirements.domain.value),
+            self.commercial_catalog.version,
+        )
+        return self.result_cache.get_or_compute(
+            key, lambda: self._compute_recommendations(requirements, top_n))
+
+    def _current_version(self, domain: str) -> str:
+        """当前数据版本（启用语料缓存时复用其节流后的版本检查）"""
+        if self.corpus_cache is not None and not self.candidate_pool:
+            return self.corpus_cache.get(domain).version
+        return self.get_data_version(domain)
+
+    def _compute_recommendations(self,
+                                 requirements: UserRequirements,
+                                 top_n: int) -> Dict:
+        """计算推荐结果"""
+        timer = current_timer()
+        results = {
+            "requirements": self._describe_requirements(requirements),
             "commercial_tools": [],
             "open_source_projects": [],
             "recommendations": []
         }
 
         # 1. 评分商业工具
-        commercial = self.commercial_tools.get(requirements.domain.value, [])
-        for tool in commercial:
-            score = self.calculate_commercial_score(tool, requirements)
-            if score > 30:  # 只推荐相关度>30的
-                results["commercial_tools"].append({
-                    **tool,
-                    "relevance_score": round(score, 2),
-                    "type": "commercial"
-                })
-
-        # 2. 评分开源项目
-        github_projects = self.get_github_projects(requirements.domain.value, 50)
-        for project in github_projects:
-            score = self.calculate_relevance_score(project, requirements)
-            if score > 30:
+        with timer.stage("score_commercial"):
+            catalog = self.commercial_catalog.domain(requirements.domain.value)
+            if self.vectorized:
+                commercial_scores = score_commercial(catalog, requirements).tolist()
+            else:
+                commercial_scores = [self.calculate_commercial_score(tool, requirements)
+                                     for tool in catalog.tools]
+            for tool, score in zip(catalog.tools, commercial_scores):
+                if score > 30:  # 只推荐相关度>30的
+                    results["commercial_tools"].append({
+                        **tool.record,
+                        "relevance_score": round(score, 2),
+                        "type": "commercial"
+                    })
+
+        # 2. 评分开源项目（整域评分，部分选择 Top-K）
+        if self.candidate_pool:
+            github_projects = self.get_candidate_projects(requirements, self.candidate_pool)
+            corpus = None
+            columns = None
+        else:
+            corpus = self.get_corpus(requirements.domain.value)
+            github_projects = corpus.projects
+            columns = corpus.columns
+
+        if self.vectorized:
+            if columns is None:
+                feature_index = self._load_feature_index(github_projects, requirements.features)
+                with timer.stage("decode"):
+                    columns = DomainColumns(github_projects, feature_index)
+            if corpus is not None and requirements.priority in PRIORITIES:
+                # 基础分表按降序剪枝，只为可能进入 Top-K 的项目计算附加分（评分与选择合并）
+                with timer.stage("score_oss"):
+                    base, order = corpus.base_table(requirements.experience.value, requirements.priority)
+                    top_projects = select_top_k_pruned(columns, requirements, base, order, top_n)
+            else:
+                with timer.stage("score_oss"):
+                    scores = score_open_source(columns, requirements)
+                with timer.stage("sort"):
+                    top_projects = select_top_k(scores, top_n)
+        else:
+            with timer.stage("score_oss"):
+                scores = [self.calculate_relevance_score(p, requirements) for p in github_projects]
+            with timer.stage("sort"):
+                top_projects = heapq.nsmallest(
+                    top_n,
+                    ((round(score, 2), i) for i, score in enumerate(scores) if score > 30),
+                    key=lambda item: (-item[0], item[1])
+                )
+
+        with timer.stage("sort"):
+            for score, i in top_projects:
                 results["open_source_projects"].append({
-                    **project,
-                    "relevance_score": round(score, 2),
+                    **github_projects[i],
+                    "relevance_score": score,
                     "type": "open_source"
                 })
 
-        # 3. 合并和排序
-        all_recommendations = (
-            results["commercial_tools"] +
-            results["open_source_projects"]
-        )
-        all_recommendations.sort(key=lambda x: x["relevance_score"], reverse=True)
+            # 3. 合并和排序
+            all_recommendations = (
+                results["commercial_tools"] +
+                results["open_source_projects"]
+            )
+            all_recommendations.sort(key=lambda x: x["relevance_score"], reverse=True)
 
-        results["recommendations"] = all_recommendations[:top_n]
+            results["recommendations"] = all_recommendations[:top_n]
 
         # 4. 生成推荐理由
-        for item in results["recommendations"]:
-            item["reasoning"] = self._generate_reasoning(item, requirements)
+        with timer.stage("reasoning"):
+            for item in results["recommendations"]:
+                item["reasoning"] = self._generate_reasoning(item, requirements)
 
         return results
 
+    @staticmethod
+    def _describe_requirements(requirements: UserRequirements) -> Dict:
+        """结果中回显的需求字段"""
+        return {
+            "domain": requirements.domain.value,
+            "experience": requirements.experience.value,
+            "budget": requirements.budget.value,
+            "features": requirements.features,
+            "priority": requirements.priority
+        }
+
     def _generate_reasoning(self, item: Dict, requirements: UserRequirements) -> str:
         """生成推荐理由"""
         reasons = []
@@ -454,9 +844,9 @@ class RecommendationEngine:
         # 功能匹配
         if requirements.features:
             matched_features = []
-            item_text = str(item.get("description", "")).lower()
+            item_terms = set(tokenize(item.get("description")))
             for feature in requirements.features[:3]:  # 最多显示3个
-                if feature.lower() in item_text:
+                if feature_matches(feature, item_terms):
                     matched_features.append(feature)
             if matched_features:
                 reasons.append(f"匹配功能: {', '.join(matched_features)}")
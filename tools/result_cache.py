@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Recommendation Result Cache
+推荐结果缓存：有界 LRU（条目数，可选总字节数）+ TTL，可同时缓存序列化后的 JSON 字节
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+# 与 recommendations 重复的分类型列表
+PER_TYPE_FIELDS = ("commercial_tools", "open_source_projects")
+
+
+def compact_result(result: Dict) -> Dict:
+    """去掉分类型列表后的结果（浅拷贝）"""
+    return {key: value for key, value in result.items() if key not in PER_TYPE_FIELDS}
+
+
+class CacheEntry:
+    """缓存条目"""
+
+    __slots__ = ("result", "payload", "compact_payload", "expires_at", "nbytes")
+
+    def __init__(self, result: Dict, expires_at: float, nbytes: int = 0):
+        self.result = result
+        self.payload: Optional[bytes] = None
+        self.compact_payload: Optional[bytes] = None
+        self.expires_at = expires_at
+        self.nbytes = nbytes
+
+
+class RecommendationCache:
+    """
+    推荐结果缓存
+
+    缓存的结果对象在调用方之间共享，调用方不应修改。
+    设置 max_bytes 时按 sizeof(result) 估算条目大小，超出后按 LRU 淘汰（至少保留最新写入的一个）。
+    """
+
+    def __init__(self,
+                 maxsize: int = 1024,
+                 ttl: float = 300.0,
+                 max_bytes: Optional[int] = None,
+                 sizeof: Optional[Callable[[Any], int]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._nbytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """读取未过期的条目"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                self._nbytes -= entry.nbytes
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, result: Dict) -> CacheEntry:
+        """写入条目，超出容量（条目数或总字节数）时淘汰最久未使用的条目"""
+        nbytes = self.sizeof(result) if self.sizeof is not None else 0
+        entry = CacheEntry(result, time.monotonic() + self.ttl, nbytes)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous.nbytes
+            self._entries[key] = entry
+            self._nbytes += nbytes
+            while len(self._entries) > self.maxsize or (
+                    self.max_bytes is not None and self._nbytes > self.max_bytes
+                    and len(self._entries) > 1):
+                _, evicted = self._entries.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+                self.evictions += 1
+        return entry
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Dict]) -> CacheEntry:
+        """命中则返回缓存条目，否则计算并写入"""
+        entry = self.get(key)
+        if entry is None:
+            entry = self.put(key, compute())
+        return entry
+
+    @staticmethod
+    def serialize(entry: CacheEntry, include_lists: bool = True) -> bytes:
+        """
+        序列化结果为 JSON 字节（首次序列化后保存在条目中）
+
+        include_lists 为 False 时省略与 recommendations 重复的
+        commercial_tools / open_source_projects 列表。
+        """
+        if include_lists:
+            if entry.payload is None:
+                entry.payload = json.dumps(entry.result, ensure_ascii=False).encode("utf-8")
+            return entry.payload
+
+        if entry.compact_payload is None:
+            entry.compact_payload = json.dumps(
+                compact_result(entry.result), ensure_ascii=False).encode("utf-8")
+        return entry.compact_payload
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """当前缓存条目的总大小（估算；未设置 sizeof 时为 0）"""
+        return self._nbytes
+
+    @property
+    def hit_rate(self) -> float:
+        """命中率"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "bytes": self._nbytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
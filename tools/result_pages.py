@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Paginated Recommendation Results
+分页推荐：每个需求画像只评分、排序一次，之后按游标直接切出所需页
+"""
+
+import base64
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from commercial_catalog import DomainCatalog
+from corpus_cache import DomainCorpus
+
+
+# 结果类型：同分时商业工具排在开源项目之前（与 get_recommendations 的合并顺序一致）
+KIND_COMMERCIAL = 0
+KIND_OPEN_SOURCE = 1
+KIND_NAMES = {KIND_COMMERCIAL: "commercial", KIND_OPEN_SOURCE: "open_source"}
+
+
+class CursorExpired(ValueError):
+    """游标对应的数据版本已失效"""
+
+
+def encode_cursor(version: str, score: float, kind: int, item_id) -> str:
+    """游标：数据版本 + 上一页最后一项的 (分数, 类型, id)"""
+    payload = json.dumps([version, score, kind, item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, float, int, object]:
+    """解析游标，格式错误时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, score, kind, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(version), float(score), int(kind), item_id
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class RankedResults:
+    """
+    某需求画像的完整排序（只保存分数与行号，不复制项目字典）
+
+    排序键打包为单个 int64：(10000 - 分数×100, 类型, 行号)，
+    游标定位只需一次二分查找。
+    """
+
+    def __init__(self,
+                 version: str,
+                 corpus: DomainCorpus,
+                 catalog: DomainCatalog,
+                 oss_scores: np.ndarray,
+                 commercial_scores: np.ndarray,
+                 min_score: float = 30):
+        self.version = version
+        self.corpus = corpus
+        self.catalog = catalog
+        self.stride = len(corpus) + len(catalog) + 1
+
+        kinds = []
+        rows = []
+        scores = []
+        for kind, values in ((KIND_COMMERCIAL, commercial_scores), (KIND_OPEN_SOURCE, oss_scores)):
+            eligible = np.flatnonzero(values > min_score)
+            rows.append(eligible)
+            kinds.append(np.full(eligible.size, kind, dtype=np.int64))
+            # 与 get_recommendations 相同：按 round(score, 2) 排序和输出
+            scores.append(np.array([round(v, 2) for v in values[eligible].tolist()], dtype=np.float64))
+
+        rows = np.concatenate(rows)
+        kinds = np.concatenate(kinds)
+        scores = np.concatenate(scores)
+        keys = self._keys(scores, kinds, rows)
+
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.rows = rows[order]
+        self.kinds = kinds[order]
+        self.scores = scores[order]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        """排序数组的大小（每项 32 字节；语料与目录为共享对象，不计入）"""
+        return self.keys.nbytes + self.rows.nbytes + self.kinds.nbytes + self.scores.nbytes
+
+    def _keys(self, scores: np.ndarray, kinds: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        cents = np.rint(scores * 100).astype(np.int64)
+        return ((10000 - cents) * 2 + kinds) * self.stride + rows
+
+    def item_id(self, rank: int):
+        """结果项的稳定 id：开源项目为数据库 id，商业工具为名称"""
+        if self.kinds[rank] == KIND_COMMERCIAL:
+            return self.catalog.tools[self.rows[rank]].name
+        return self.corpus.projects[self.rows[rank]]['id']
+
+    def cursor_at(self, rank: int) -> str:
+        """指向第 rank 项之后的游标"""
+        return encode_cursor(self.version, float(self.scores[rank]), int(self.kinds[rank]),
+                             self.item_id(rank))
+
+    def resume(self, cursor: str) -> int:
+        """游标之后第一项的位置"""
+        version, score, kind, item_id = decode_cursor(cursor)
+        if version != self.version:
+            raise CursorExpired("Cursor expired: data changed since the first page")
+
+        if kind == KIND_COMMERCIAL:
+            names = [tool.name for tool in self.catalog.tools]
+            if item_id not in names:
+                raise ValueError(f"Invalid cursor: {cursor}")
+            row = names.index(item_id)
+        elif kind == KIND_OPEN_SOURCE:
+            row = self.corpus.position_of(item_id)
+            if row is None:
+                raise ValueError(f"Invalid cursor: {cursor}")
+        else:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+        key = self._keys(np.array([score]), np.array([kind]), np.array([row]))[0]
+        return int(np.searchsorted(self.keys, key, side="right"))
+
+    def iter_items(self, start: int, size: int) -> Iterator[Tuple[float, int, Dict]]:
+        """逐项生成 (分数, 类型, 原始记录)，只读取所需的行"""
+        for rank in range(start, min(start + size, len(self))):
+            row = int(self.rows[rank])
+            if self.kinds[rank] == KIND_COMMERCIAL:
+                record = self.catalog.tools[row].record
+            else:
+                record = self.corpus.projects[row]
+            yield float(self.scores[rank]), int(self.kinds[rank]), record
+
+    def page(self, start: int, size: int) -> List[Tuple[float, int, Dict]]:
+        """[(分数, 类型, 原始记录)]，只读取本页的行"""
+        return list(self.iter_items(start, size))
+
+    def next_cursor(self, start: int, size: int) -> Optional[str]:
+        """下一页游标；已到末尾时为 None"""
+        end = start + size
+        if end >= len(self):
+            return None
+        return self.cursor_at(end - 1)
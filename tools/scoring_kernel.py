@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Vectorized Scoring Kernel
+整域向量化评分内核：把领域项目一次性加载为列式数组，用 NumPy 一次计算全部分数
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from feature_index import FeatureIndex
+
+
+class DomainColumns:
+    """领域列式数据（加载一次，供整域向量化评分）"""
+
+    # 功能命中缓存上限（按功能关键词缓存命中列）
+    FEATURE_CACHE_SIZE = 256
+
+    # 评分使用的数值列
+    ARRAYS = ("stars", "forks", "activity_score", "has_description", "permissive_license", "language_code")
+
+    def __init__(self, projects: List[Dict], feature_index: Optional[FeatureIndex] = None):
+        self.size = len(projects)
+
+        self.stars = np.fromiter(
+            (p.get('stars') or 0 for p in projects), dtype=np.float64, count=self.size)
+        self.forks = np.fromiter(
+            (p.get('forks') or 0 for p in projects), dtype=np.float64, count=self.size)
+        self.activity_score = np.fromiter(
+            (p.get('activity_score') or 0 for p in projects), dtype=np.float64, count=self.size)
+        self.has_description = np.fromiter(
+            (bool(p.get('description')) for p in projects), dtype=bool, count=self.size)
+
+        # 许可证标记：MIT / Apache
+        licenses = [(p.get('license') or '').lower() for p in projects]
+        self.permissive_license = np.fromiter(
+            ('mit' in name or 'apache' in name for name in licenses), dtype=bool, count=self.size)
+
+        # 编程语言编码
+        self.language_vocab: Dict[str, int] = {}
+        self.language_code = np.fromiter(
+            (self.language_vocab.setdefault((p.get('main_language') or '').lower(),
+                                            len(self.language_vocab))
+             for p in projects),
+            dtype=np.int32, count=self.size)
+
+        # 功能倒排索引（入库时建立；缺失时由已加载项目构建）
+        self.feature_index = feature_index or FeatureIndex.from_projects(projects)
+        self._feature_hits: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._feature_lock = threading.Lock()
+
+    @classmethod
+    def from_arrays(cls,
+                    arrays: Dict[str, np.ndarray],
+                    language_vocab: Dict[str, int],
+                    feature_index: FeatureIndex) -> "DomainColumns":
+        """由现成的数组创建（如 mmap 快照中的只读数组），不遍历项目记录"""
+        columns = cls.__new__(cls)
+        columns.size = len(arrays["stars"])
+        for name in cls.ARRAYS:
+            setattr(columns, name, arrays[name])
+        columns.language_vocab = dict(language_vocab)
+        columns.feature_index = feature_index
+        columns._feature_hits = OrderedDict()
+        columns._feature_lock = threading.Lock()
+        return columns
+
+    @property
+    def nbytes(self) -> int:
+        """列式数据与倒排索引占用的内存（字节）"""
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS) + self.feature_index.nbytes
+
+    def language_codes(self, languages: List[str]) -> List[int]:
+        """语言名 → 编码（忽略语料中不存在的语言）"""
+        return [self.language_vocab[lang] for lang in languages if lang in self.language_vocab]
+
+    def language_mask(self, languages: List[str]) -> np.ndarray:
+        """语言命中掩码"""
+        return np.isin(self.language_code, self.language_codes(languages))
+
+    def feature_hits(self, feature: str) -> np.ndarray:
+        """单个功能关键词的命中列（按关键词缓存）"""
+        needle = feature.lower()
+        with self._feature_lock:
+            hits = self._feature_hits.get(needle)
+            if hits is not None:
+                self._feature_hits.move_to_end(needle)
+                return hits
+
+        hits = np.zeros(self.size, dtype=bool)
+        hits[self.feature_index.match(needle)] = True
+        with self._feature_lock:
+            self._feature_hits[needle] = hits
+            if len(self._feature_hits) > self.FEATURE_CACHE_SIZE:
+                self._feature_hits.popitem(last=False)
+        return hits
+
+    def feature_hit_matrix(self, features: List[str]) -> np.ndarray:
+        """功能命中矩阵 (功能数 × 项目数)"""
+        if not features:
+            return np.zeros((0, self.size), dtype=bool)
+        return np.vstack([self.feature_hits(f) for f in features])
+
+
+def score_open_source(columns: DomainColumns,
+                      requirements,
+                      rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    整域计算开源项目相关度 (0-100)
+
+    与 RecommendationEngine.calculate_relevance_score 逐位一致：
+    六个分项按相同顺序以 float64 累加。rows 指定时只计算这些行。
+    """
+    pick = _picker(rows)
+    stars = pick(columns.stars)
+    activity = pick(columns.activity_score)
+
+    # 1. 活跃度和星标基础分 (30分)
+    score = np.minimum(activity * 0.2, 20)
+    score += np.minimum(stars / 1000, 10)
+
+    # 2. 编程语言匹配 (15分)
+    score += _language_bonus(columns, requirements, pick)
+
+    # 3. 经验水平匹配 (10分)
+    score += _experience_bonus(requirements.experience.value, stars, activity)
+
+    # 4. 功能特性匹配 (25分)
+    score += _feature_bonus(columns, requirements, pick)
+
+    # 5. 优先级加权 (20分)
+    score += _priority_bonus(requirements.priority, columns, pick)
+
+    # 6. 许可证考虑 (bonus)
+    score += np.where(pick(columns.permissive_license), 5.0, 0.0)
+
+    return np.minimum(score, 100.0)
+
+
+# 基础分表覆盖的优先级取值
+PRIORITIES = ("performance", "ease_of_use", "features", "community")
+
+# 附加分（语言 + 功能）的上限
+MAX_LANGUAGE_BONUS = 15.0
+MAX_FEATURE_BONUS = 25.0
+
+
+def base_scores(columns: DomainColumns, experience: str, priority: str) -> np.ndarray:
+    """
+    与功能、语言偏好无关的基础分：活跃度/星标 + 经验 + 优先级 + 许可证
+
+    只取决于项目字段和 (experience, priority)，可离线预计算。
+    """
+    pick = _picker(None)
+    stars = columns.stars
+    activity = columns.activity_score
+
+    score = np.minimum(activity * 0.2, 20)
+    score += np.minimum(stars / 1000, 10)
+    score += _experience_bonus(experience, stars, activity)
+    score += _priority_bonus(priority, columns, pick)
+    score += np.where(columns.permissive_license, 5.0, 0.0)
+    return score
+
+
+def additive_scores(columns: DomainColumns,
+                    requirements,
+                    rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """请求相关的附加分：语言匹配 + 功能匹配"""
+    pick = _picker(rows)
+    size = columns.size if rows is None else len(rows)
+    score = np.zeros(size, dtype=np.float64)
+    score += _language_bonus(columns, requirements, pick)
+    score += _feature_bonus(columns, requirements, pick)
+    return score
+
+
+def _picker(rows: Optional[np.ndarray]):
+    """列选择器：rows 为 None 时返回整列"""
+    if rows is None:
+        return lambda column: column
+    return lambda column: column[rows]
+
+
+def _language_bonus(columns: DomainColumns, requirements, pick):
+    if not requirements.language_preference:
+        return 0.0
+    language_code = pick(columns.language_code)
+    preferred = np.isin(language_code, columns.language_codes(
+        [lang.lower() for lang in requirements.language_preference]))
+    is_python = language_code == columns.language_vocab.get('python', -1)
+    return np.where(preferred, 15.0, np.where(is_python, 8.0, 0.0))
+
+
+def _experience_bonus(experience: str, stars: np.ndarray, activity: np.ndarray):
+    if experience == "beginner":
+        return np.where(stars > 5000, 10.0, np.where(stars > 1000, 5.0, 0.0))
+    if experience == "advanced":
+        return np.where(activity > 80, 10.0, np.where(activity > 60, 5.0, 0.0))
+    return 0.0
+
+
+def _feature_bonus(columns: DomainColumns, requirements, pick):
+    if not requirements.features:
+        return 0.0
+    # 只取所需行后再求和，命中数与整列求和一致
+    matched = np.sum([pick(columns.feature_hits(f)) for f in requirements.features], axis=0)
+    return (matched / len(requirements.features)) * 25
+
+
+def _priority_bonus(priority: str, columns: DomainColumns, pick):
+    if priority == "performance":
+        return np.where(pick(columns.activity_score) > 80, 20.0, 0.0)
+    if priority == "ease_of_use":
+        return np.where(pick(columns.stars) > 1000, 20.0, 0.0)
+    if priority == "features":
+        return np.where(pick(columns.has_description), 15.0, 0.0)
+    if priority == "community":
+        return np.minimum(pick(columns.forks) / 100, 20)
+    return 0.0
+
+
+def select_top_k(scores: np.ndarray, k: int, min_score: float = 30) -> List[Tuple[float, int]]:
+    """
+    部分选择 Top-K（代价随 k 增长，而非全量排序）
+
+    返回 [(保留两位小数的分数, 行号)]，按分数降序、行号升序排列，
+    与对全量结果做 round(score, 2) 后稳定排序取前 k 个完全一致。
+    """
+    eligible = np.flatnonzero(scores > min_score)
+    if k <= 0 or eligible.size == 0:
+        return []
+
+    if eligible.size > k:
+        values = scores[eligible]
+        kth = np.partition(values, eligible.size - k)[eligible.size - k]
+        # 舍入后可能与第 k 名并列的项也需保留
+        eligible = eligible[values >= kth - 0.01]
+
+    ranked = sorted(
+        ((round(score, 2), index)
+         for index, score in zip(eligible.tolist(), scores[eligible].tolist())),
+        key=lambda item: (-item[0], item[1])
+    )
+    return ranked[:k]
+
+
+def select_top_k_pruned(columns: DomainColumns,
+                        requirements,
+                        base: np.ndarray,
+                        order: np.ndarray,
+                        k: int,
+                        min_score: float = 30) -> List[Tuple[float, int]]:
+    """
+    基于预计算基础分的 Top-K（阈值剪枝）
+
+    按基础分降序分块扫描，只为扫描到的行加上语言/功能附加分；
+    当剩余行的分数上界（基础分 + 附加分上限）已不可能进入 Top-K 时停止。
+    候选行最后用 score_open_source 精确重算，结果与 select_top_k 完全一致。
+    """
+    if k <= 0 or columns.size == 0:
+        return []
+
+    max_bonus = ((MAX_LANGUAGE_BONUS if requirements.language_preference else 0.0) +
+                 (MAX_FEATURE_BONUS if requirements.features else 0.0))
+
+    kept_rows = []
+    kept_values = []
+    visited = 0
+    block = max(4 * k, 1024)
+    while visited < columns.size:
+        rows = order[visited:visited + block]
+        approx = np.minimum(base[rows] + additive_scores(columns, requirements, rows), 100.0)
+        keep = approx > min_score - 1e-6
+        kept_rows.append(rows[keep])
+        kept_values.append(approx[keep])
+        visited += len(rows)
+        block *= 2
+
+        if visited >= columns.size:
+            break
+        bound = base[order[visited]] + max_bonus
+        if bound < min_score - 1e-6:
+            break
+        values = np.concatenate(kept_values)
+        if values.size >= k:
+            kth = np.partition(values, values.size - k)[values.size - k]
+            # 上界低于第 k 名 0.02 以上时，舍入后也无法并列
+            if bound < kth - 0.02:
+                break
+
+    candidates = np.sort(np.concatenate(kept_rows))
+    if candidates.size == 0:
+        return []
+    exact = score_open_source(columns, requirements, rows=candidates)
+    return [(score, int(candidates[i])) for score, i in select_top_k(exact, k, min_score)]
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Search Cache
+GitHub 搜索结果的本地持久缓存：按规范化请求（后端、查询、排序、分页）查找，
+响应体按内容哈希压缩保存（相同结果只存一份），每条记录有过期时间，总大小超限时按最近访问淘汰
+
+- 在有效期内命中时不发请求、不消耗额度（REST 过期后仍先走 ETag 条件请求）
+- 离线模式（SEARCH_CACHE_OFFLINE=1）从不访问网络：过期记录照常返回，未命中视为失败
+
+环境变量：SEARCH_CACHE_TTL（秒，默认 1 天）、SEARCH_CACHE_MAX_MB（默认 256）、SEARCH_CACHE_OFFLINE
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+
+DEFAULT_TTL = int(os.environ.get("SEARCH_CACHE_TTL", str(24 * 3600)))
+DEFAULT_MAX_BYTES = int(os.environ.get("SEARCH_CACHE_MAX_MB", "256")) * 1024 * 1024
+COMPRESS_LEVEL = 6
+
+# gh search repos 输出的字段（各采集器一致）
+GH_SEARCH_FIELDS = (
+    "name,owner,stargazersCount,forksCount,description,url,"
+    "updatedAt,createdAt,language,license,openIssuesCount"
+)
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_entries (
+    key TEXT PRIMARY KEY,
+    request TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_entries_accessed ON search_entries(accessed_at);
+
+CREATE INDEX IF NOT EXISTS idx_search_entries_digest ON search_entries(digest);
+
+CREATE TABLE IF NOT EXISTS search_blobs (
+    digest TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    raw_size INTEGER NOT NULL
+)
+"""
+
+
+# 搜索语句的词：引号内的短语（含空白）作为一个整体，如 "latex ai"、topic:"machine learning"
+QUERY_TOKEN = re.compile(r'(?:[^\s"]+|"[^"]*")+')
+QUALIFIER = re.compile(r'-?[A-Za-z_]+:\S')
+# 只有大写时才是运算符
+BOOLEAN_OPERATORS = {"AND", "OR", "NOT"}
+
+
+class OfflineCacheMiss(LookupError):
+    """离线模式下请求不在缓存中"""
+
+
+def offline_from_env() -> bool:
+    return os.environ.get("SEARCH_CACHE_OFFLINE", "0") not in ("", "0")
+
+
+def search_cache_path(db_path: str) -> str:
+    """与项目数据库同目录的 search_cache.db"""
+    return os.path.join(os.path.dirname(db_path) or ".", "search_cache.db")
+
+
+def normalize_query(query: str) -> str:
+    """
+    规范化搜索语句：合并引号外的空白，独立的限定符（key:value）排序后放在关键词之后
+
+    大小写、引号内的短语与关键词顺序保持不变，与运算符相邻的限定符留在原位；
+    含括号时只合并空白，引号不成对时原样返回
+    """
+    if query.count('"') % 2:
+        return query.strip()
+    tokens = QUERY_TOKEN.findall(query)
+    if any("(" in token or ")" in token for token in tokens):
+        return " ".join(tokens)
+
+    def movable(i: int) -> bool:
+        return (QUALIFIER.match(tokens[i]) is not None
+                and (i == 0 or tokens[i - 1] not in BOOLEAN_OPERATORS)
+                and (i + 1 == len(tokens) or tokens[i + 1] not in BOOLEAN_OPERATORS))
+
+    keywords = [token for i, token in enumerate(tokens) if not movable(i)]
+    qualifiers = sorted(token for i, token in enumerate(tokens) if movable(i))
+    return " ".join(keywords + qualifiers)
+
+
+def request_key(request: Dict) -> str:
+    """规范化请求的键（查询语句规范化，其余字段按键名排序）"""
+    normalized = dict(request)
+    for field in ("query", "q"):
+        if isinstance(normalized.get(field), str):
+            normalized[field] = normalize_query(normalized[field])
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """搜索结果缓存（SQLite，多线程共享一个连接）"""
+
+    def __init__(self,
+                 path: str,
+                 ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 offline: Optional[bool] = None):
+        """
+        Args:
+            path: 缓存文件路径
+            ttl: 默认有效期（秒）
+            max_bytes: 压缩后响应体的总大小上限
+            offline: 离线模式（None 时读取 SEARCH_CACHE_OFFLINE）
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline_from_env() if offline is None else offline
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        for statement in CACHE_SCHEMA.split(";\n\n"):
+            self._conn.execute(statement)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+        self.stats = {"hits": 0, "stale": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    def get(self, request: Dict) -> Optional[bytes]:
+        """
+        查找缓存的响应体
+
+        在线时只返回未过期的记录；离线时过期记录也返回（计入 stale）
+        """
+        key = request_key(request)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("""
+            SELECT e.expires_at, b.body FROM search_entries e
+            JOIN search_blobs b ON b.digest = e.digest
+            WHERE e.key = ?
+            """, (key,)).fetchone()
+            if row is None or (row[0] < now and not self.offline):
+                self.stats["misses"] += 1
+                return None
+            self.stats["stale" if row[0] < now else "hits"] += 1
+            self._conn.execute("UPDATE search_entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return zlib.decompress(row[1])
+
+    def put(self, request: Dict, body: bytes, ttl: Optional[float] = None):
+        """保存响应体（相同内容的响应共用一份压缩数据），超出大小上限时淘汰最久未访问的记录"""
+        key = request_key(request)
+        digest = hashlib.sha256(body).hexdigest()
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        normalized = json.dumps(request, sort_keys=True, ensure_ascii=False)
+
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM search_blobs WHERE digest = ?", (digest,)).fetchone() is None:
+                compressed = zlib.compress(body, COMPRESS_LEVEL)
+                self._conn.execute(
+                    "INSERT INTO search_blobs (digest, body, size, raw_size) VALUES (?, ?, ?, ?)",
+                    (digest, compressed, len(compressed), len(body))
+                )
+            old = self._conn.execute("SELECT digest FROM search_entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute("""
+            INSERT INTO search_entries (key, request, digest, stored_at, expires_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                digest = excluded.digest,
+                stored_at = excluded.stored_at,
+                expires_at = excluded.expires_at,
+                accessed_at = excluded.accessed_at
+            """, (key, normalized, digest, now, expires_at, now))
+            if old is not None and old[0] != digest:
+                self._delete_orphans([old[0]])
+            self.stats["stored"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def _delete_orphans(self, digests: List[str]):
+        for digest in digests:
+            self._conn.execute("""
+            DELETE FROM search_blobs WHERE digest = ?
+            AND NOT EXISTS (SELECT 1 FROM search_entries WHERE digest = ?)
+            """, (digest, digest))
+
+    def _evict(self):
+        """按最近访问时间淘汰，直到总大小不超过上限（最新写入的记录保留）"""
+        total = self._conn.execute("SELECT IFNULL(SUM(size), 0) FROM search_blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, digest FROM search_entries ORDER BY accessed_at, stored_at"
+        ).fetchall()
+        for key, digest in rows[:-1]:
+            self._conn.execute("DELETE FROM search_entries WHERE key = ?", (key,))
+            self.stats["evicted"] += 1
+            size = self._conn.execute("""
+            SELECT size FROM search_blobs WHERE digest = ?
+            AND NOT EXISTS (SELECT 1 FROM search_entries WHERE digest = ?)
+            """, (digest, digest)).fetchone()
+            if size is not None:
+                self._delete_orphans([digest])
+                total -= size[0]
+                if total <= self.max_bytes:
+                    break
+
+    def purge_expired(self) -> int:
+        """删除所有过期记录（离线使用前不要执行）"""
+        with self._lock:
+            digests = [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT digest FROM search_entries WHERE expires_at < ?", (time.time(),))]
+            deleted = self._conn.execute(
+                "DELETE FROM search_entries WHERE expires_at < ?", (time.time(),)).rowcount
+            self._delete_orphans(digests)
+            self._conn.commit()
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM search_entries")
+            self._conn.execute("DELETE FROM search_blobs")
+            self._conn.commit()
+
+    def summary(self) -> Dict:
+        """记录数、去重后的响应体数与大小"""
+        with self._lock:
+            entries, expired = self._conn.execute(
+                "SELECT COUNT(*), IFNULL(SUM(expires_at < ?), 0) FROM search_entries", (time.time(),)
+            ).fetchone()
+            blobs, size, raw_size = self._conn.execute(
+                "SELECT COUNT(*), IFNULL(SUM(size), 0), IFNULL(SUM(raw_size), 0) FROM search_blobs"
+            ).fetchone()
+        return {"entries": entries, "expired": expired, "blobs": blobs, "bytes": size, "raw_bytes": raw_size}
+
+    def report(self) -> str:
+        """本次运行的命中统计（一行）"""
+        mode = "📴 离线 | " if self.offline else ""
+        return (f"🗄️  搜索缓存: {mode}命中 {self.stats['hits']} | 过期命中 {self.stats['stale']} | "
+                f"未命中 {self.stats['misses']} | 写入 {self.stats['stored']} | 淘汰 {self.stats['evicted']}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def gh_search_repos(cache: SearchCache,
+                    query: str,
+                    limit: int = 30,
+                    sort: str = "stars",
+                    timeout: Optional[float] = None) -> List[Dict]:
+    """
+    通过 gh CLI 搜索仓库（先查缓存）
+
+    Raises:
+        OfflineCacheMiss: 离线模式且未缓存
+        subprocess.CalledProcessError / subprocess.TimeoutExpired / json.JSONDecodeError
+    """
+    request = {"backend": "gh", "query": query, "limit": limit, "sort": sort, "fields": GH_SEARCH_FIELDS}
+    body = cache.get(request)
+    if body is not None:
+        return json.loads(body)
+    if cache.offline:
+        raise OfflineCacheMiss(query)
+
+    cmd = [
+        "gh", "search", "repos",
+        query,
+        "--limit", str(limit),
+        "--sort", sort,
+        "--json", GH_SEARCH_FIELDS
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=timeout)
+    repos = json.loads(result.stdout)  # 解析失败的输出不缓存
+    cache.put(request, result.stdout.encode("utf-8"))
+    return repos
+
+
+def main():
+    """查看或清理缓存：search_cache.py [stats|purge|clear] [缓存路径]"""
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    path = sys.argv[2] if len(sys.argv) > 2 else search_cache_path("../data/projects.db")
+    if command not in ("stats", "purge", "clear"):
+        print("用法: python search_cache.py [stats|purge|clear] [缓存路径]")
+        sys.exit(1)
+
+    cache = SearchCache(path)
+    if command == "purge":
+        print(f"🧹 已删除 {cache.purge_expired()} 条过期记录")
+    elif command == "clear":
+        cache.clear()
+        print("🧹 缓存已清空")
+
+    summary = cache.summary()
+    ratio = summary["raw_bytes"] / summary["bytes"] if summary["bytes"] else 0
+    print(f"🗄️  {path}: {summary['entries']} 条记录（过期 {summary['expired']}），"
+          f"{summary['blobs']} 份响应体, {summary['bytes'] / 1024:.1f} KB（压缩比 {ratio:.1f}x）")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()